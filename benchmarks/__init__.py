@@ -0,0 +1,4 @@
+"""
+Benchmarks for measuring the performance of the bot. Run a benchmark as a module from the repository root, e.g.
+``python -m benchmarks.database_indexes``.
+"""
@@ -0,0 +1,137 @@
+"""
+MIT License
+
+Copyright (c) 2025 Niko Mätäsaho
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+from database_handler import DatabaseHandler
+
+
+# Schema version before the indexes of discord_messages were added
+_UNINDEXED_SCHEMA_VERSION = 3
+# Telegram chat of the benchmarked message references
+_TG_CHAT_ID = -1001234567890
+
+# The operations of DatabaseHandler as they were before indexing and partitioning the message references
+_UNINDEXED_STATEMENTS = {
+    "get": "SELECT message_id, channel_id, webhook_id FROM discord_messages WHERE tg_message_id = ?",
+    "update_ts": "UPDATE discord_messages SET ts = 1700000000 WHERE tg_message_id = ?",
+    "delete_by_id": "DELETE FROM discord_messages WHERE tg_message_id = ?",
+    "delete_by_age": "DELETE FROM discord_messages WHERE ts <= ?"
+}
+
+
+def populate(database_path: str, rows: int) -> DatabaseHandler:
+    """
+    Create a database with the given amount of message references, at the schema version before the indexes.
+
+    :param database_path: Path to the database file to create.
+    :param rows: Amount of message references to insert.
+    :return: Handler connected to the database.
+    """
+    handler = DatabaseHandler(database_path, ensure_tables=False, migration_defaults=dict(tg_chat_id=_TG_CHAT_ID))
+    handler.migrate(_UNINDEXED_SCHEMA_VERSION)
+    with handler.batch():
+        # Every Telegram message is forwarded to two Discord channels
+        handler.cursor.executemany(
+            "INSERT INTO discord_messages (message_id, channel_id, guild_id, tg_message_id, ts) VALUES (?, ?, ?, ?, ?)",
+            ((i, i % 2, 1, i // 2, 1_600_000_000 + i) for i in range(rows))
+        )
+    return handler
+
+
+def measure(operations: Dict[str, Callable[[int], object]], arguments: Dict[str, List[int]]) -> Dict[str, float]:
+    """
+    Measure the average duration of database operations.
+
+    :param operations: Dictionary of operation names and functions running the operations with a single argument.
+    :param arguments: Dictionary of operation names and the arguments to run them with.
+    :return: Average duration of each operation in milliseconds.
+    """
+    results = {}
+    for name, operation in operations.items():
+        start = time.perf_counter()
+        for argument in arguments[name]:
+            operation(argument)
+        results[name] = (time.perf_counter() - start) / len(arguments[name]) * 1000
+
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure the database operations looking up message references "
+                                                 "before and after the schema migrations indexing and partitioning "
+                                                 "them.")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Amount of message references in the database.")
+    parser.add_argument("--operations", type=int, default=100, help="Amount of operations to run of each kind.")
+    args = parser.parse_args()
+
+    tg_message_ids = [random.randrange(args.rows // 2) for _ in range(args.operations)]
+    arguments = {
+        "get": tg_message_ids,
+        "update_ts": tg_message_ids,
+        "delete_by_id": tg_message_ids,
+        "delete_by_age": [1_600_000_000 + i * 10 for i in range(args.operations)]
+    }
+
+    with tempfile.TemporaryDirectory() as directory:
+        database_path = os.path.join(directory, "benchmark.db")
+        print(f"Populating a database with {args.rows} message references...")
+        handler = populate(database_path, args.rows)
+
+        def run_statement(statement: str) -> Callable[[int], object]:
+            def run(argument: int) -> None:
+                with handler.connection:
+                    handler.cursor.execute(statement, (argument, )).fetchall()
+            return run
+
+        before = measure({name: run_statement(statement) for name, statement in _UNINDEXED_STATEMENTS.items()},
+                         arguments)
+
+        start = time.perf_counter()
+        handler.migrate()
+        migration_time = time.perf_counter() - start
+
+        after = measure({
+            "get": lambda tg_message_id: handler.get(_TG_CHAT_ID, tg_message_id),
+            "update_ts": lambda tg_message_id: handler.update_ts(_TG_CHAT_ID, tg_message_id, 1_700_000_000),
+            "delete_by_id": lambda tg_message_id: handler.delete_by_id(_TG_CHAT_ID, tg_message_id),
+            "delete_by_age": handler.delete_by_age
+        }, arguments)
+        handler.disconnect()
+
+    print(f"Migrations indexing and partitioning the references took {migration_time:.2f} s\n")
+    print(f"{'operation':<15}{'before (ms)':>14}{'after (ms)':>13}{'speedup':>10}")
+    for name in before:
+        speedup = before[name] / after[name] if after[name] else float("inf")
+        print(f"{name:<15}{before[name]:>14.3f}{after[name]:>13.3f}{speedup:>9.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+MIT License
+
+Copyright (c) 2025 Niko Mätäsaho
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import argparse
+import asyncio
+import logging
+import time
+from typing import Dict, List
+
+import telegram
+
+from benchmarks.mock_bot_api import MockBotApi, generate_updates
+from benchmarks.reference_stores import percentile
+
+
+_TOKEN = "TOKEN"
+# Maximum time in seconds to wait for the client to receive the remaining updates after adding them has stopped
+_DRAIN_TIMEOUT = 30
+
+
+async def load_test(
+        rate: float,
+        duration: float,
+        latency: float,
+        fault_rate: float,
+        file_size: int,
+        download_media: bool
+) -> Dict[str, float]:
+    """
+    Load test the ingest path of ``telegram.Client`` against a mock Telegram Bot API: long polling updates, parsing
+    them, invoking the listeners, and downloading the media of the messages.
+
+    :param rate: Amount of updates to add to the mock API per second.
+    :param duration: Time in seconds to add updates for.
+    :param latency: Time in seconds the mock API waits before every response.
+    :param fault_rate: Share of requests the mock API fails.
+    :param file_size: Size of the files served by the mock API in bytes.
+    :param download_media: Download the media of the received messages.
+    :return: Dictionary of measurement names and results.
+    """
+    mock_api = MockBotApi(_TOKEN, latency, fault_rate, file_size=file_size)
+    base_url = await mock_api.start()
+    client = telegram.Client(asyncio.get_running_loop(), base_url=base_url)
+
+    latencies: List[float] = []
+    downloaded = 0
+
+    async def on_update(update: telegram.Update) -> None:
+        latencies.append(time.perf_counter() - mock_api.enqueued_at.pop(update.update_id))
+
+    async def on_message(message: telegram.Message) -> None:
+        nonlocal downloaded
+        message.markdown()
+        if download_media:
+            for media in message.get_all_media():
+                stream, _ = await client.download_file(media)
+                downloaded += len(stream.getbuffer())
+
+    client.add_listener(on_update)
+    client.add_listener(on_message)
+
+    start = time.perf_counter()
+    client.start(_TOKEN)
+    try:
+        added = await generate_updates(mock_api, rate, duration)
+        drain_deadline = time.perf_counter() + _DRAIN_TIMEOUT
+        while len(latencies) < added and time.perf_counter() < drain_deadline:
+            await asyncio.sleep(0.1)
+        elapsed = time.perf_counter() - start
+    finally:
+        client.stop()
+        await client._client_session.close()
+        await mock_api.close()
+
+    return {
+        "updates added": added,
+        "updates received": len(latencies),
+        "throughput (updates/s)": len(latencies) / elapsed,
+        "latency p50 (ms)": percentile(latencies, 0.5) * 1000 if latencies else 0,
+        "latency p99 (ms)": percentile(latencies, 0.99) * 1000 if latencies else 0,
+        "downloaded (MB)": downloaded / 1_000_000,
+        "injected faults": mock_api.faults,
+        "getUpdates requests": mock_api.requests.get("getUpdates", 0)
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load test receiving Telegram updates and downloading their media "
+                                                 "offline against a mock Telegram Bot API.")
+    parser.add_argument("--rate", type=float, default=50, help="Amount of updates to add per second.")
+    parser.add_argument("--duration", type=float, default=10, help="Time in seconds to add updates for.")
+    parser.add_argument("--latency", type=float, default=0, help="Time in seconds the mock API waits before every "
+                                                                 "response.")
+    parser.add_argument("--fault-rate", type=float, default=0, help="Share of requests the mock API fails, between 0 "
+                                                                    "and 1.")
+    parser.add_argument("--file-size", type=int, default=100_000, help="Size of the served files in bytes.")
+    parser.add_argument("--no-downloads", action="store_true", help="Do not download the media of the messages.")
+    args = parser.parse_args()
+
+    # Requests failed on purpose by the mock API would otherwise flood the output
+    logging.getLogger("telegram").setLevel(logging.CRITICAL)
+    results = asyncio.run(load_test(args.rate, args.duration, args.latency, args.fault_rate, args.file_size,
+                                    not args.no_downloads))
+    for name, value in results.items():
+        print(f"{name:<24}{value:>12.2f}" if isinstance(value, float) else f"{name:<24}{value:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+MIT License
+
+Copyright (c) 2025 Niko Mätäsaho
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import argparse
+import gc
+import json
+import tracemalloc
+from typing import Callable, Dict
+
+import telegram
+from telegram.utils import replace_dictionary_keys
+
+from benchmarks.payloads import ENTITIES, MESSAGES
+
+
+def bytes_per_object(create: Callable[[], object], count: int) -> float:
+    """
+    Measure the memory retained by objects with tracemalloc.
+
+    :param create: Function creating a single object.
+    :param count: Amount of objects to create and keep alive while measuring.
+    :return: Average amount of memory allocated per object in bytes.
+    """
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [create() for _ in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    del objects
+    return (after - before) / count
+
+
+def measure(count: int) -> Dict[str, float]:
+    """
+    Measure the memory retained by parsed Telegram messages. The payloads are decoded from JSON for every message, so
+    that the strings and numbers in the messages are not shared between them, like in messages received from Telegram.
+
+    :param count: Amount of messages to create of every payload.
+    :return: Dictionary of payload names and bytes per message.
+    """
+    results = {}
+    for name, payload in MESSAGES.items():
+        data = json.dumps(payload)
+        results[name] = bytes_per_object(lambda: telegram.Message(replace_dictionary_keys(json.loads(data))), count)
+
+    entity_data = json.dumps(ENTITIES[0])
+    results["entity"] = bytes_per_object(lambda: telegram.MessageEntity(json.loads(entity_data)), count)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure the memory retained by parsed Telegram messages, with and "
+                                                 "without interning users and chats.")
+    parser.add_argument("--messages", type=int, default=10_000, help="Amount of messages to create of every payload.")
+    args = parser.parse_args()
+
+    results = measure(args.messages)
+    pool = telegram.InternPool()
+    with pool.activate():
+        interned_results = measure(args.messages)
+    reused = pool.reused
+
+    print(f"{'payload':<10}{'bytes per message':>20}{'interned':>12}")
+    for name, size in results.items():
+        print(f"{name:<10}{size:>20.0f}{interned_results[name]:>12.0f}")
+    print(f"\nReused {reused / (args.messages * len(MESSAGES)):.2f} users and chats per message when interned")
+
+
+if __name__ == "__main__":
+    main()
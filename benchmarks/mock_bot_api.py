@@ -0,0 +1,315 @@
+"""
+MIT License
+
+Copyright (c) 2025 Niko Mätäsaho
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import argparse
+import asyncio
+import logging
+import random
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from aiohttp import web
+
+import telegram
+
+from benchmarks.payloads import updates
+
+
+_logger = logging.getLogger(__name__)
+
+# Telegram Bot API returns at most this many updates at once
+_MAX_UPDATES_LIMIT = 100
+
+
+class MockBotApi:
+
+    def __init__(
+            self,
+            token: str = "TOKEN",
+            latency: float = 0,
+            fault_rate: float = 0,
+            fault_statuses: Tuple[int, ...] = (429, 500, 502),
+            retry_after: int = 1,
+            file_size: int = 100_000,
+            max_poll_timeout: float = 50
+    ):
+        """
+        A local stand-in for the Telegram Bot API serving getUpdates, getFile and file downloads, for testing the bot
+        without network or a bot token. Updates are queued with ``enqueue`` or ``stream``, and returned by getUpdates
+        with the same long polling and offset semantics as the real API.
+
+        :param token: Bot token the requests must use.
+        :param latency: Time in seconds to wait before every response.
+        :param fault_rate: Share of requests, between 0 and 1, to fail with one of the fault statuses.
+        :param fault_statuses: HTTP status codes of the failed requests. Status 429 tells to retry after
+                               ``retry_after`` seconds, like the real API does when rate limiting.
+        :param retry_after: Time in seconds to tell clients to wait after a 429 response.
+        :param file_size: Size of the served files in bytes, unless set per file with ``add_file``.
+        :param max_poll_timeout: Maximum time in seconds to hold a getUpdates request open waiting for updates.
+        """
+        self.token = token
+        self.latency = latency
+        self.fault_rate = fault_rate
+        self.fault_statuses = fault_statuses
+        self.retry_after = retry_after
+        self.file_size = file_size
+        self.max_poll_timeout = max_poll_timeout
+
+        self.requests: Dict[str, int] = {}
+        self.faults = 0
+        self.enqueued_at: Dict[int, float] = {}
+        self._updates: List[dict] = []
+        self._next_update_id = 1
+        self._new_updates = asyncio.Condition()
+        self._file_sizes: Dict[str, int] = {}
+        self._contents: Dict[int, bytes] = {}
+        self._runner: Optional[web.AppRunner] = None
+
+        self.app = web.Application()
+        self.app.router.add_route("*", "/bot{token}/{method}", self._handle_method)
+        self.app.router.add_get("/file/bot{token}/{file_path:.+}", self._handle_download)
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """
+        Start serving the API.
+
+        :param host: Host to listen to.
+        :param port: Port to listen to. If 0, a free port is chosen.
+        :return: Base URL of the server, to be given to ``telegram.Client``.
+        """
+        self._runner = web.AppRunner(self.app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        _logger.info(f"Mock Telegram Bot API listening on http://{host}:{port}")
+        return f"http://{host}:{port}"
+
+    async def close(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    @property
+    def pending(self) -> int:
+        """
+        Amount of updates not yet confirmed by a client.
+        """
+        return len(self._updates)
+
+    async def enqueue(self, new_updates: Iterable[dict]) -> None:
+        """
+        Add updates to be returned by getUpdates. The update IDs are replaced with consecutive IDs.
+
+        :param new_updates: Raw update payloads.
+        """
+        now = time.perf_counter()
+        for update in new_updates:
+            update = dict(update, update_id=self._next_update_id)
+            self.enqueued_at[self._next_update_id] = now
+            self._updates.append(update)
+            self._next_update_id += 1
+
+        async with self._new_updates:
+            self._new_updates.notify_all()
+
+    async def stream(self, batches: Iterable[Tuple[float, List[dict]]], speed: float = 1) -> None:
+        """
+        Add batches of updates at the times they were received, e.g. from a journal recorded by the bot.
+
+        :param batches: Tuples of the Unix timestamp when a batch was received and the raw updates in it, e.g. from
+                        ``telegram.read_journal``.
+        :param speed: Speed relative to the recorded speed. Set to 0 to add all updates at once.
+        """
+        start = time.perf_counter()
+        first_received = None
+        for received, batch in batches:
+            if speed > 0:
+                if first_received is None:
+                    first_received = received
+                delay = (received - first_received) / speed - (time.perf_counter() - start)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            await self.enqueue(batch)
+
+    def add_file(self, file_id: str, size: int) -> None:
+        """
+        Set the size of a file to serve.
+
+        :param file_id: ID of the file.
+        :param size: Size of the file in bytes.
+        """
+        self._file_sizes[file_id] = size
+
+    @staticmethod
+    def _error(status: int, description: str, **parameters) -> web.Response:
+        payload = dict(ok=False, error_code=status, description=description)
+        if parameters:
+            payload["parameters"] = parameters
+        return web.json_response(payload, status=status)
+
+    async def _fault(self) -> Optional[web.Response]:
+        """
+        Wait for the injected latency, and fail the request with the configured fault rate.
+        """
+        if self.latency > 0:
+            await asyncio.sleep(self.latency)
+        if self.fault_rate <= 0 or random.random() >= self.fault_rate:
+            return None
+
+        self.faults += 1
+        status = random.choice(self.fault_statuses)
+        if status == 429:
+            return self._error(status, f"Too Many Requests: retry after {self.retry_after}",
+                               retry_after=self.retry_after)
+        return self._error(status, "Internal Server Error")
+
+    async def _handle_method(self, request: web.Request) -> web.Response:
+        method = request.match_info["method"]
+        self.requests[method] = self.requests.get(method, 0) + 1
+        if request.match_info["token"] != self.token:
+            return self._error(401, "Unauthorized")
+
+        fault = await self._fault()
+        if fault is not None:
+            return fault
+
+        params = dict(request.query)
+        if request.can_read_body:
+            params.update(await request.post())
+        if method == "getUpdates":
+            return web.json_response(dict(ok=True, result=await self._get_updates(params)))
+        if method == "getFile":
+            return self._get_file(params)
+        return self._error(404, "Not Found")
+
+    async def _get_updates(self, params: dict) -> List[dict]:
+        offset = int(params.get("offset", 0))
+        limit = min(int(params.get("limit", _MAX_UPDATES_LIMIT)), _MAX_UPDATES_LIMIT)
+        timeout = min(float(params.get("timeout", 0)), self.max_poll_timeout)
+
+        if offset < 0:
+            # A negative offset returns the updates from the end of the queue and forgets the rest
+            del self._updates[:offset]
+        elif offset > 0:
+            # Updates before the offset are confirmed and forgotten
+            self._updates = [u for u in self._updates if u["update_id"] >= offset]
+
+        async with self._new_updates:
+            if not self._updates and timeout > 0:
+                try:
+                    await asyncio.wait_for(self._new_updates.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+
+        return self._updates[:limit]
+
+    def _get_file(self, params: dict) -> web.Response:
+        file_id = params.get("file_id")
+        if not file_id:
+            return self._error(400, "Bad Request: file_id not specified")
+
+        size = self._file_sizes.get(file_id, self.file_size)
+        return web.json_response(dict(ok=True, result=dict(file_id=file_id, file_unique_id=f"unique-{file_id}",
+                                                           file_size=size, file_path=f"documents/{file_id}.bin")))
+
+    async def _handle_download(self, request: web.Request) -> web.Response:
+        self.requests["download"] = self.requests.get("download", 0) + 1
+        if request.match_info["token"] != self.token:
+            return self._error(401, "Unauthorized")
+
+        fault = await self._fault()
+        if fault is not None:
+            return fault
+
+        file_id = request.match_info["file_path"].split("/")[-1].removesuffix(".bin")
+        size = self._file_sizes.get(file_id, self.file_size)
+        # Files of the same size share their content
+        content = self._contents.get(size)
+        if content is None:
+            content = self._contents.setdefault(size, random.randbytes(size))
+        return web.Response(body=content, content_type="application/octet-stream")
+
+
+async def generate_updates(mock_api: MockBotApi, rate: float, duration: float = None) -> int:
+    """
+    Add generated updates of typical messages to the mock API at a steady rate.
+
+    :param mock_api: The mock API to add the updates to.
+    :param rate: Amount of updates to add per second.
+    :param duration: Time in seconds to add updates for. If omitted, updates are added until cancelled.
+    :return: Amount of added updates.
+    """
+    start = time.perf_counter()
+    added = 0
+    while duration is None or time.perf_counter() - start < duration:
+        # Catch up with the rate in batches every 10 milliseconds
+        due = int((time.perf_counter() - start) * rate) - added
+        if due > 0:
+            await mock_api.enqueue(updates(due, added))
+            added += due
+        await asyncio.sleep(0.01)
+    return added
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve a mock Telegram Bot API for testing the bot offline. Point "
+                                                 "telegram.Client to it with parameter base_url.")
+    parser.add_argument("--host", default="127.0.0.1", help="Host to listen to.")
+    parser.add_argument("--port", type=int, default=8081, help="Port to listen to.")
+    parser.add_argument("--token", default="TOKEN", help="Bot token the requests must use.")
+    parser.add_argument("--rate", type=float, default=10, help="Amount of generated updates to add per second.")
+    parser.add_argument("--journal", help="Stream the updates of a journal recorded by the bot instead of generated "
+                                          "updates.")
+    parser.add_argument("--speed", type=float, default=1, help="Speed to stream the journal at, relative to the "
+                                                               "recorded speed. Set to 0 to add all at once.")
+    parser.add_argument("--latency", type=float, default=0, help="Time in seconds to wait before every response.")
+    parser.add_argument("--fault-rate", type=float, default=0, help="Share of requests to fail, between 0 and 1.")
+    parser.add_argument("--file-size", type=int, default=100_000, help="Size of the served files in bytes.")
+    args = parser.parse_args()
+
+    mock_api = MockBotApi(args.token, args.latency, args.fault_rate, file_size=args.file_size)
+
+    async def run() -> None:
+        base_url = await mock_api.start(args.host, args.port)
+        print(f"Serving mock Telegram Bot API at {base_url} with token '{args.token}'")
+        try:
+            if args.journal:
+                await mock_api.stream(telegram.read_journal(args.journal), args.speed)
+                # Keep serving the streamed updates
+                await asyncio.Event().wait()
+            else:
+                await generate_updates(mock_api, args.rate)
+        finally:
+            await mock_api.close()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+MIT License
+
+Copyright (c) 2025 Niko Mätäsaho
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+from typing import List
+
+
+CHAT = {"id": -1001234567890, "title": "Glasnost", "type": "channel"}
+USER = {"id": 123456789, "is_bot": False, "first_name": "Niko", "username": "glasnost"}
+TEXT = "Breaking news: the bot now forwards messages with less memory. Read more at example.com"
+ENTITIES = [
+    {"type": "bold", "offset": 0, "length": 13},
+    {"type": "italic", "offset": 14, "length": 7},
+    {"type": "url", "offset": 77, "length": 11}
+]
+PHOTO = [
+    {"file_id": f"AgACAgQAAxkBAAIB{size}", "file_unique_id": f"AQADq7{size}", "file_size": size * 100, "width": size,
+     "height": size}
+    for size in (90, 320, 800, 1280)
+]
+
+# Typical Telegram messages as they are received from the Bot API
+MESSAGES = {
+    "text": dict(message_id=1, chat=CHAT, date=1735689600, text=TEXT, entities=ENTITIES),
+    "photo": dict(message_id=1, chat=CHAT, date=1735689600, photo=PHOTO, caption=TEXT, caption_entities=ENTITIES),
+    "forward": dict(message_id=1, chat=CHAT, date=1735689600, text=TEXT, entities=ENTITIES,
+                    forward_origin={"type": "user", "date": 1735680000, "sender_user": USER}),
+    "reply": dict(message_id=2, chat=CHAT, date=1735689600, text=TEXT,
+                  reply_to_message=dict(message_id=1, chat=CHAT, date=1735689000, text=TEXT, entities=ENTITIES)),
+    "group": {"message_id": 1, "chat": dict(CHAT, type="supergroup"), "date": 1735689600, "text": TEXT,
+              "entities": ENTITIES, "from": USER, "message_thread_id": 5, "is_topic_message": True,
+              "edit_date": 1735689700}
+}
+
+
+def updates(count: int, start: int = 0) -> List[dict]:
+    """
+    Generate a batch of raw updates of the typical messages in turns, as the result of a getUpdates request.
+
+    :param count: Amount of updates to generate.
+    :param start: ID of the first update.
+    :return: List of update payloads.
+    """
+    messages = list(MESSAGES.values())
+    return [{"update_id": i, "channel_post": dict(messages[i % len(messages)], message_id=i)}
+            for i in range(start, start + count)]
@@ -0,0 +1,162 @@
+"""
+MIT License
+
+Copyright (c) 2025 Niko Mätäsaho
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+import discord
+
+from database_handler import DatabaseHandler, REFERENCE_STORE_BACKENDS, create_reference_store
+from reference_stores import NewReference, ReferenceStore
+
+
+# Telegram chat of the benchmarked message references
+_TG_CHAT_ID = -1001234567890
+# References are spread over this many seconds before the current time
+_TIME_SPAN = 30 * 24 * 60 * 60
+_BULK_SIZE = 10_000
+
+
+class _Message:
+
+    __slots__ = (
+        "id",
+        "channel",
+        "guild",
+        "webhook_id"
+    )
+
+    def __init__(self, message_id: int, channel_id: int):
+        """
+        The attributes of a Discord message needed for storing a reference to it.
+        """
+        self.id = message_id
+        self.channel = discord.Object(channel_id)
+        self.guild = discord.Object(1)
+        self.webhook_id = None
+
+    def to_message_reference_dict(self) -> dict:
+        return dict(message_id=self.id, channel_id=self.channel.id)
+
+
+def references(start: int, count: int, now: int) -> List[NewReference]:
+    """
+    Generate message references of Telegram messages forwarded to two Discord channels.
+
+    :param start: Index of the first reference.
+    :param count: Amount of references to generate.
+    :param now: Timestamp of the most recent reference.
+    :return: List of arguments of ``ReferenceStore.add``.
+    """
+    return [(_TG_CHAT_ID, i // 2, _Message(i, i % 2), now - _TIME_SPAN + i * 7 % _TIME_SPAN)
+            for i in range(start, start + count)]
+
+
+def open_store(backend: str, directory: str) -> ReferenceStore:
+    database_path = os.path.join(directory, f"{backend}.db")
+    store = create_reference_store(backend, database_path)
+    return store if store is not None else DatabaseHandler(database_path)
+
+
+def time_operations(operation: Callable[[int], object], arguments: List[int]) -> List[float]:
+    """
+    Time an operation with every argument.
+
+    :return: Durations of the operations in seconds.
+    """
+    durations = []
+    for argument in arguments:
+        start = time.perf_counter()
+        operation(argument)
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def percentile(durations: List[float], share: float) -> float:
+    ordered = sorted(durations)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * share))]
+
+
+def measure(store: ReferenceStore, rows: int, operations: int) -> Dict[str, float]:
+    """
+    Measure the throughput and latency of inserting and looking up references in a store.
+
+    :param store: An empty reference store.
+    :param rows: Amount of references to insert to the store in bulk before measuring single operations.
+    :param operations: Amount of single inserts and lookups to measure.
+    :return: Dictionary of measurement names and results.
+    """
+    now = int(time.time())
+    start = time.perf_counter()
+    for i in range(0, rows, _BULK_SIZE):
+        store.add_many(references(i, min(_BULK_SIZE, rows - i), now))
+    bulk_time = time.perf_counter() - start
+
+    new_references = references(rows, operations, now)
+    add_durations = time_operations(lambda i: store.add(*new_references[i]), list(range(operations)))
+    tg_message_ids = [random.randrange(rows // 2) for _ in range(operations)]
+    get_durations = time_operations(lambda tg_message_id: store.get(_TG_CHAT_ID, tg_message_id), tg_message_ids)
+
+    return {
+        "bulk insert (rows/s)": rows / bulk_time,
+        "insert (ops/s)": operations / sum(add_durations),
+        "insert p99 (ms)": percentile(add_durations, 0.99) * 1000,
+        "lookup (ops/s)": operations / sum(get_durations),
+        "lookup p99 (ms)": percentile(get_durations, 0.99) * 1000
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure insert and lookup throughput and latency of the message "
+                                                 "reference store backends.")
+    parser.add_argument("--rows", type=int, default=200_000, help="Amount of message references in the stores.")
+    parser.add_argument("--operations", type=int, default=1000, help="Amount of single operations to measure.")
+    parser.add_argument("--backends", nargs="+", choices=REFERENCE_STORE_BACKENDS, default=REFERENCE_STORE_BACKENDS,
+                        help="Backends to measure.")
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for backend in args.backends:
+            print(f"Measuring backend {backend} with {args.rows} message references...")
+            store = open_store(backend, directory)
+            try:
+                results[backend] = measure(store, args.rows, args.operations)
+            finally:
+                store.close()
+
+    print()
+    names = list(next(iter(results.values())))
+    print(f"{'backend':<10}" + "".join(f"{name:>22}" for name in names))
+    for backend, measurements in results.items():
+        print(f"{backend:<10}" + "".join(f"{measurements[name]:>22.3f}" for name in names))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,311 @@
+"""
+MIT License
+
+Copyright (c) 2025 Niko Mätäsaho
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import argparse
+import json
+import os
+import platform
+import random
+import re
+import sys
+import tempfile
+import time
+from datetime import datetime, UTC
+from typing import Callable, Dict, List
+
+import telegram
+from telegram.utils import MediaCache, replace_dictionary_keys
+from database_handler import DatabaseHandler
+
+from benchmarks.payloads import MESSAGES, updates
+from benchmarks.reference_stores import references, time_operations, percentile
+
+
+# Telegram chat of the benchmarked message references, the same as in benchmarks.reference_stores
+_TG_CHAT_ID = -1001234567890
+# The connection profile of the default bot configuration
+_DATABASE_PROFILE = dict(journal_mode="WAL", synchronous="NORMAL")
+_BULK_SIZE = 10_000
+# Percentage of results changing less than this in compare mode is reported as noise
+_NOISE_THRESHOLD = 5
+
+Results = Dict[str, Dict[str, float]]
+
+
+def summarize(durations: List[float]) -> Dict[str, float]:
+    """
+    Summarize the durations of single operations.
+
+    :param durations: Durations of the operations in seconds.
+    :return: Median and p99 duration in microseconds, and the throughput in operations per second.
+    """
+    return {
+        "median_us": percentile(durations, 0.5) * 1_000_000,
+        "p99_us": percentile(durations, 0.99) * 1_000_000,
+        "ops_per_s": len(durations) / sum(durations)
+    }
+
+
+def measure_parsing(operations: int) -> Results:
+    """
+    Measure parsing updates of the typical messages, and parsing a batch of updates from an API response.
+    """
+    results = {}
+    for name, message in MESSAGES.items():
+        payload = {"update_id": 1, "channel_post": message}
+        results[f"update/{name}"] = summarize(time_operations(
+            lambda _: telegram.Update(replace_dictionary_keys(payload)), list(range(operations))))
+
+    batch = updates(100)
+    results["api_response/100_updates"] = summarize(time_operations(
+        lambda _: telegram.ApiResponse(dict(ok=True, result=batch)).result, list(range(max(operations // 100, 10)))))
+    return results
+
+
+def markdown_message(length: int, density: int, nesting: int) -> telegram.Message:
+    """
+    Create a message with formatted text.
+
+    :param length: Length of the text.
+    :param density: Amount of formatted parts per 100 characters.
+    :param nesting: Amount of formatting entities applied to every formatted part.
+    :return: The message.
+    """
+    entity_types = ["bold", "italic", "underline", "strikethrough", "spoiler"]
+    text = ("Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * (length // 57 + 1))[:length]
+    entities = []
+    step = 100 // density if density else length
+    for offset in range(0, length - 5, step):
+        for entity_type in entity_types[:nesting]:
+            entities.append({"type": entity_type, "offset": offset, "length": 5})
+
+    return telegram.Message(dict(message_id=1, chat=MESSAGES["text"]["chat"], date=1735689600, text=text,
+                                 entities=entities))
+
+
+def measure_markdown(operations: int) -> Results:
+    """
+    Measure converting messages to Markdown with varying density and nesting of formatting.
+    """
+    results = {}
+    for density in (0, 5, 20):
+        for nesting in (1, 3) if density else (1, ):
+            message = markdown_message(1000, density, nesting)
+            # Dense messages are slow to convert, so fewer conversions are measured
+            results[f"markdown/density_{density}_nesting_{nesting}"] = summarize(time_operations(
+                lambda _: message.markdown(), list(range(max(operations // 10, 10)))))
+    return results
+
+
+def measure_media_cache(operations: int) -> Results:
+    """
+    Measure adding files to the media cache and getting them from it.
+    """
+    cache = MediaCache()
+    files = [telegram.File(dict(file_id=f"file{i}", file_unique_id=f"unique{i}", file_size=1000,
+                                file_path=f"photos/file_{i}.jpg"))
+             for i in range(operations)]
+    return {
+        "media_cache/add": summarize(time_operations(lambda i: cache.add(files[i]), list(range(operations)))),
+        "media_cache/get": summarize(time_operations(lambda i: cache.get(f"unique{i}"), list(range(operations)))),
+        "media_cache/get_missing": summarize(time_operations(lambda i: cache.get(f"missing{i}"),
+                                                             list(range(operations))))
+    }
+
+
+def populate(database_path: str, rows: int, now: int) -> DatabaseHandler:
+    """
+    Create a database with the given amount of message references.
+
+    :param database_path: Path to the database file to create.
+    :param rows: Amount of message references to insert.
+    :param now: Timestamp of the most recent reference.
+    :return: Handler connected to the database.
+    """
+    handler = DatabaseHandler(database_path, profile=_DATABASE_PROFILE)
+    for i in range(0, rows, _BULK_SIZE):
+        handler.add_many(references(i, min(_BULK_SIZE, rows - i), now))
+    return handler
+
+
+def measure_database(rows: int, operations: int) -> Results:
+    """
+    Measure the operations of ``DatabaseHandler`` on a database of the given size.
+
+    :param rows: Amount of message references in the database.
+    :param operations: Amount of single operations to measure.
+    """
+    now = int(time.time())
+    arguments = list(range(operations))
+    prefix = f"database/{rows}"
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        handler = populate(os.path.join(directory, "benchmark.db"), rows, now)
+        try:
+            # References of new Telegram messages after the existing ones
+            new_references = references(rows, operations * 102, now)
+            results[f"{prefix}/add"] = summarize(time_operations(lambda i: handler.add(*new_references[i]),
+                                                                 arguments))
+            results[f"{prefix}/add_many_100"] = summarize(time_operations(
+                lambda i: handler.add_many(new_references[operations + i * 100:operations + (i + 1) * 100]),
+                arguments))
+
+            tg_message_ids = [random.randrange(rows // 2) for _ in arguments]
+            results[f"{prefix}/get"] = summarize(time_operations(
+                lambda i: handler.get(_TG_CHAT_ID, tg_message_ids[i]), arguments))
+            results[f"{prefix}/get_missing"] = summarize(time_operations(
+                lambda i: handler.get(_TG_CHAT_ID, -i), arguments))
+            # Operations reading all partitions are measured fewer times
+            results[f"{prefix}/get_recent_1000"] = summarize(time_operations(
+                lambda _: handler.get_recent(1000), arguments[:10]))
+            results[f"{prefix}/get_max_tg_message_ids"] = summarize(time_operations(
+                lambda _: handler.get_max_tg_message_ids(), arguments[:10]))
+            results[f"{prefix}/partitions"] = summarize(time_operations(lambda _: handler.partitions(), arguments))
+            results[f"{prefix}/update_ts"] = summarize(time_operations(
+                lambda i: handler.update_ts(_TG_CHAT_ID, tg_message_ids[i], now), arguments))
+            results[f"{prefix}/delete_by_id"] = summarize(time_operations(
+                lambda i: handler.delete_by_id(_TG_CHAT_ID, tg_message_ids[i]), arguments))
+
+            outbox_ids = []
+            results[f"{prefix}/enqueue_deliveries"] = summarize(time_operations(
+                lambda i: outbox_ids.extend(handler.enqueue_deliveries(_TG_CHAT_ID, rows + i, [(0, None), (1, None)],
+                                                                       "{}", now)),
+                arguments))
+            results[f"{prefix}/get_due_deliveries"] = summarize(time_operations(
+                lambda _: handler.get_due_deliveries(now, 10), arguments))
+            results[f"{prefix}/postpone_delivery"] = summarize(time_operations(
+                lambda i: handler.postpone_delivery(outbox_ids[2 * i], now), arguments))
+            results[f"{prefix}/complete_delivery"] = summarize(time_operations(
+                lambda i: handler.complete_delivery(outbox_ids[2 * i], *new_references[operations * 101 + i]), arguments))
+            results[f"{prefix}/discard_delivery"] = summarize(time_operations(
+                lambda i: handler.discard_delivery(outbox_ids[2 * i + 1]), arguments))
+
+            start = time.perf_counter()
+            exported = sum(1 for _ in handler.export_references())
+            results[f"{prefix}/export_references"] = {"rows_per_s": exported / (time.perf_counter() - start)}
+
+            # Delete the oldest tenth of the references in ten steps
+            oldest = min(reference[3] for reference in references(0, min(rows, _BULK_SIZE), now))
+            step = (now - oldest) // 100
+            results[f"{prefix}/delete_by_age"] = summarize(time_operations(
+                lambda i: handler.delete_by_age(oldest + (i + 1) * step), list(range(10))))
+        finally:
+            handler.disconnect()
+
+    return results
+
+
+def run(rows: List[int], operations: int, pattern: str = None) -> dict:
+    """
+    Run the benchmarks.
+
+    :param rows: Database sizes to measure the database operations with.
+    :param operations: Amount of single operations to measure in every benchmark.
+    :param pattern: Regular expression of the benchmark groups to run, e.g. ``markdown|database``. If omitted, all
+                    benchmarks are run.
+    :return: The results with information about the environment they were measured in.
+    """
+    groups: Dict[str, Callable[[], Results]] = {
+        "parsing": lambda: measure_parsing(operations),
+        "markdown": lambda: measure_markdown(operations),
+        "media_cache": lambda: measure_media_cache(operations)
+    }
+    for row_count in rows:
+        groups[f"database/{row_count}"] = lambda row_count=row_count: measure_database(row_count, operations)
+
+    results = {}
+    for name, measure in groups.items():
+        if pattern and not re.search(pattern, name):
+            continue
+        print(f"Measuring {name}...", file=sys.stderr)
+        results.update(measure())
+
+    return {
+        "created": datetime.now(UTC).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "operations": operations,
+        "results": results
+    }
+
+
+def compare(old: dict, new: dict) -> None:
+    """
+    Print the changes between two runs of the benchmarks. Only benchmarks and values present in both runs are
+    compared.
+
+    :param old: Results of the baseline run.
+    :param new: Results of the run to compare to the baseline.
+    """
+    print(f"{'benchmark':<46}{'value':>14}{'old':>14}{'new':>14}{'change':>10}")
+    for name, old_values in old["results"].items():
+        new_values = new["results"].get(name)
+        if new_values is None:
+            continue
+        for value_name, old_value in old_values.items():
+            if value_name not in new_values:
+                continue
+            new_value = new_values[value_name]
+            change = (new_value - old_value) / old_value * 100 if old_value else 0
+            # Durations are better when lower, throughputs when higher
+            improved = change < 0 if value_name.endswith("_us") else change > 0
+            verdict = "" if abs(change) < _NOISE_THRESHOLD else "better" if improved else "worse"
+            print(f"{name:<46}{value_name:>14}{old_value:>14.2f}{new_value:>14.2f}{change:>+9.1f}% {verdict}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure the hot paths of parsing updates, converting messages to "
+                                                 "Markdown, caching media and storing message references, or "
+                                                 "compare two earlier runs.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Run the benchmarks and write the results as JSON.")
+    run_parser.add_argument("--output", help="File to write the results to. If omitted, the results are printed.")
+    run_parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000],
+                            help="Database sizes to measure the database operations with.")
+    run_parser.add_argument("--operations", type=int, default=1000,
+                            help="Amount of single operations to measure in every benchmark.")
+    run_parser.add_argument("--filter", help="Regular expression of the benchmark groups to run, e.g. 'markdown'.")
+
+    compare_parser = subparsers.add_parser("compare", help="Compare the results of two runs.")
+    compare_parser.add_argument("old", help="Results of the baseline run.")
+    compare_parser.add_argument("new", help="Results of the run to compare to the baseline.")
+    args = parser.parse_args()
+
+    if args.command == "compare":
+        with open(args.old, encoding="utf-8") as old_file, open(args.new, encoding="utf-8") as new_file:
+            compare(json.load(old_file), json.load(new_file))
+        return
+
+    results = json.dumps(run(args.rows, args.operations, args.filter), indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(results + "\n")
+    else:
+        print(results)
+
+
+if __name__ == "__main__":
+    main()
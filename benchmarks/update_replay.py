@@ -0,0 +1,105 @@
+"""
+MIT License
+
+Copyright (c) 2025 Niko Mätäsaho
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import argparse
+import asyncio
+import time
+from typing import Dict
+
+import telegram
+
+
+class _StandInListeners:
+
+    def __init__(self):
+        """
+        Listeners standing in for the Telegram cog. Convert the messages like the cog does before forwarding them, but
+        do not send them anywhere.
+        """
+        self.messages = 0
+        self.edits = 0
+
+    @staticmethod
+    def _convert(message: telegram.Message) -> None:
+        message.markdown()
+        message.get_all_media()
+
+    async def on_message(self, message: telegram.Message) -> None:
+        self._convert(message)
+        self.messages += 1
+
+    async def on_message_edit(self, message: telegram.Message) -> None:
+        self._convert(message)
+        self.edits += 1
+
+
+async def replay(journal: str, speed: float, intern_objects: bool) -> Dict[str, float]:
+    """
+    Replay a journal of Telegram updates through update parsing and stand-in listeners.
+
+    :param journal: Directory of the journal, or a single segment file.
+    :param speed: Replay speed relative to the recorded speed. Set to 0 to replay as fast as possible.
+    :param intern_objects: Reuse identical users and chats between updates.
+    :return: Dictionary of measurement names and results.
+    """
+    client = telegram.Client(asyncio.get_running_loop(), intern_objects=intern_objects)
+    listeners = _StandInListeners()
+    client.add_listener(listeners.on_message)
+    client.add_listener(listeners.on_message_edit)
+
+    start = time.perf_counter()
+    try:
+        updates = await client.replay(telegram.read_journal(journal), speed)
+    finally:
+        await client._client_session.close()
+    duration = time.perf_counter() - start
+
+    return {
+        "updates": updates,
+        "messages": listeners.messages,
+        "edits": listeners.edits,
+        "duration (s)": duration,
+        "throughput (updates/s)": updates / duration if duration else 0
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay a journal of Telegram updates recorded by the bot, and "
+                                                 "measure the throughput of parsing and converting them. Works "
+                                                 "offline.")
+    parser.add_argument("journal", help="Directory of the journal, or a single segment file.")
+    parser.add_argument("--speed", type=float, default=0,
+                        help="Replay speed relative to the recorded speed, e.g. 1 for the recorded speed or 10 for "
+                             "ten times faster. Defaults to 0, which replays as fast as possible.")
+    parser.add_argument("--intern", action="store_true", help="Reuse identical users and chats between updates.")
+    args = parser.parse_args()
+
+    results = asyncio.run(replay(args.journal, args.speed, args.intern))
+    for name, value in results.items():
+        print(f"{name:<24}{value:>12.2f}" if isinstance(value, float) else f"{name:<24}{value:>12}")
+
+
+if __name__ == "__main__":
+    main()
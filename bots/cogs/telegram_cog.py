@@ -22,24 +22,64 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
-from typing import List, Optional, Union
+from typing import List, Optional, Union, Tuple, Callable, Awaitable, Dict, Set
 from datetime import datetime, UTC, timedelta
 from pathlib import Path
+import asyncio
 import logging
 import copy
 
 import toml
 import discord
-import filetype
 from discord.ext import commands, tasks
 
 import telegram
 from config import Config
 from bots import DiscordBot, TelegramBot
-from database_handler import DatabaseHandler
+from bots.media import SharedFile, SNIFF_HEADER_SIZE, to_discord_files, append_attachment_urls, guess_extension
+from bots.message_cache import DiscordMessageCache
+from bots.delivery import DeliveryScheduler, RouteKey, message_route, webhook_route
+from bots.edit_coalescer import EditCoalescer
+from bots.webhooks import WebhookManager, PartialWebhookMessage, webhook_username
+from bots.pending_forwards import PendingForwards
+from bots.outbox import MediaReference, OutboxPayload, OutboxDelivery
+from bots.startup_buffer import StartupBuffer
+from bots.image_transform import ImageTransformer
+from bots.database_backup import DatabaseBackups
+from database_handler import AsyncDatabaseHandler, CONNECTION_PRAGMAS
 
 
 _logger = logging.getLogger(__name__)
+_Target = Union[discord.abc.Messageable, discord.Message, discord.PartialMessage]
+_OUTBOX_RETRY_DELAY = 30
+_OUTBOX_MAX_RETRY_DELAY = 3600
+# Telegram Bot API does not allow downloading bigger files
+_TELEGRAM_MAX_DOWNLOAD_SIZE = 20_000_000
+
+
+def _delivery(
+        deliver: Callable[[_Target, Optional[str], List[discord.File]], Awaitable[discord.Message]],
+        target: _Target,
+        text: Optional[str],
+        files: Optional[List[SharedFile]]
+) -> Callable[[], Awaitable[discord.Message]]:
+    """
+    Bind a delivery to its target and content. New ``discord.File`` objects are created every time the delivery is
+    made, as a retried delivery cannot reuse already consumed files.
+    """
+    return lambda: deliver(target, text, to_discord_files(files))
+
+
+def _edit_route(message: Union[discord.Message, discord.PartialMessage, PartialWebhookMessage]) -> RouteKey:
+    """
+    Get the Discord API route of editing a message. Webhook messages are edited through their webhooks.
+    """
+    if isinstance(message, PartialWebhookMessage):
+        return webhook_route(message.webhook.id, "PATCH")
+    webhook_id = getattr(message, "webhook_id", None)
+    if webhook_id is not None:
+        return webhook_route(webhook_id, "PATCH")
+    return message_route(message.channel.id, "PATCH")
 
 
 class TelegramCog(commands.Cog):
@@ -51,11 +91,50 @@ class TelegramCog(commands.Cog):
         self.config = Config("config.toml")
         self.telegram_bot = TelegramBot(bot.loop, self.config)
         self.discord_bot = bot
-        self.database_handler = DatabaseHandler(self.config.general.database_path)
+        database_profile = {pragma: getattr(self.config.database, pragma) for pragma in CONNECTION_PRAGMAS}
+        # Message references stored before Telegram chat IDs were forwarded from the configured chat
+        migration_defaults = dict(tg_chat_id=self.config.channel_ids.telegram)
+        self.database_handler = AsyncDatabaseHandler(self.config.general.database_path, profile=database_profile,
+                                                     reference_cache_size=self.config.database.reference_cache_size,
+                                                     warm_references=self.config.database.warm_references,
+                                                     migration_defaults=migration_defaults,
+                                                     backend=self.config.database.backend)
+        self.database_backups = DatabaseBackups(self.database_handler, self.config.database.backup_directory,
+                                                self.config.database.backup_retention)
+        self.startup_buffer = StartupBuffer()
+        self.message_cache = DiscordMessageCache()
+        self.delivery_scheduler = DeliveryScheduler(bot.rate_limits)
+        self.webhooks = WebhookManager(bot)
+        self.pending_forwards = PendingForwards(self.config.preferences.pending_forward_timeout)
+        self.edit_coalescer = EditCoalescer(self.apply_message_edit, self.config.preferences.edit_debounce_seconds)
+        self.image_transformer = ImageTransformer(self.config.media.max_concurrent_transforms,
+                                                  self.config.media.image_quality,
+                                                  self.config.media.max_image_dimension)
+        # Outbox IDs of deliveries being attempted, so that the retry loop does not attempt them concurrently
+        self._delivering: Set[int] = set()
 
     def load_configuration(self):
         self.config.load()
         self.telegram_bot.load_config(self.config)
+        self.edit_coalescer.delay = self.config.preferences.edit_debounce_seconds
+        self.pending_forwards.timeout = self.config.preferences.pending_forward_timeout
+        self.image_transformer.configure(self.config.media.max_concurrent_transforms, self.config.media.image_quality,
+                                         self.config.media.max_image_dimension)
+        self.database_backups.configure(self.config.database.backup_directory, self.config.database.backup_retention)
+        self.configure_backup_loop()
+
+    def configure_backup_loop(self):
+        """
+        Start, stop or reschedule the database backup task according to the configured backup interval.
+        """
+        interval = self.config.database.backup_interval
+        if interval <= 0:
+            self.database_backup_loop.cancel()
+            return
+
+        self.database_backup_loop.change_interval(hours=interval)
+        if not self.database_backup_loop.is_running():
+            self.database_backup_loop.start()
 
     def add_hooks(self):
         self.telegram_bot.add_listener(self.on_message)
@@ -65,12 +144,23 @@ class TelegramCog(commands.Cog):
         _logger.debug(f"Starting Telegram polling before loading {__name__}")
         self.add_hooks()
 
-        if not self.database_handler.connection:
+        if not self.database_handler.is_connected:
             _logger.debug(f"Connecting to database '{self.config.general.database_path}'")
             self.database_handler.connect(self.config.general.database_path)
 
-        self.database_cleanup_loop.start()
+        if self.config.media.downscale_images and not self.image_transformer.available:
+            _logger.warning("Downscaling images is enabled, but Pillow is not installed. Images too big to be sent to "
+                            "Discord are discarded.")
 
+        self.database_cleanup_loop.start()
+        self.outbox_delivery_loop.start()
+        self.configure_backup_loop()
+        if self.discord_bot.is_ready():
+            # The cog was reloaded, so there is nothing to wait for
+            self.startup_buffer.flush()
+
+        # The cog is loaded before the bot connects to Discord gateway. Messages received until the bot is ready are
+        # prepared and buffered in the meantime.
         try:
             self.telegram_bot.start(self.config.credentials.telegram)
         except ValueError:
@@ -80,18 +170,70 @@ class TelegramCog(commands.Cog):
         _logger.debug(f"Stopping Telegram polling before unloading {__name__}.")
         self.telegram_bot.stop()
         self.database_cleanup_loop.cancel()
-        self.database_handler.disconnect()
+        self.outbox_delivery_loop.cancel()
+        self.database_backup_loop.cancel()
+        await self.startup_buffer.close()
+        await self.edit_coalescer.close()
+        await self.delivery_scheduler.close()
+        self.image_transformer.close()
+        await self.database_handler.disconnect()
 
     @tasks.loop(hours=6)
     async def database_cleanup_loop(self) -> None:
         """
         A background task deleting Discord message references from the database at least X days old defined in the
-        configuration file.
+        configuration file, and outbox deliveries having run out of attempts.
         """
         threshold = self.config.preferences.message_cleanup_threshold
         _logger.debug(f"Running database auto cleanup task with timestamp threshold of {threshold} days.")
         upper_threshold_limit = datetime.now(UTC) - timedelta(days=threshold)
-        self.database_handler.delete_by_age(upper_threshold_limit)
+        await self.database_handler.delete_by_age(upper_threshold_limit)
+
+        # Deliveries may also run out of attempts if the limit is lowered between restarts
+        exhausted = await self.database_handler.delete_exhausted_deliveries(
+            self.config.preferences.outbox_max_attempts)
+        if exhausted:
+            _logger.warning(f"Deleted {exhausted} outbox deliveries out of attempts.")
+
+    @tasks.loop(hours=24)
+    async def database_backup_loop(self) -> None:
+        """
+        A background task backing up the database in the interval defined in the configuration file. The backup is
+        skipped if the latest backup is more recent than the interval, so that restarting the bot does not create a
+        new backup every time.
+        """
+        latest_age = self.database_backups.latest_age()
+        if latest_age is not None and latest_age < self.config.database.backup_interval * 3600:
+            _logger.debug(f"Latest database backup is {latest_age / 3600:.1f} hours old. Skipping backup.")
+            return
+
+        try:
+            await self.database_backups.create()
+        except Exception as e:
+            _logger.error(f"Database backup failed: {e}")
+
+    @tasks.loop(seconds=30)
+    async def outbox_delivery_loop(self) -> None:
+        """
+        A background task attempting due deliveries from the outbox. Retries failed deliveries, and resumes deliveries
+        left unfinished when the bot was stopped.
+        """
+        await self.discord_bot.wait_until_ready()
+        max_attempts = self.config.preferences.outbox_max_attempts
+        due_deliveries = await self.database_handler.get_due_deliveries(datetime.now(UTC), max_attempts)
+
+        # Deliveries of the same payload are attempted together, so that the files are downloaded only once
+        grouped_deliveries: Dict[Tuple[int, int, str], List[OutboxDelivery]] = {}
+        for outbox_id, tg_chat_id, tg_message_id, channel_id, reply_to_message_id, payload, attempts in due_deliveries:
+            if outbox_id in self._delivering:
+                continue
+            delivery = OutboxDelivery(outbox_id, tg_chat_id, tg_message_id, channel_id, reply_to_message_id,
+                                      OutboxPayload.from_json(payload), attempts)
+            grouped_deliveries.setdefault((tg_chat_id, tg_message_id, payload), []).append(delivery)
+
+        for (_, tg_message_id, _), deliveries in grouped_deliveries.items():
+            _logger.info(f"Attempting {len(deliveries)} outbox deliveries of Telegram message {tg_message_id}.")
+            await self.attempt_deliveries(deliveries, deliveries[0].payload)
 
     def fetch_message_sender_name(self, sender: Union[telegram.User, str, telegram.Chat]) -> str:
         """
@@ -129,202 +271,666 @@ class TelegramCog(commands.Cog):
             embed_content = f"**Fowarded from {forwarded_from_name}**\n\n" + embed_content
 
         embed = discord.Embed(description=embed_content)
-        if self.config.preferences.display_message_sender:
+        if self.config.preferences.display_message_sender and not self.config.preferences.use_webhooks:
             embed.title = self.fetch_message_sender_name(message.sender)
 
         return embed
 
-    async def fetch_message_files(self, message: telegram.Message, max_file_size: int = 10) -> List[discord.File]:
+    def fetch_webhook_username(self, message: telegram.Message) -> Optional[str]:
         """
-        Fetch all files present on a Telegram message and convert them to ``discord.File`` objects.
+        Fetch a webhook username for a Telegram message. When messages are sent through webhooks, the message sender
+        is shown as the webhook username instead of the embed title.
 
-        :param message: The telegram message.
-        :param max_file_size: Maximum file size in megabytes that can be sent to Discord. Files exceeding this limit
-                              will be discarded.
-        :return: A list of files in the message as ``discord.File`` objects.
+        :param message: A Telegram message object.
+        :return: The username, or None if the webhook default name should be used.
+        """
+        if not self.config.preferences.use_webhooks or not self.config.preferences.display_message_sender:
+            return None
+        return webhook_username(self.fetch_message_sender_name(message.sender))
+
+    @property
+    def max_file_size(self) -> int:
+        """
+        Maximum size of a file that can be sent to Discord in bytes.
+        """
+        return self.config.media.max_file_size * 1024 * 1024
+
+    def can_downscale(self, file: telegram.MediaBase) -> bool:
+        """
+        Check if a file too big to be sent to Discord can be downloaded and downscaled instead of discarding it.
+
+        :param file: A Telegram media object.
+        :return: True if the file is an image that can be downscaled.
         """
-        discord_files = []
-        telegram_files = message.get_all_media()
+        if not self.config.media.downscale_images or not self.image_transformer.available:
+            return False
+        if file.file_size > _TELEGRAM_MAX_DOWNLOAD_SIZE:
+            return False
+        return isinstance(file, telegram.PhotoSize) or (getattr(file, "mime_type", None) or "").startswith("image/")
 
-        for file in telegram_files:
-            if file.file_size > max_file_size * 1024 * 1024:
-                _logger.warning(f"Received a file bigger than maximum limit of {max_file_size} MB. "
+    def get_forwardable_media(self, message: telegram.Message) -> List[telegram.MediaBase]:
+        """
+        Get all files present on a Telegram message that can be sent to Discord. Files exceeding the maximum file size
+        are discarded, unless they are images that can be downscaled.
+
+        :param message: The telegram message.
+        :return: A list of media objects in the message.
+        """
+        media = []
+        for file in message.get_all_media():
+            if file.file_size > self.max_file_size and not self.can_downscale(file):
+                _logger.warning(f"Received a file bigger than maximum limit of {self.config.media.max_file_size} MB. "
                                 f"Discarding the file.")
                 continue
+            media.append(file)
 
-            file_bytes, filename = await self.telegram_bot.download_file(file)
-            with file_bytes:
-                if not Path(filename).suffix:
-                    # Guess the file extensions if missing to render file properly in Discord
-                    extension_guess = filetype.guess_extension(file_bytes)
-                    if extension_guess:
-                        filename = f"{filename}.{extension_guess}"
+        return media
+
+    def create_outbox_payload(self, message: telegram.Message) -> OutboxPayload:
+        """
+        Render a Telegram message to a payload that can be stored to the outbox and delivered to Discord. Files are
+        only referenced in the payload, they are downloaded when the payload is delivered.
+
+        :param message: A Telegram message object.
+        :return: The payload.
+        """
+        media = [MediaReference.from_media(file) for file in self.get_forwardable_media(message)]
+        return OutboxPayload(embed=self.create_discord_embed(message), username=self.fetch_webhook_username(message),
+                             media=media, spoiler=message.has_media_spoiler)
 
-                discord_file = discord.File(file_bytes, filename=filename, spoiler=message.has_media_spoiler)
-            discord_files.append(discord_file)
+    async def download_files(self, payload: OutboxPayload) -> List[SharedFile]:
+        """
+        Download all files referenced in a payload. The files are downloaded once and can be sent to any number of
+        Discord channels. Images too big to be sent to Discord are downscaled.
 
-        return discord_files
+        :param payload: The payload to download files for.
+        :return: A list of files in the payload as ``SharedFile`` objects.
+        """
+        shared_files = []
+
+        for media_reference in payload.media:
+            file_bytes, filename = await self.telegram_bot.download_file(media_reference.to_media())
+            with file_bytes:
+                # getvalue does not copy the downloaded bytes, it returns the buffer BytesIO was initialized with
+                data = file_bytes.getvalue()
+
+            if not Path(filename).suffix:
+                # Guess the file extensions if missing to render file properly in Discord
+                extension_guess = await guess_extension(data[:SNIFF_HEADER_SIZE], media_reference.mime_type)
+                if extension_guess:
+                    filename = f"{filename}.{extension_guess}"
+
+            shared_file = SharedFile(data, filename, spoiler=payload.spoiler)
+            if shared_file.size > self.max_file_size:
+                shared_file = await self.image_transformer.downscale(shared_file, self.max_file_size)
+                if shared_file is None:
+                    _logger.warning(f"Cannot downscale file {filename} under maximum limit of "
+                                    f"{self.config.media.max_file_size} MB. Discarding the file.")
+                    continue
+            shared_files.append(shared_file)
+
+        return shared_files
+
+    @commands.Cog.listener()
+    async def on_ready(self) -> None:
+        self.startup_buffer.flush()
 
     async def on_message(self, message: telegram.Message) -> None:
         """
         A listener method responsible for handling new messages from the Telegram client and forwarding them to Discord.
+        The message is marked pending until it is forwarded, so that replies and edits to it can wait for the forward.
+
+        Messages received before the Discord bot is ready are buffered, so that polling Telegram is not blocked.
 
         :param message: A ``telegram.Message`` object.
         """
+        if self.startup_buffer.is_buffering:
+            self.startup_buffer.add(lambda wait_turn: self.forward_buffered_message(message, wait_turn))
+            return
+
+        with self.pending_forwards.track(message.chat.id, message.message_id):
+            await self.forward_message(message)
+
+    async def forward_buffered_message(
+            self,
+            message: telegram.Message,
+            wait_turn: Callable[[], Awaitable[None]]
+    ) -> None:
+        """
+        Forward a Telegram message received before the Discord bot is ready. The message is rendered and its files are
+        downloaded while the bot connects to Discord, and it is forwarded when its turn comes.
+
+        :param message: A ``telegram.Message`` object.
+        :param wait_turn: Coroutine function waiting until the message can be forwarded.
+        """
+        with self.pending_forwards.track(message.chat.id, message.message_id):
+            payload = self.create_outbox_payload(message)
+            files = None
+            try:
+                files = await self.download_files(payload)
+            except Exception as e:
+                # The files are downloaded again when the message is delivered
+                _logger.warning(f"Failed to download files of Telegram message {message.message_id} in advance.",
+                                exc_info=e)
+
+            await wait_turn()
+            await self.forward_message(message, payload, files)
+
+    async def forward_message(
+            self,
+            message: telegram.Message,
+            payload: OutboxPayload = None,
+            files: List[SharedFile] = None
+    ) -> None:
+        """
+        Forward a new Telegram message to Discord.
+
+        :param message: A ``telegram.Message`` object.
+        :param payload: The message rendered in advance. If omitted, the message is rendered now.
+        :param files: Files of the payload downloaded in advance. If omitted, the files are downloaded when the message
+                      is delivered.
+        """
         await self.discord_bot.wait_until_ready()
-        embed = self.create_discord_embed(message)
-        files = await self.fetch_message_files(message)
-        if not embed and not files:
+        if payload is None:
+            payload = self.create_outbox_payload(message)
+        if payload.is_empty:
             _logger.warning("Received a file only message and all files exceed the maximum Discord file size limit.")
             return
 
         if message.reply_to_message:
             # TODO: Properly handle messages that do not come from the same chat and are ExternalReplyInfo
-            await self.reply_discord_messages(message.message_id, message.reply_to_message.message_id, embed, files=files)
+            await self.reply_discord_messages(message.chat.id, message.message_id, message.reply_to_message.message_id,
+                                              payload, files)
         else:
-            await self.send_discord_messages(message.message_id, embed, files=files)
+            await self.send_discord_messages(message.chat.id, message.message_id, payload, files)
 
     async def on_message_edit(self, message: telegram.Message):
         """
-        A listener method responsible for handling edited Telegram messages and applying changes to Discord.
+        A listener method responsible for handling edited Telegram messages. Edits are coalesced, so that only the
+        latest version of a rapidly edited message is applied to Discord.
+
+        :param message: The edited Telegram message.
+        """
+        self.edit_coalescer.submit(message)
+
+    async def apply_message_edit(self, message: telegram.Message):
+        """
+        Apply changes of an edited Telegram message to Discord.
 
         :param message: The edited Telegram message.
         """
         await self.discord_bot.wait_until_ready()
 
-        embed = self.create_discord_embed(message)
-        files = await self.fetch_message_files(message)
+        payload = self.create_outbox_payload(message)
+        chat_id = message.chat.id
         message_id = message.message_id
         message_age = datetime.now(UTC).timestamp() - message.date
 
-        existing_discord_messages = await self.get_discord_messages(message_id)
+        # The message may have been edited while it is still being forwarded
+        await self.pending_forwards.wait(chat_id, message_id)
+        existing_discord_messages = await self.get_discord_messages(chat_id, message_id)
         if existing_discord_messages:
-            for discord_message in existing_discord_messages:
-                if not files:
-                    files = discord_message.attachments
-                await discord_message.edit(embed=embed, attachments=files)
-                self.database_handler.update_ts(message_id, datetime.now(UTC))
+            files = await self.download_files(payload)
+
+            async def edit(discord_message, _, discord_files):
+                if discord_files:
+                    return await discord_message.edit(embed=payload.embed, attachments=discord_files)
+                # Existing attachments are kept when they are omitted, so there is no need to fetch them
+                return await discord_message.edit(embed=payload.embed)
+
+            targets = [(m.channel.id, m) for m in existing_discord_messages]
+            results = await self._fan_out(targets, edit, files=files, reuse_attachments=False, route=_edit_route)
+
+            edited = False
+            for discord_message, result in results:
+                if isinstance(result, discord.NotFound):
+                    _logger.error(f"Discord message with ID {discord_message.id} not found. Cannot edit message "
+                                  f"reference. Skipping.")
+                    self.message_cache.discard(discord_message.id)
+                elif isinstance(result, BaseException):
+                    _logger.error(f"Failed to edit Discord message with ID {discord_message.id}.", exc_info=result)
+                else:
+                    self.message_cache.add(result)
+                    edited = True
+
+            if edited:
+                await self.database_handler.update_ts(chat_id, message_id, datetime.now(UTC))
         elif message_age < self.config.preferences.update_age_threshold:
             _logger.warning(f"Cannot find and edit Discord message references with Telegram message ID {message_id}. "
                             f"Handling the message as orphan.")
-            await self._handle_orphan_messages(message_id, embed=embed, files=files)
+            await self._send_orphan_edit(chat_id, message_id, payload)
         else:
             _logger.warning(f"Cannot find and edit Discord message references with Telegram message ID {message_id} "
                             f"and the message is older than update age threshold. Discarding the message.")
 
-    def serialize_discord_message(self, tg_message_id: int, discord_message: discord.Message) -> None:
+    async def _send_orphan_edit(self, tg_chat_id: int, tg_message_id: int, payload: OutboxPayload) -> None:
         """
-        Serialize a Discord message to database so that it can be later retrieved and deserialized based on Telegram
-        message ID.
+        Send an edited message without message references as an orphan. A newer edit of the message cancels this one,
+        but the deliveries are already in the outbox at that point, so the send is completed anyway. The message is
+        marked pending meanwhile, so that the newer edit edits the sent messages instead of sending them again.
 
-        :param tg_message_id: The Telegram message ID.
-        :param discord_message: A Discord message corresponding the Telegram message.
+        :param tg_chat_id: ID of the Telegram chat of the edited message.
+        :param tg_message_id: ID of the edited Telegram message.
+        :param payload: The rendered message to send.
+        """
+        sending = asyncio.ensure_future(self._handle_orphan_messages(tg_chat_id, tg_message_id, payload))
+        with self.pending_forwards.track(tg_chat_id, tg_message_id):
+            try:
+                await asyncio.shield(sending)
+            except asyncio.CancelledError:
+                await sending
+                raise
+
+    async def _fan_out(
+            self,
+            targets: List[Tuple[int, _Target]],
+            deliver: Callable[[_Target, Optional[str], List[discord.File]], Awaitable[discord.Message]],
+            text: str = None,
+            files: List[SharedFile] = None,
+            reuse_attachments: bool = True,
+            route: Callable[[_Target], Optional[RouteKey]] = None
+    ) -> List[Tuple[_Target, Union[discord.Message, BaseException]]]:
+        """
+        Deliver the same content to several Discord targets through the delivery scheduler. Deliveries to different
+        channels are made concurrently, so a rate limited channel does not delay the others.
+
+        :param targets: List of tuples of destination channel IDs and targets passed to the delivery function.
+        :param deliver: Coroutine function making the API call. Called with a target, text content and a list of
+                        ``discord.File`` objects created for this single call.
+        :param text: Text content to deliver.
+        :param files: A list of ``SharedFile`` objects to deliver.
+        :param reuse_attachments: Upload the files only with the first delivery and link the uploaded attachments in
+                                  the others, if ``reuse_uploaded_attachments`` is enabled in the preferences.
+        :param route: Function returning the Discord API route a target is delivered to, for pacing the deliveries by
+                      the rate limits of the route. If omitted, the deliveries are paced as sending messages to the
+                      channels as the bot user.
+        :return: List of tuples of targets and the resulting Discord messages, or exceptions for failed deliveries.
         """
-        self.database_handler.add(tg_message_id, discord_message, datetime.now(UTC))
+        results = []
+        reuse_attachments = reuse_attachments and self.config.preferences.reuse_uploaded_attachments
+        if files and reuse_attachments and len(targets) > 1:
+            (channel_id, first_target), targets = targets[0], targets[1:]
+            future = self.delivery_scheduler.submit(channel_id, _delivery(deliver, first_target, text, files),
+                                                    route(first_target) if route else None)
+            try:
+                first_result = await future
+            except Exception as e:
+                first_result = e
+            results.append((first_target, first_result))
+            if isinstance(first_result, discord.Message):
+                text = append_attachment_urls(text, first_result.attachments)
+                files = None
+
+        futures = [self.delivery_scheduler.submit(channel_id, _delivery(deliver, target, text, files),
+                                                  route(target) if route else None)
+                   for channel_id, target in targets]
+        delivered = await asyncio.gather(*futures, return_exceptions=True)
+        results.extend(zip((target for _, target in targets), delivered))
+        return results
 
     async def send_discord_messages(
             self,
+            tg_chat_id: int,
             tg_message_id: int,
-            embed: discord.Embed = None,
-            text: str = None,
-            files: List[discord.File] = None
+            payload: OutboxPayload,
+            files: List[SharedFile] = None
     ) -> None:
         """
-        Send Discord message to all configured Discord channels.
+        Send Discord message to all configured Discord channels. If ``use_webhooks`` is enabled, the messages are sent
+        through channel webhooks instead of the bot user.
 
+        :param tg_chat_id: ID of the Telegram chat of the message. Needed for Discord message serialization to the
+                           database.
         :param tg_message_id: Telegram message ID from which the content is retrieved from. Needed for Discord message
                               serialization to the database.
-        :param embed: A ``discord.Embed`` object to send to the Discord channels.
-        :param text: Text content to send in addition to the Discord embed.
-        :param files: A list of ``discord.File`` objects to send with the message.
+        :param payload: The rendered message to send.
+        :param files: Files of the payload downloaded in advance. If omitted, they are downloaded before sending.
         """
-
+        destinations = []
         for channel_id in self.config.channel_ids.discord:
-            channel = self.discord_bot.get_channel(channel_id)
-            if not channel:
+            if not self.discord_bot.get_channel(channel_id):
                 _logger.error(f"Attempted to forward Telegram message to unknown channel with ID {channel_id}.")
                 continue
+            destinations.append((channel_id, None))
 
-            discord_message = await channel.send(content=text, embed=embed, files=files)  # noqa
-            self.serialize_discord_message(tg_message_id, discord_message)
+        await self.deliver(tg_chat_id, tg_message_id, destinations, payload, files)
+
+    async def send_webhook_message(
+            self,
+            channel: discord.TextChannel,
+            content: Optional[str],
+            embed: Optional[discord.Embed],
+            files: List[discord.File],
+            username: str = None
+    ) -> discord.WebhookMessage:
+        """
+        Send a message through the forwarding webhook of a channel. A new webhook is created if the cached one has
+        been deleted from Discord.
+
+        :param channel: The Discord channel.
+        :param content: Text content of the message.
+        :param embed: A ``discord.Embed`` object to send.
+        :param files: A list of ``discord.File`` objects to send.
+        :param username: Username to show for the message. If omitted, the webhook default name is shown.
+        :return: The sent webhook message.
+        """
+        kwargs = dict(content=content or discord.utils.MISSING, embed=embed or discord.utils.MISSING, files=files,
+                      avatar_url=self.discord_bot.user.display_avatar.url, wait=True)
+        if username:
+            kwargs["username"] = username
+
+        webhook = await self.webhooks.get(channel)
+        try:
+            return await webhook.send(**kwargs)
+        except discord.NotFound:
+            _logger.warning(f"Webhook {webhook.id} of channel {channel.id} not found. Creating a new one.")
+            self.webhooks.forget(channel.id)
+            for file in files:
+                file.reset()
+            webhook = await self.webhooks.get(channel)
+            return await webhook.send(**kwargs)
 
     async def _handle_orphan_messages(
             self,
+            tg_chat_id: int,
             tg_message_id: int,
-            embed: discord.Embed = None,
-            text: str = None,
-            files: List[discord.File] = None
+            payload: OutboxPayload,
+            files: List[SharedFile] = None
     ) -> None:
         """
         Handle orphan messages not having matching references in the database. Sends a new message if
         ``send_orphans_as_new_messages`` is True, otherwise does nothing.
 
+        :param tg_chat_id: ID of the Telegram chat of the orphan message.
         :param tg_message_id: Telegram ID of the orphan message. Needed for handling references in the database.
-        :param embed: A ``discord.Embed`` object to send to the Discord channels.
-        :param text: Text content to send in addition to the Discord embed.
-        :param files: A list of ``discord.File`` objects to send with the message.
+        :param payload: The rendered message to send.
+        :param files: Files of the payload downloaded in advance. If omitted, they are downloaded before sending.
         """
         if self.config.preferences.send_orphans_as_new_message:
             # TODO: Handle messages separately if they all are not missing references
-            await self.send_discord_messages(tg_message_id, embed, text, files)
+            await self.send_discord_messages(tg_chat_id, tg_message_id, payload, files)
 
     async def reply_discord_messages(
             self,
+            tg_chat_id: int,
             tg_message_id: int,
             replied_tg_message_id: int,
-            embed: discord.Embed = None,
-            text: str = None,
-            files: List[discord.file] = None
+            payload: OutboxPayload,
+            files: List[SharedFile] = None
     ) -> None:
         """
-        Reply to a Discord message with a new message in all configured Discord channels. If no Discord message
+        Reply to a Discord message with a new message in all configured Discord channels. Replies are always sent by
+        the bot user, as webhooks cannot reply to messages. If no Discord message
         references are found from the database, sends a new message or does nothing, based on the configuration.
 
+        :param tg_chat_id: ID of the Telegram chat of the new and the replied message.
         :param tg_message_id: The new Telegram message ID. Needed for handling messages in the database.
         :param replied_tg_message_id: ID of the replied Telegram message. Needed for finding message references from the
                                       database.
-        :param embed: ``discord.Embed`` object to send with the reply.
-        :param text: Text content to send in addition to the Discord embed.
-        :param files: A list of ``discord.File`` objects to send with the reply.
+        :param payload: The rendered reply to send.
+        :param files: Files of the payload downloaded in advance. If omitted, they are downloaded before sending.
         """
-        discord_messages = await self.get_discord_messages(replied_tg_message_id)
+        # The replied message may still be being forwarded
+        await self.pending_forwards.wait(tg_chat_id, replied_tg_message_id)
+        discord_messages = await self.get_discord_messages(tg_chat_id, replied_tg_message_id)
         if not discord_messages:
             _logger.warning(f"Cannot reply to Discord message with Telegram message ID {replied_tg_message_id}. "
                             f"No messages exist in database with such ID. Handling as orphans.")
-            await self._handle_orphan_messages(tg_message_id, embed, text, files)
+            await self._handle_orphan_messages(tg_chat_id, tg_message_id, payload, files)
+            return
+
+        destinations = [(m.channel.id, m.id) for m in discord_messages]
+        if await self.deliver(tg_chat_id, tg_message_id, destinations, payload, files):
+            await self.database_handler.update_ts(tg_chat_id, replied_tg_message_id, datetime.now(UTC))
+
+    async def deliver(
+            self,
+            tg_chat_id: int,
+            tg_message_id: int,
+            destinations: List[Tuple[int, Optional[int]]],
+            payload: OutboxPayload,
+            files: List[SharedFile] = None
+    ) -> int:
+        """
+        Add deliveries of a payload to the outbox and attempt them immediately. Deliveries failing temporarily stay in
+        the outbox and are retried by ``outbox_delivery_loop``.
+
+        :param tg_chat_id: ID of the Telegram chat of the message the payload was rendered from.
+        :param tg_message_id: ID of the Telegram message the payload was rendered from.
+        :param destinations: List of tuples of destination Discord channel IDs and IDs of Discord messages to reply to.
+                             Reply message ID is None for new messages.
+        :param payload: The rendered message to deliver.
+        :param files: Files of the payload downloaded in advance. If omitted, they are downloaded before delivering.
+        :return: Amount of completed deliveries.
+        """
+        if not destinations:
+            return 0
+
+        # Deliveries are leased to this attempt, so that the outbox loop does not attempt them at the same time. They
+        # are resumed after the lease if the bot is stopped before completing them.
+        now = datetime.now(UTC)
+        outbox_ids = await self.database_handler.enqueue_deliveries(tg_chat_id, tg_message_id, destinations,
+                                                                    payload.to_json(), now,
+                                                                    now + timedelta(seconds=_OUTBOX_RETRY_DELAY))
+        deliveries = [OutboxDelivery(outbox_id, tg_chat_id, tg_message_id, channel_id, reply_to_message_id, payload)
+                      for outbox_id, (channel_id, reply_to_message_id) in zip(outbox_ids, destinations)]
+        return await self.attempt_deliveries(deliveries, payload, files)
+
+    async def attempt_deliveries(
+            self,
+            deliveries: List[OutboxDelivery],
+            payload: OutboxPayload,
+            files: List[SharedFile] = None
+    ) -> int:
+        """
+        Attempt deliveries of the same payload from the outbox. Completed deliveries are removed from the outbox and
+        their Discord messages are serialized to the database. Failed deliveries are postponed, or discarded if they
+        cannot ever succeed.
+
+        :param deliveries: The deliveries to attempt.
+        :param payload: The payload of the deliveries.
+        :param files: Files of the payload downloaded in advance. If omitted, they are downloaded first.
+        :return: Amount of completed deliveries.
+        """
+        self._delivering.update(delivery.id for delivery in deliveries)
+        try:
+            try:
+                if files is None:
+                    files = await self.download_files(payload)
+            except Exception as e:
+                _logger.error("Failed to download files for Discord deliveries. Postponing the deliveries.", exc_info=e)
+                for delivery in deliveries:
+                    await self._postpone_delivery(delivery)
+                return 0
+
+            if not files and not payload.text and not payload.embed:
+                _logger.warning("None of the files in a file only message could be sent to Discord. Discarding the "
+                                "message.")
+                for delivery in deliveries:
+                    await self.database_handler.discard_delivery(delivery.id)
+                return 0
+
+            targets = []
+            for delivery in deliveries:
+                channel = self.discord_bot.get_channel(delivery.channel_id)
+                if not channel:
+                    _logger.error(f"Discord channel with ID {delivery.channel_id} not found. Discarding delivery "
+                                  f"{delivery.id}.")
+                    await self.database_handler.discard_delivery(delivery.id)
+                    continue
+                targets.append((delivery.channel_id, (delivery, channel)))
+
+            async def send(target, content, discord_files):
+                delivery_, channel_ = target
+                if delivery_.is_reply:
+                    reply_to_message_id = delivery_.reply_to_message_id
+                    replied_message = self.message_cache.get(reply_to_message_id,
+                                                             channel_.get_partial_message(reply_to_message_id))
+                    return await replied_message.reply(content=content, embed=payload.embed, mention_author=False,
+                                                       files=discord_files)
+                if not self.config.preferences.use_webhooks:
+                    return await channel_.send(content=content, embed=payload.embed, files=discord_files)
+                return await self.send_webhook_message(channel_, content, payload.embed, discord_files,
+                                                       payload.username)
+
+            def route(target):
+                delivery_, channel_ = target
+                if delivery_.is_reply or not self.config.preferences.use_webhooks:
+                    return message_route(channel_.id)
+                webhook = self.webhooks.get_cached(channel_.id)
+                # Until the first send has fetched or created the webhook, sends are paced by the bot user limits
+                return webhook_route(webhook.id) if webhook is not None else None
+
+            updates = []
+            completed = 0
+            for (delivery, _), result in await self._fan_out(targets, send, payload.text, files, route=route):
+                if isinstance(result, asyncio.CancelledError):
+                    # The scheduler was closed, the delivery is attempted again after a restart
+                    continue
+                elif isinstance(result, BaseException):
+                    updates.append(self._handle_failed_delivery(delivery, result))
+                    continue
+
+                # The database writes of all deliveries are committed together
+                updates.append(self.database_handler.complete_delivery(delivery.id, delivery.tg_chat_id,
+                                                                       delivery.tg_message_id, result,
+                                                                       datetime.now(UTC)))
+                self.message_cache.add(result)
+                self.startup_buffer.record_forward()
+                completed += 1
+
+            await asyncio.gather(*updates)
+            return completed
+        finally:
+            self._delivering.difference_update(delivery.id for delivery in deliveries)
+
+    async def _handle_failed_delivery(self, delivery: OutboxDelivery, error: BaseException) -> None:
+        """
+        Postpone a failed delivery, or discard it if it has run out of attempts or Discord rejected the request and
+        retrying cannot help.
+        """
+        if isinstance(error, discord.HTTPException) and 400 <= error.status < 500 and error.status != 429:
+            if delivery.is_reply:
+                # Replying to a message deleted from Discord fails with an unknown message reference
+                _logger.error(f"Cannot reply to Discord message with ID {delivery.reply_to_message_id}: {error}. "
+                              f"Discarding delivery {delivery.id}.")
+                self.message_cache.discard(delivery.reply_to_message_id)
+            else:
+                _logger.error(f"Discord rejected delivery {delivery.id} to channel with ID {delivery.channel_id}: "
+                              f"{error}. Discarding the delivery.")
+            await self.database_handler.discard_delivery(delivery.id)
             return
 
-        for discord_message in discord_messages:
-            new_discord_message = await discord_message.reply(content=text, embed=embed, mention_author=False, files=files)  # noqa
-            self.serialize_discord_message(tg_message_id, new_discord_message)
-            self.database_handler.update_ts(replied_tg_message_id, datetime.now(UTC))
+        if delivery.attempts + 1 >= self.config.preferences.outbox_max_attempts:
+            _logger.error(f"Failed to forward Telegram message to channel with ID {delivery.channel_id}. Giving up "
+                          f"delivery {delivery.id} after {delivery.attempts + 1} attempts.", exc_info=error)
+            await self.database_handler.discard_delivery(delivery.id)
+            return
 
-    async def get_discord_messages(self, tg_message_id: int) -> List[discord.Message]:
+        delay = await self._postpone_delivery(delivery)
+        _logger.error(f"Failed to forward Telegram message to channel with ID {delivery.channel_id}. Retrying in "
+                      f"{delay} seconds.", exc_info=error)
+
+    async def _postpone_delivery(self, delivery: OutboxDelivery) -> int:
+        """
+        Postpone a delivery with an exponential backoff.
+
+        :return: Seconds until the next attempt.
+        """
+        delay = min(_OUTBOX_RETRY_DELAY * 2 ** delivery.attempts, _OUTBOX_MAX_RETRY_DELAY)
+        await self.database_handler.postpone_delivery(delivery.id, datetime.now(UTC) + timedelta(seconds=delay))
+        return delay
+
+    async def get_discord_messages(
+            self,
+            tg_chat_id: int,
+            tg_message_id: int
+    ) -> List[Union[discord.Message, discord.PartialMessage, PartialWebhookMessage]]:
         """
-        Get all Discord message references from database based on Telegram message ID.
+        Get all Discord message references from database based on Telegram chat and message ID.
 
+        Messages are taken from the message cache if possible. Otherwise, partial messages are built from the stored
+        IDs without any API calls, as they are enough for replying and editing. Webhook messages are edited through
+        their webhooks.
+
+        :param tg_chat_id: ID of the Telegram chat of the message.
         :param tg_message_id: Telegram message ID to use to search for Discord messages.
-        :return: List of Message objects, or an empty list of none found from database.
+        :return: List of Message or PartialMessage objects, or an empty list of none found from database.
         """
         messages = []
-        message_ids = self.database_handler.get(tg_message_id)
+        message_ids = await self.database_handler.get(tg_chat_id, tg_message_id)
+
+        for message_id, channel_id, webhook_id in message_ids:
+            cached_message = self.message_cache.get(message_id)
+            if cached_message is not None:
+                messages.append(cached_message)
+                continue
 
-        for message_id, channel_id in message_ids:
             channel = self.discord_bot.get_channel(channel_id)
             if not channel:
                 _logger.error(f"Discord channel with ID {channel_id} not found. Cannot fetch message reference. "
                               f"Skipping.")
                 continue
 
-            try:
-                messages.append(await channel.fetch_message(message_id))
-            except discord.NotFound:
-                _logger.error(f"Discord message with ID {message_id} not found. Cannot fetch message reference. "
-                              f"Skipping.")
-                continue
+            webhook = None
+            if webhook_id is not None:
+                # Only the webhook a message was sent with can edit it
+                webhook = await self.webhooks.get_by_id(channel, webhook_id)
+
+            if webhook is not None:
+                messages.append(PartialWebhookMessage(message_id, channel, webhook))  # noqa
+            else:
+                messages.append(channel.get_partial_message(message_id))  # noqa
 
         return messages
 
+    @commands.is_owner()
+    @commands.command("deliveries", description="Show delivery queue statistics of Discord channels.")
+    async def delivery_statistics(self, ctx: commands.Context):
+        """
+        Show queue depth and time to send for every Discord channel messages have been delivered to.
+        """
+        stats = self.delivery_scheduler.stats()
+        if not stats:
+            await ctx.send("No messages have been delivered yet.")
+            return
+
+        lines = []
+        for channel_id, channel_stats in stats.items():
+            lines.append(f"{channel_id}: queued {channel_stats.queue_depth}, sent {channel_stats.sent}, "
+                         f"failed {channel_stats.failed}, rate limited {channel_stats.rate_limited}, "
+                         f"time to send {channel_stats.last_time_to_send:.2f} s "
+                         f"(avg {channel_stats.average_time_to_send:.2f} s)")
+
+        stats_text = "\n".join(lines)
+        await ctx.send(f"```\n{stats_text}```")
+
+    @commands.is_owner()
+    @commands.command("references", description="Show message reference cache statistics.")
+    async def reference_cache_statistics(self, ctx: commands.Context):
+        """
+        Show the size and hit rate of the message reference cache.
+        """
+        cache = self.database_handler.reference_cache
+        await ctx.send(f"```\nCached {len(cache)}/{cache.max_size} Telegram messages, hit rate {cache.hit_rate:.1%} "
+                       f"({cache.hits} hits, {cache.misses} misses)```")
+
+    @commands.is_owner()
+    @commands.command("backup", description="Back up the database now.")
+    async def backup_database(self, ctx: commands.Context):
+        """
+        Back up the database regardless of the backup interval, and report the duration and size of the backup.
+        """
+        try:
+            backup = await self.database_backups.create()
+        except Exception as e:
+            _logger.error(f"Database backup failed: {e}")
+            await ctx.send(f"Database backup failed: {e}")
+            return
+
+        await ctx.send(f"Backed up the database to `{backup.path}` in {backup.duration:.2f} s "
+                       f"({backup.size / 1_000_000:.1f} MB).")
+
     @commands.is_owner()
     @commands.command("reload", description="Reload channel IDs and preferences in runtime.")
     async def reload_configuration(self, ctx: commands.Context):
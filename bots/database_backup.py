@@ -0,0 +1,141 @@
+"""
+MIT License
+
+Copyright (c) 2025 Niko Mätäsaho
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime, UTC
+from pathlib import Path
+from typing import List, Optional
+
+from database_handler import AsyncDatabaseHandler
+
+
+_logger = logging.getLogger(__name__)
+
+
+class BackupResult:
+
+    __slots__ = (
+        "path",
+        "duration",
+        "size"
+    )
+
+    def __init__(self, path: Path, duration: float, size: int):
+        """
+        A completed database backup.
+
+        :param path: Path to the backup file.
+        :param duration: Duration of the backup in seconds.
+        :param size: Size of the backup file in bytes.
+        """
+        self.path = path
+        self.duration = duration
+        self.size = size
+
+
+class DatabaseBackups:
+
+    def __init__(self, database_handler: AsyncDatabaseHandler, directory: str = "backups", retention: int = 7):
+        """
+        Creates backups of the database while the bot is running and deletes the oldest backups. Backup files are
+        named after the database and the backup time, e.g. ``glasnost-20250101-120000.db``.
+
+        :param database_handler: Handler of the database to back up.
+        :param directory: Directory to store the backups to. Created if it does not exist.
+        :param retention: Amount of the most recent backups to keep.
+        """
+        self.database_handler = database_handler
+        self.directory = Path(directory)
+        self.retention = retention
+        self._lock = asyncio.Lock()
+
+    def configure(self, directory: str, retention: int) -> None:
+        self.directory = Path(directory)
+        self.retention = retention
+
+    @property
+    def _database_path(self) -> Path:
+        return Path(self.database_handler.database_path)
+
+    def backups(self) -> List[Path]:
+        """
+        Get the existing backups of the database.
+
+        :return: Paths to the backup files, oldest backup first.
+        """
+        if not self.directory.is_dir():
+            return []
+        database = self._database_path
+        # The names have the backup time in sortable format
+        return sorted(self.directory.glob(f"{database.stem}-*{database.suffix}"))
+
+    def latest_age(self) -> Optional[float]:
+        """
+        Get the time since the latest backup was completed.
+
+        :return: Age of the latest backup in seconds, or None if there are no backups.
+        """
+        backups = self.backups()
+        if not backups:
+            return None
+        return time.time() - backups[-1].stat().st_mtime
+
+    async def create(self) -> BackupResult:
+        """
+        Back up the database. The backup is written to a temporary file first, so an interrupted backup never replaces
+        a complete one. The oldest backups exceeding the retention are deleted afterwards.
+
+        :return: The completed backup.
+        """
+        async with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            database = self._database_path
+            path = self.directory / f"{database.stem}-{datetime.now(UTC):%Y%m%d-%H%M%S}{database.suffix}"
+            partial_path = path.with_name(path.name + ".partial")
+
+            start = time.perf_counter()
+            try:
+                await self.database_handler.backup(str(partial_path))
+            except Exception:
+                partial_path.unlink(missing_ok=True)
+                raise
+            os.replace(partial_path, path)
+            result = BackupResult(path, time.perf_counter() - start, path.stat().st_size)
+
+            _logger.info(f"Backed up the database to '{path}' in {result.duration:.2f} s ({result.size} bytes)")
+            self.prune()
+            return result
+
+    def prune(self) -> None:
+        """
+        Delete the oldest backups exceeding the retention.
+        """
+        backups = self.backups()
+        for path in backups[:max(len(backups) - self.retention, 0)]:
+            path.unlink()
+            _logger.info(f"Deleted old database backup '{path}'")
@@ -0,0 +1,447 @@
+"""
+MIT License
+
+Copyright (c) 2025 Niko Mätäsaho
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import asyncio
+import logging
+import re
+import time
+from types import SimpleNamespace
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, TypeVar, Union
+
+import aiohttp
+import discord
+
+
+_logger = logging.getLogger(__name__)
+T = TypeVar("T")
+
+_ROUTE = re.compile(r"/(channels|webhooks)/(\d+)(/.*)?$")
+_WEBHOOK_TOKEN = re.compile(r"^/[^/]+")
+_MINOR_ID = re.compile(r"/\d+(?=/|$)")
+
+RouteKey = Tuple[str, str]
+"""
+A Discord API route as a tuple of the route with its parameters replaced, e.g. ``POST /channels/{id}/messages``, and
+the major parameter of the route, e.g. ``channels:1234``.
+"""
+
+
+def _route_key(method: str, resource: str, major_id: Union[int, str], rest: str) -> RouteKey:
+    return f"{method} /{resource}/{{id}}{rest}", f"{resource}:{major_id}"
+
+
+def parse_route(method: str, path: str) -> Optional[RouteKey]:
+    """
+    Get the route of a request made to a Discord channel or webhook.
+
+    :param method: HTTP method of the request.
+    :param path: URL path of the request.
+    :return: The route, or None if the request was not made to a channel or webhook.
+    """
+    match = _ROUTE.search(path)
+    if match is None:
+        return None
+
+    resource, major_id, rest = match.group(1), match.group(2), match.group(3) or ""
+    if resource == "webhooks":
+        rest = _WEBHOOK_TOKEN.sub("/{token}", rest)
+    return _route_key(method, resource, major_id, _MINOR_ID.sub("/{id}", rest))
+
+
+def message_route(channel_id: int, method: str = "POST") -> RouteKey:
+    """
+    Get the route of sending (POST) or editing (PATCH) a message in a Discord channel as the bot user.
+
+    :param channel_id: ID of the channel.
+    :param method: HTTP method of the request.
+    :return: The route.
+    """
+    return _route_key(method, "channels", channel_id, "/messages" if method == "POST" else "/messages/{id}")
+
+
+def webhook_route(webhook_id: int, method: str = "POST") -> RouteKey:
+    """
+    Get the route of sending (POST) or editing (PATCH) a message with a Discord webhook.
+
+    :param webhook_id: ID of the webhook.
+    :param method: HTTP method of the request.
+    :return: The route.
+    """
+    return _route_key(method, "webhooks", webhook_id, "/{token}" if method == "POST" else "/{token}/messages/{id}")
+
+
+class RateLimitBucket:
+
+    __slots__ = (
+        "bucket",
+        "limit",
+        "remaining",
+        "reset_at"
+    )
+
+    def __init__(self, bucket: Optional[str], limit: int, remaining: int, reset_at: float):
+        """
+        Rate limit state of a single Discord rate limit bucket, as last reported by the Discord API.
+
+        :param bucket: Rate limit bucket hash reported by Discord.
+        :param limit: Amount of requests allowed in the bucket per reset period.
+        :param remaining: Amount of requests remaining before the bucket resets.
+        :param reset_at: Monotonic clock time when the bucket resets.
+        """
+        self.bucket = bucket
+        self.limit = limit
+        self.remaining = remaining
+        self.reset_at = reset_at
+
+    @property
+    def delay(self) -> float:
+        """
+        Seconds to wait before the next request can be made without hitting the rate limit.
+        """
+        if self.remaining > 0:
+            return 0
+        return max(0.0, self.reset_at - time.monotonic())
+
+
+class RateLimitTracker:
+
+    def __init__(self):
+        """
+        Tracks Discord rate limit headers of channel and webhook routes from the HTTP requests discord.py makes. The
+        tracker must be hooked to the discord.py HTTP client with ``trace_config``.
+
+        Routes sharing a rate limit bucket are mapped to the same bucket with the bucket hash Discord reports, and the
+        buckets are tracked separately for every channel and webhook. Until the bucket of a route is known, the route
+        is tracked as a bucket of its own. The global rate limit applies to all routes.
+        """
+        self.buckets: Dict[Tuple[str, str], RateLimitBucket] = {}
+        self.route_buckets: Dict[str, str] = {}
+        self.global_reset_at = 0.0
+
+    def trace_config(self) -> aiohttp.TraceConfig:
+        """
+        Create an aiohttp trace config that feeds response headers to this tracker. Pass it to a ``discord.Client``
+        as keyword argument ``http_trace``.
+
+        :return: The trace config.
+        """
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_end.append(self._on_request_end)
+        return trace_config
+
+    async def _on_request_end(
+            self,
+            session: aiohttp.ClientSession,
+            context: SimpleNamespace,
+            params: aiohttp.TraceRequestEndParams
+    ) -> None:
+        route = parse_route(params.method, params.url.path)
+        if route is not None:
+            self.update(route, params.response.status, params.response.headers)
+
+    def _bucket_key(self, route: RouteKey) -> Tuple[str, str]:
+        path, major = route
+        return self.route_buckets.get(path, path), major
+
+    def update(self, route: RouteKey, status: int, headers: Any) -> None:
+        """
+        Update rate limit state of a route from Discord response headers.
+
+        :param route: The route the request was made to.
+        :param status: HTTP status of the response.
+        :param headers: Headers of the response.
+        """
+        path, major = route
+        bucket_hash = headers.get("X-RateLimit-Bucket")
+        if bucket_hash is not None and self.route_buckets.get(path) != bucket_hash:
+            self.route_buckets[path] = bucket_hash
+            # The state tracked before the bucket was known is replaced by the state of the bucket
+            self.buckets.pop((path, major), None)
+
+        if status == 429:
+            retry_after = float(headers.get("Retry-After", 1))
+            if headers.get("X-RateLimit-Global") == "true" or headers.get("X-RateLimit-Scope") == "global":
+                self.global_reset_at = time.monotonic() + retry_after
+                _logger.debug(f"Globally rate limited for {retry_after} seconds")
+                return
+
+            key = self._bucket_key(route)
+            bucket = self.buckets.get(key)
+            if bucket is None:
+                bucket = RateLimitBucket(bucket_hash, 1, 0, 0)
+                self.buckets[key] = bucket
+            bucket.remaining = 0
+            bucket.reset_at = time.monotonic() + retry_after
+            # A shared limit is shared by everyone using the resource, so it limits only this route of the resource
+            scope = headers.get("X-RateLimit-Scope", "user")
+            _logger.debug(f"Route {path} of {major} was rate limited for {retry_after} seconds ({scope} limit)")
+            return
+
+        remaining = headers.get("X-RateLimit-Remaining")
+        reset_after = headers.get("X-RateLimit-Reset-After")
+        if remaining is None or reset_after is None:
+            return
+
+        self.buckets[self._bucket_key(route)] = RateLimitBucket(
+            bucket_hash,
+            int(headers.get("X-RateLimit-Limit", 1)),
+            int(remaining),
+            time.monotonic() + float(reset_after)
+        )
+
+    def delay(self, route: RouteKey) -> float:
+        """
+        Seconds to wait before the next request to a route can be made without hitting the rate limit.
+
+        :param route: The route.
+        :return: The delay in seconds. Zero if there is no need to wait.
+        """
+        delay = max(0.0, self.global_reset_at - time.monotonic())
+        bucket = self.buckets.get(self._bucket_key(route))
+        if bucket is None:
+            return delay
+        return max(delay, bucket.delay)
+
+    def consume(self, route: RouteKey) -> None:
+        """
+        Mark a request to a route being sent, before its response headers are received.
+
+        :param route: The route.
+        """
+        bucket = self.buckets.get(self._bucket_key(route))
+        if bucket is not None and bucket.remaining > 0:
+            bucket.remaining -= 1
+
+
+class ChannelStats:
+
+    __slots__ = (
+        "queue_depth",
+        "sent",
+        "failed",
+        "rate_limited",
+        "last_time_to_send",
+        "total_time_to_send"
+    )
+
+    def __init__(self):
+        """
+        Delivery statistics of a single Discord channel.
+
+        Time to send is measured from submitting a delivery to the scheduler until it has been completed, so it includes
+        the time spent waiting in the queue.
+        """
+        self.queue_depth = 0
+        self.sent = 0
+        self.failed = 0
+        self.rate_limited = 0
+        self.last_time_to_send = 0.0
+        self.total_time_to_send = 0.0
+
+    @property
+    def average_time_to_send(self) -> float:
+        """
+        Average time to send in seconds for successful deliveries.
+        """
+        if not self.sent:
+            return 0.0
+        return self.total_time_to_send / self.sent
+
+
+class _Delivery:
+
+    __slots__ = (
+        "coroutine_factory",
+        "route",
+        "future",
+        "submitted"
+    )
+
+    def __init__(self, coroutine_factory: Callable[[], Awaitable[Any]], route: RouteKey, future: asyncio.Future):
+        self.coroutine_factory = coroutine_factory
+        self.route = route
+        self.future = future
+        self.submitted = time.monotonic()
+
+
+class DeliveryScheduler:
+
+    def __init__(self, rate_limits: RateLimitTracker = None):
+        """
+        Schedules Discord API calls to queues of their destination channels. Every channel has its own worker, so a
+        rate limited or otherwise slow channel never delays deliveries to other channels. Deliveries to a single channel
+        are made in the order they were submitted.
+
+        :param rate_limits: Rate limit tracker to pace the deliveries with. If omitted, deliveries are made as fast as
+                            discord.py allows.
+        """
+        self.rate_limits = rate_limits or RateLimitTracker()
+        self._queues: Dict[int, asyncio.Queue] = {}
+        self._workers: Dict[int, asyncio.Task] = {}
+        self._stats: Dict[int, ChannelStats] = {}
+
+    def submit(
+            self,
+            channel_id: int,
+            coroutine_factory: Callable[[], Awaitable[T]],
+            route: RouteKey = None
+    ) -> 'asyncio.Future[T]':
+        """
+        Submit a delivery to the queue of a channel. The coroutine factory is called once the delivery is at the front
+        of the queue and its route is not rate limited, and again if the delivery must be retried after a rate limit.
+
+        Cancelling the returned future before the delivery is started removes it from the queue.
+
+        :param channel_id: ID of the destination channel.
+        :param coroutine_factory: A callable returning a new coroutine making the API call, e.g. ``channel.send``.
+        :param route: The route the API call is made to, e.g. ``webhook_route(webhook.id)``. If omitted, the call is
+                      paced as sending a message to the channel as the bot user.
+        :return: A future resolving to the result of the coroutine.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        queue = self._queues.get(channel_id)
+        if queue is None:
+            queue = asyncio.Queue()
+            self._queues[channel_id] = queue
+            self._stats[channel_id] = ChannelStats()
+            self._workers[channel_id] = loop.create_task(self._worker(channel_id, queue))
+            _logger.debug(f"Started delivery worker for channel {channel_id}")
+
+        queue.put_nowait(_Delivery(coroutine_factory, route or message_route(channel_id), future))
+        self._stats[channel_id].queue_depth = queue.qsize()
+        return future
+
+    async def _worker(self, channel_id: int, queue: asyncio.Queue) -> None:
+        stats = self._stats[channel_id]
+
+        while True:
+            delivery: _Delivery = await queue.get()
+            stats.queue_depth = queue.qsize()
+            if delivery.future.cancelled():
+                continue
+
+            task = asyncio.current_task()
+            try:
+                result = await self._deliver(channel_id, delivery, stats)
+            except asyncio.CancelledError:
+                if task.cancelling():
+                    # The scheduler itself is closing
+                    delivery.future.cancel()
+                    raise
+                delivery.future.cancel()
+                continue
+            except Exception as e:
+                stats.failed += 1
+                if not delivery.future.done():
+                    delivery.future.set_exception(e)
+                continue
+
+            elapsed = time.monotonic() - delivery.submitted
+            stats.sent += 1
+            stats.last_time_to_send = elapsed
+            stats.total_time_to_send += elapsed
+            if not delivery.future.done():
+                delivery.future.set_result(result)
+
+    async def _deliver(self, channel_id: int, delivery: _Delivery, stats: ChannelStats) -> Any:
+        while True:
+            delay = self.rate_limits.delay(delivery.route)
+            if delay > 0:
+                _logger.debug(f"Delaying delivery to channel {channel_id} by {delay:.2f} seconds due to rate limit")
+                await asyncio.sleep(delay)
+            if delivery.future.cancelled():
+                raise asyncio.CancelledError()
+
+            self.rate_limits.consume(delivery.route)
+            coroutine = delivery.coroutine_factory()
+            try:
+                # Cancelling the delivery future cancels the API call in progress
+                return await _await_unless_cancelled(coroutine, delivery.future)
+            except discord.RateLimited as e:
+                # Raised by discord.py instead of sleeping when the rate limit is longer than max_ratelimit_timeout
+                stats.rate_limited += 1
+                _logger.warning(f"Delivery to channel {channel_id} rate limited for {e.retry_after:.2f} seconds. "
+                                f"Retrying after the rate limit.")
+                await asyncio.sleep(e.retry_after)
+
+    def queue_depth(self, channel_id: int) -> int:
+        """
+        Amount of deliveries waiting in the queue of a channel.
+
+        :param channel_id: ID of the channel.
+        :return: The queue depth.
+        """
+        queue = self._queues.get(channel_id)
+        return 0 if queue is None else queue.qsize()
+
+    def stats(self) -> Dict[int, ChannelStats]:
+        """
+        Get delivery statistics of all channels deliveries have been submitted to.
+
+        :return: Dictionary of channel IDs and their statistics.
+        """
+        for channel_id, queue in self._queues.items():
+            self._stats[channel_id].queue_depth = queue.qsize()
+        return dict(self._stats)
+
+    async def close(self) -> None:
+        """
+        Stop all channel workers. Deliveries still in queues are cancelled.
+        """
+        for worker in self._workers.values():
+            worker.cancel()
+        await asyncio.gather(*self._workers.values(), return_exceptions=True)
+
+        for queue in self._queues.values():
+            while not queue.empty():
+                queue.get_nowait().future.cancel()
+
+        self._queues.clear()
+        self._workers.clear()
+        _logger.debug("Delivery scheduler closed")
+
+
+async def _await_unless_cancelled(coroutine: Awaitable[T], future: asyncio.Future) -> T:
+    """
+    Await a coroutine, cancelling it if a future is cancelled before the coroutine finishes.
+
+    :param coroutine: The coroutine to await.
+    :param future: The future whose cancellation cancels the coroutine.
+    :return: Result of the coroutine.
+    :exception asyncio.CancelledError: The future was cancelled.
+    """
+    task = asyncio.ensure_future(coroutine)
+    try:
+        await asyncio.wait({task, future}, return_when=asyncio.FIRST_COMPLETED)
+    except asyncio.CancelledError:
+        task.cancel()
+        raise
+
+    if not task.done():
+        task.cancel()
+        raise asyncio.CancelledError()
+    return task.result()
@@ -29,6 +29,8 @@ import os
 from discord.ext import commands
 from typing import Iterable, Union, Optional
 
+from bots.delivery import RateLimitTracker
+
 
 _logger = logging.getLogger(__name__)
 
@@ -49,6 +51,7 @@ class DiscordBot(commands.Bot):
         :param dm_only_commands: Allow commands only through DMs to the bot.
         """
         self.dm_only_commands = dm_only_commands
+        self.rate_limits = RateLimitTracker()
 
         _intents = discord.Intents.default()
         _intents.message_content = True
@@ -57,8 +60,9 @@ class DiscordBot(commands.Bot):
         if activity_status:
             activity = discord.Game(activity_status)
 
+        # Long rate limits are raised instead of slept inside discord.py, so delivery workers can handle them
         super().__init__(command_prefix=command_prefix, intents=_intents,
-                         activity=activity)
+                         activity=activity, http_trace=self.rate_limits.trace_config(), max_ratelimit_timeout=30)
 
     @staticmethod
     async def is_dm(ctx: commands.Context) -> bool:
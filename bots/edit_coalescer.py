@@ -0,0 +1,99 @@
+"""
+MIT License
+
+Copyright (c) 2025 Niko Mätäsaho
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Tuple
+
+import telegram
+
+
+_logger = logging.getLogger(__name__)
+
+
+class EditCoalescer:
+
+    def __init__(self, apply: Callable[[telegram.Message], Awaitable[None]], delay: float = 2):
+        """
+        Coalesces rapid edits of the same Telegram message. An edit is held for a short time before it is applied, and
+        a newer edit of the same message replaces it. A newer edit also cancels an older one already being applied, so
+        only the latest version of a message is rendered, downloaded and sent to Discord.
+
+        :param apply: Coroutine function applying an edited message to Discord.
+        :param delay: Seconds to hold an edit before applying it. Zero applies edits immediately, but still cancels
+                      superseded edits being applied.
+        """
+        self.apply = apply
+        self.delay = delay
+        self._pending: Dict[Tuple[int, int], Tuple[telegram.Message, asyncio.Task]] = {}
+        self.coalesced = 0
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def submit(self, message: telegram.Message) -> None:
+        """
+        Submit an edited message to be applied after the delay, superseding pending edits of the same message.
+
+        :param message: The edited Telegram message.
+        """
+        key = (message.chat.id, message.message_id)
+        pending = self._pending.get(key)
+        if pending is not None:
+            pending_message, pending_task = pending
+            if pending_message.edit_date > message.edit_date:
+                _logger.debug(f"Discarding outdated edit of Telegram message {message.message_id}")
+                return
+
+            pending_task.cancel()
+            self.coalesced += 1
+            _logger.debug(f"Superseded a pending edit of Telegram message {message.message_id}")
+
+        task = asyncio.create_task(self._apply_later(key, message))
+        self._pending[key] = (message, task)
+
+    async def _apply_later(self, key: Tuple[int, int], message: telegram.Message) -> None:
+        try:
+            if self.delay > 0:
+                await asyncio.sleep(self.delay)
+            await self.apply(message)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            _logger.error(f"Failed to apply edit of Telegram message {message.message_id}: ", exc_info=e)
+        finally:
+            pending = self._pending.get(key)
+            if pending is not None and pending[1] is asyncio.current_task():
+                del self._pending[key]
+
+    async def close(self) -> None:
+        """
+        Cancel all pending edits.
+        """
+        tasks = [task for _, task in self._pending.values()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._pending.clear()
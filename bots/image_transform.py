@@ -0,0 +1,162 @@
+"""
+MIT License
+
+Copyright (c) 2025 Niko Mätäsaho
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import io
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+from bots.media import SharedFile
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+
+_logger = logging.getLogger(__name__)
+
+_MIN_QUALITY = 40
+_QUALITY_STEP = 10
+_RESIZE_FACTOR = 0.75
+_MIN_DIMENSION = 320
+
+
+def downscale_image(data: bytes, max_size: int, quality: int, max_dimension: int) -> Optional[bytes]:
+    """
+    Re-encode an image as JPEG small enough to fit a size limit. The quality is lowered first, and the image is
+    resized smaller only if the lowest quality is not enough. Run in a worker process, as this is CPU heavy.
+
+    :param data: The original image.
+    :param max_size: Maximum size of the re-encoded image in bytes.
+    :param quality: JPEG quality to start from.
+    :param max_dimension: Maximum width and height of the re-encoded image in pixels.
+    :return: The re-encoded image, or None if the image cannot be made small enough or it is animated.
+    """
+    with Image.open(io.BytesIO(data)) as original:
+        if getattr(original, "is_animated", False):
+            # Re-encoding would lose the animation
+            return None
+
+        image = original.convert("RGB")
+
+    image.thumbnail((max_dimension, max_dimension))
+    while True:
+        for q in range(quality, _MIN_QUALITY - 1, -_QUALITY_STEP):
+            buffer = io.BytesIO()
+            image.save(buffer, "JPEG", quality=q, optimize=True)
+            if buffer.tell() <= max_size:
+                return buffer.getvalue()
+
+        width, height = image.size
+        if min(width, height) * _RESIZE_FACTOR < _MIN_DIMENSION:
+            return None
+        image = image.resize((int(width * _RESIZE_FACTOR), int(height * _RESIZE_FACTOR)))
+
+
+class ImageTransformer:
+
+    def __init__(self, max_workers: int = 2, quality: int = 85, max_dimension: int = 4096):
+        """
+        Downscales images too large to be sent to Discord. Images are re-encoded in a pool of worker processes, so
+        the transforms use other CPU cores and never block the event loop. Requires Pillow to be installed.
+
+        :param max_workers: Maximum amount of concurrent transforms.
+        :param quality: JPEG quality to start re-encoding from.
+        :param max_dimension: Maximum width and height of downscaled images in pixels.
+        """
+        self.max_workers = max_workers
+        self.quality = quality
+        self.max_dimension = max_dimension
+        self.transformed = 0
+        self.failed = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._semaphore = asyncio.Semaphore(max_workers)
+
+    @property
+    def available(self) -> bool:
+        """
+        True if Pillow is installed and images can be downscaled.
+        """
+        return Image is not None
+
+    def configure(self, max_workers: int, quality: int, max_dimension: int) -> None:
+        """
+        Change the transform settings. A changed amount of workers takes effect for transforms started after this.
+
+        :param max_workers: Maximum amount of concurrent transforms.
+        :param quality: JPEG quality to start re-encoding from.
+        :param max_dimension: Maximum width and height of downscaled images in pixels.
+        """
+        self.quality = quality
+        self.max_dimension = max_dimension
+        if max_workers != self.max_workers:
+            self.max_workers = max_workers
+            self._semaphore = asyncio.Semaphore(max_workers)
+            self.close()
+
+    async def downscale(self, file: SharedFile, max_size: int) -> Optional[SharedFile]:
+        """
+        Downscale an image to fit a size limit.
+
+        :param file: The image file.
+        :param max_size: Maximum size of the downscaled image in bytes.
+        :return: The downscaled image as a JPEG file, or None if the file cannot be downscaled.
+        """
+        if not self.available:
+            return None
+
+        async with self._semaphore:
+            if self._executor is None:
+                # Forking the bot would copy the locks held by its other threads, e.g. the database writer, to the
+                # workers in their current state
+                self._executor = ProcessPoolExecutor(self.max_workers, mp_context=multiprocessing.get_context("spawn"))
+
+            loop = asyncio.get_running_loop()
+            try:
+                data = await loop.run_in_executor(self._executor, downscale_image, file.data, max_size, self.quality,
+                                                  self.max_dimension)
+            except Exception as e:
+                _logger.warning(f"Failed to downscale image {file.filename}.", exc_info=e)
+                data = None
+
+        if data is None:
+            self.failed += 1
+            return None
+
+        self.transformed += 1
+        _logger.debug(f"Downscaled image {file.filename} from {file.size} to {len(data)} bytes.")
+        return SharedFile(data, Path(file.filename).with_suffix(".jpg").name, spoiler=file.spoiler)
+
+    def close(self) -> None:
+        """
+        Shut down the worker processes. New ones are started when needed.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
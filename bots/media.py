@@ -0,0 +1,129 @@
+"""
+MIT License
+
+Copyright (c) 2025 Niko Mätäsaho
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import io
+import asyncio
+import mimetypes
+from typing import List, Iterable, Optional
+
+import discord
+import filetype
+
+
+# Signatures of all file types recognized by filetype are within the first 262 bytes of a file
+SNIFF_HEADER_SIZE = 262
+
+
+class SharedFile:
+
+    __slots__ = (
+        "data",
+        "filename",
+        "spoiler"
+    )
+
+    def __init__(self, data: bytes, filename: str, spoiler: bool = False):
+        """
+        A downloaded file kept in a single immutable buffer, which can be sent to any number of Discord channels.
+
+        ``discord.File`` objects are consumed by sending them, so a new one must be created for every send. The file
+        bytes are never copied for this, as every ``discord.File`` created by this object reads the same buffer.
+
+        :param data: The file content.
+        :param filename: Filename to show in Discord.
+        :param spoiler: Mark the file as a spoiler in Discord.
+        """
+        self.data = data
+        self.filename = filename
+        self.spoiler = spoiler
+
+    @property
+    def size(self) -> int:
+        """
+        Size of the file in bytes.
+        """
+        return len(self.data)
+
+    def to_discord_file(self) -> discord.File:
+        """
+        Create a new ``discord.File`` reading the shared buffer.
+
+        :return: A ``discord.File`` object ready to be sent once.
+        """
+        # BytesIO shares the memory of an immutable bytes object until it is written to, so this does not copy the data
+        return discord.File(io.BytesIO(self.data), filename=self.filename, spoiler=self.spoiler)
+
+
+def to_discord_files(files: Optional[Iterable[SharedFile]]) -> List[discord.File]:
+    """
+    Create new ``discord.File`` objects for a single send from shared files.
+
+    :param files: The shared files. None is handled as no files.
+    :return: A list of ``discord.File`` objects.
+    """
+    if not files:
+        return []
+    return [file.to_discord_file() for file in files]
+
+
+def append_attachment_urls(text: Optional[str], attachments: Iterable[discord.Attachment]) -> Optional[str]:
+    """
+    Append URLs of already uploaded Discord attachments to a message text content. Discord renders such URLs inline,
+    which allows reusing an uploaded file in other channels without uploading it again. URLs of spoiler attachments
+    are marked as spoilers too.
+
+    :param text: The original text content, if any.
+    :param attachments: Attachments of an already sent Discord message.
+    :return: The text content with attachment URLs appended on their own lines.
+    """
+    urls = [f"||{attachment.url}||" if attachment.is_spoiler() else attachment.url for attachment in attachments]
+    if not urls:
+        return text
+
+    if text:
+        return "\n".join([text, *urls])
+    return "\n".join(urls)
+
+
+async def guess_extension(header: bytes, mime_type: Optional[str] = None) -> Optional[str]:
+    """
+    Guess a file extension for a file missing one. The file type is sniffed from the file header in a worker thread,
+    and the MIME type reported by Telegram is used only if sniffing does not recognize the file.
+
+    :param header: The first bytes of the file. Only ``SNIFF_HEADER_SIZE`` bytes are inspected.
+    :param mime_type: MIME type of the file, if known.
+    :return: The extension without a leading dot, or None if the file type is not recognized.
+    """
+    extension = await asyncio.to_thread(filetype.guess_extension, header[:SNIFF_HEADER_SIZE])
+    if extension:
+        return extension
+
+    # Telegram reports unknown documents as generic binary, which would only give them a useless .bin extension
+    if mime_type and mime_type != "application/octet-stream":
+        extension = mimetypes.guess_extension(mime_type)
+        if extension:
+            return extension.lstrip(".")
+
+    return None
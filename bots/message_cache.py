@@ -0,0 +1,90 @@
+"""
+MIT License
+
+Copyright (c) 2025 Niko Mätäsaho
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import logging
+from collections import OrderedDict
+from typing import Any, Union
+
+import discord
+
+
+_logger = logging.getLogger(__name__)
+
+
+class DiscordMessageCache:
+
+    def __init__(self, max_size: int = 1000):
+        """
+        A least recently used cache for Discord messages sent by the bot. Cached messages can be replied to and edited
+        without fetching them from the Discord API first.
+
+        :param max_size: Maximum amount of messages in the cache. The least recently used messages are dropped when
+                         the cache is full.
+        """
+        self.max_size = max_size
+        self._cache: OrderedDict[int, discord.Message] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def __contains__(self, message_id: int) -> bool:
+        return message_id in self._cache
+
+    def add(self, message: discord.Message) -> None:
+        """
+        Add a Discord message to the cache, or refresh it if it already is cached.
+
+        :param message: The Discord message.
+        """
+        self._cache[message.id] = message
+        self._cache.move_to_end(message.id)
+
+        if len(self._cache) > self.max_size:
+            self._cache.popitem(last=False)
+
+    def get(self, message_id: int, default: Any = None) -> Union[discord.Message, Any]:
+        """
+        Get a Discord message from the cache.
+
+        :param message_id: ID of the Discord message.
+        :param default: Value to return if the message is not cached.
+        :return: The cached Discord message or the default value.
+        """
+        try:
+            message = self._cache[message_id]
+        except KeyError:
+            return default
+
+        self._cache.move_to_end(message_id)
+        return message
+
+    def discard(self, message_id: int) -> None:
+        """
+        Remove a Discord message from the cache if it is cached.
+
+        :param message_id: ID of the Discord message.
+        """
+        if self._cache.pop(message_id, None) is not None:
+            _logger.debug(f"Discarded Discord message {message_id} from message cache")
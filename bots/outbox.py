@@ -0,0 +1,192 @@
+"""
+MIT License
+
+Copyright (c) 2025 Niko Mätäsaho
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import json
+from typing import List, Optional
+
+import discord
+
+import telegram
+
+
+class MediaReference:
+
+    __slots__ = (
+        "file_id",
+        "file_unique_id",
+        "file_size",
+        "mime_type"
+    )
+
+    def __init__(self, file_id: str, file_unique_id: str, file_size: int, mime_type: Optional[str] = None):
+        """
+        A reference to a file in Telegram servers. Stored instead of the file itself, so that the file can be
+        downloaded again if its delivery must be retried.
+
+        :param file_id: Telegram file ID used for downloading the file.
+        :param file_unique_id: Telegram unique file ID.
+        :param file_size: File size in bytes.
+        :param mime_type: MIME type of the file, if reported by Telegram.
+        """
+        self.file_id = file_id
+        self.file_unique_id = file_unique_id
+        self.file_size = file_size
+        self.mime_type = mime_type
+
+    @classmethod
+    def from_media(cls, media: telegram.MediaBase) -> 'MediaReference':
+        # Photos and stickers have no MIME type
+        return cls(media.file_id, media.file_unique_id, media.file_size, getattr(media, "mime_type", None))
+
+    def to_media(self) -> telegram.MediaBase:
+        """
+        Convert the reference back to a Telegram media object that can be downloaded.
+
+        :return: The media object.
+        """
+        return telegram.MediaBase(dict(file_id=self.file_id, file_unique_id=self.file_unique_id,
+                                       file_size=self.file_size))
+
+    def as_dict(self) -> dict:
+        return dict(file_id=self.file_id, file_unique_id=self.file_unique_id, file_size=self.file_size,
+                    mime_type=self.mime_type)
+
+
+class OutboxPayload:
+
+    __slots__ = (
+        "text",
+        "embed",
+        "username",
+        "media",
+        "spoiler"
+    )
+
+    def __init__(
+            self,
+            text: Optional[str] = None,
+            embed: Optional[discord.Embed] = None,
+            username: Optional[str] = None,
+            media: List[MediaReference] = None,
+            spoiler: bool = False
+    ):
+        """
+        A rendered Discord message waiting for delivery. The payload can be stored to the outbox in the database and
+        delivered later from there.
+
+        :param text: Text content of the message.
+        :param embed: Embed of the message.
+        :param username: Username to show for webhook messages.
+        :param media: References to Telegram files to send with the message.
+        :param spoiler: Mark the files as spoilers in Discord.
+        """
+        self.text = text
+        self.embed = embed
+        self.username = username
+        self.media = media or []
+        self.spoiler = spoiler
+
+    @property
+    def is_empty(self) -> bool:
+        """
+        True if the payload has no content to send.
+        """
+        return not self.text and not self.embed and not self.media
+
+    def to_json(self) -> str:
+        """
+        Serialize the payload to JSON for storing it to the outbox.
+
+        :return: The payload as a JSON string.
+        """
+        return json.dumps(dict(
+            text=self.text,
+            embed=self.embed.to_dict() if self.embed else None,
+            username=self.username,
+            media=[m.as_dict() for m in self.media],
+            spoiler=self.spoiler
+        ))
+
+    @classmethod
+    def from_json(cls, data: str) -> 'OutboxPayload':
+        """
+        Deserialize a payload stored to the outbox.
+
+        :param data: The payload as a JSON string.
+        :return: The payload object.
+        """
+        d = json.loads(data)
+        embed = discord.Embed.from_dict(d["embed"]) if d.get("embed") else None
+        media = [MediaReference(**m) for m in d.get("media", [])]
+        return cls(d.get("text"), embed, d.get("username"), media, d.get("spoiler", False))
+
+
+class OutboxDelivery:
+
+    __slots__ = (
+        "id",
+        "tg_chat_id",
+        "tg_message_id",
+        "channel_id",
+        "reply_to_message_id",
+        "payload",
+        "attempts"
+    )
+
+    def __init__(
+            self,
+            outbox_id: int,
+            tg_chat_id: int,
+            tg_message_id: int,
+            channel_id: int,
+            reply_to_message_id: Optional[int],
+            payload: OutboxPayload,
+            attempts: int = 0
+    ):
+        """
+        A single pending delivery of a payload to a Discord channel.
+
+        :param outbox_id: ID of the delivery in the outbox.
+        :param tg_chat_id: ID of the Telegram chat of the message the payload was rendered from.
+        :param tg_message_id: ID of the Telegram message the payload was rendered from.
+        :param channel_id: ID of the destination Discord channel.
+        :param reply_to_message_id: ID of a Discord message to reply to, or None to send a new message.
+        :param payload: The payload to deliver.
+        :param attempts: Amount of failed delivery attempts so far.
+        """
+        self.id = outbox_id
+        self.tg_chat_id = tg_chat_id
+        self.tg_message_id = tg_message_id
+        self.channel_id = channel_id
+        self.reply_to_message_id = reply_to_message_id
+        self.payload = payload
+        self.attempts = attempts
+
+    @property
+    def is_reply(self) -> bool:
+        """
+        True if the delivery is a reply to an existing Discord message.
+        """
+        return self.reply_to_message_id is not None
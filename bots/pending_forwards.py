@@ -0,0 +1,94 @@
+"""
+MIT License
+
+Copyright (c) 2025 Niko Mätäsaho
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import asyncio
+import logging
+from contextlib import contextmanager
+from typing import Dict, Iterator, Tuple
+
+
+_logger = logging.getLogger(__name__)
+
+
+class PendingForwards:
+
+    def __init__(self, timeout: float = 30):
+        """
+        A registry of Telegram messages being forwarded to Discord. Replies and edits can wait for the forward of their
+        parent message to complete, instead of finding no message references and handling the parent as an orphan.
+
+        :param timeout: Default maximum time in seconds to wait for a pending forward.
+        """
+        self.timeout = timeout
+        self._pending: Dict[Tuple[int, int], asyncio.Event] = {}
+
+    def __contains__(self, key: Tuple[int, int]) -> bool:
+        return key in self._pending
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    @contextmanager
+    def track(self, tg_chat_id: int, tg_message_id: int) -> Iterator[None]:
+        """
+        A context manager marking a Telegram message pending for the duration of its forward. Waiters are released when
+        the context exits, whether the forward succeeded or not.
+
+        :param tg_chat_id: ID of the Telegram chat of the message. Message IDs are only unique within a chat.
+        :param tg_message_id: ID of the Telegram message being forwarded.
+        """
+        key = (tg_chat_id, tg_message_id)
+        event = asyncio.Event()
+        self._pending[key] = event
+        try:
+            yield
+        finally:
+            if self._pending.get(key) is event:
+                del self._pending[key]
+            event.set()
+
+    async def wait(self, tg_chat_id: int, tg_message_id: int, timeout: float = None) -> bool:
+        """
+        Wait for a pending forward of a Telegram message to complete. Returns immediately if the message is not
+        pending.
+
+        :param tg_chat_id: ID of the Telegram chat of the message.
+        :param tg_message_id: ID of the Telegram message.
+        :param timeout: Maximum time in seconds to wait. If omitted, the default timeout is used.
+        :return: True if the message is not pending anymore, False if the wait timed out.
+        """
+        event = self._pending.get((tg_chat_id, tg_message_id))
+        if event is None:
+            return True
+
+        _logger.debug(f"Waiting for the pending forward of Telegram message {tg_message_id} in chat {tg_chat_id}")
+        try:
+            await asyncio.wait_for(event.wait(), timeout if timeout is not None else self.timeout)
+        except asyncio.TimeoutError:
+            _logger.warning(f"Timed out waiting for the pending forward of Telegram message {tg_message_id} in chat "
+                            f"{tg_chat_id}")
+            return False
+
+        return True
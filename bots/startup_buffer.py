@@ -0,0 +1,126 @@
+"""
+MIT License
+
+Copyright (c) 2025 Niko Mätäsaho
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Optional, Set
+
+
+_logger = logging.getLogger(__name__)
+
+
+class StartupBuffer:
+
+    def __init__(self):
+        """
+        Buffers work received before the Discord bot is ready. Buffered work is started immediately, so that it can be
+        prepared while the bot connects to Discord, but it must wait for its turn before delivering anything. Once the
+        bot is ready, all buffered work is released at once in the order it was received.
+        """
+        self.started_at = time.monotonic()
+        self.ready_delay: Optional[float] = None
+        self.first_forward_delay: Optional[float] = None
+        self.buffered = 0
+        self._ready = asyncio.Event()
+        self._last_turn: Optional[asyncio.Future] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    @property
+    def is_buffering(self) -> bool:
+        """
+        True until the buffer is flushed.
+        """
+        return not self._ready.is_set()
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    def add(self, work: Callable[[Callable[[], Awaitable[None]]], Awaitable[None]]) -> None:
+        """
+        Buffer work until the buffer is flushed.
+
+        :param work: Coroutine function doing the work. Called immediately with a coroutine function that waits for the
+                     turn of the work to deliver: the buffer is flushed and all earlier work has reached its turn.
+        """
+        previous_turn = self._last_turn
+        turn = asyncio.get_running_loop().create_future()
+        self._last_turn = turn
+        self.buffered += 1
+
+        async def wait_turn() -> None:
+            await self._ready.wait()
+            if previous_turn is not None:
+                await asyncio.shield(previous_turn)
+            turn.set_result(None)
+
+        task = asyncio.create_task(self._run(work(wait_turn), turn, previous_turn))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    @staticmethod
+    async def _run(work: Awaitable[None], turn: asyncio.Future, previous_turn: Optional[asyncio.Future]) -> None:
+        try:
+            await work
+        except Exception as e:
+            _logger.error("Ignoring unexpected exception in buffered work: ", exc_info=e)
+        finally:
+            # Work failing before its turn must not block work buffered after it, but neither let it skip the queue
+            if not turn.done():
+                if previous_turn is None or previous_turn.done():
+                    turn.set_result(None)
+                else:
+                    previous_turn.add_done_callback(lambda _: turn.done() or turn.set_result(None))
+
+    def flush(self) -> None:
+        """
+        Release all buffered work. Work added after flushing does not have to wait for its turn.
+        """
+        if not self.is_buffering:
+            return
+
+        self.ready_delay = time.monotonic() - self.started_at
+        _logger.info(f"Discord bot ready {self.ready_delay:.2f} seconds after startup. Releasing {len(self._tasks)} "
+                     f"buffered messages.")
+        self._ready.set()
+
+    def record_forward(self) -> None:
+        """
+        Record a completed forward. The time from startup to the first forward is logged.
+        """
+        if self.first_forward_delay is not None:
+            return
+
+        self.first_forward_delay = time.monotonic() - self.started_at
+        _logger.info(f"First message forwarded {self.first_forward_delay:.2f} seconds after startup.")
+
+    async def close(self) -> None:
+        """
+        Cancel all buffered work.
+        """
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -43,7 +43,12 @@ class TelegramBot(telegram.Client):
         :param loop: An existing asyncio loop where to attach to.
         :param config: A ``Config`` object to load telegram configuration from.
         """
-        super().__init__(loop)
+        journal = None
+        if config.general.update_journal_directory:
+            journal = telegram.UpdateJournal(config.general.update_journal_directory,
+                                             max_segments=config.general.update_journal_max_segments)
+        # The bot sees the same chat and senders all the time
+        super().__init__(loop, intern_objects=True, journal=journal)
         self.update_age_threshold = config.preferences.update_age_threshold
         self.telegram_channel_id = config.channel_ids.telegram
         self.ignored_users = config.users.ignored_users
@@ -0,0 +1,182 @@
+"""
+MIT License
+
+Copyright (c) 2025 Niko Mätäsaho
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import asyncio
+import logging
+from typing import Dict, Optional
+
+import discord
+
+from bots.discord_bot import DiscordBot
+
+
+_logger = logging.getLogger(__name__)
+
+WEBHOOK_NAME = "GlasnostBot"
+_USERNAME_MAX_LENGTH = 80
+_FORBIDDEN_USERNAME_PARTS = ("discord", "clyde")
+
+
+class PartialWebhookMessage:
+
+    __slots__ = (
+        "id",
+        "channel",
+        "webhook"
+    )
+
+    def __init__(self, message_id: int, channel: discord.TextChannel, webhook: discord.Webhook):
+        """
+        A reference to a message sent through a webhook, built from stored IDs without any API calls. Can be edited
+        and replied to like a ``discord.PartialMessage``.
+
+        :param message_id: ID of the webhook message.
+        :param channel: Channel of the webhook message.
+        :param webhook: The webhook the message was sent with. Only this webhook can edit the message.
+        """
+        self.id = message_id
+        self.channel = channel
+        self.webhook = webhook
+
+    async def edit(self, **kwargs) -> discord.WebhookMessage:
+        """
+        Edit the message through its webhook. Takes the same keyword arguments as ``discord.Webhook.edit_message``.
+
+        :return: The edited message.
+        """
+        return await self.webhook.edit_message(self.id, **kwargs)
+
+    async def reply(self, content: Optional[str] = None, **kwargs) -> discord.Message:
+        """
+        Reply to the message as the bot user, as webhooks cannot reply to messages. Takes the same keyword arguments as
+        ``discord.PartialMessage.reply``.
+
+        :param content: Text content of the reply.
+        :return: The sent reply.
+        """
+        return await self.channel.get_partial_message(self.id).reply(content, **kwargs)
+
+
+class WebhookManager:
+
+    def __init__(self, bot: DiscordBot):
+        """
+        Creates and caches one webhook per Discord channel for forwarding messages. Existing webhooks created earlier
+        by the bot are reused.
+
+        :param bot: The Discord bot owning the webhooks. The bot needs Manage Webhooks permission in the channels.
+        """
+        self.bot = bot
+        self._webhooks: Dict[int, discord.Webhook] = {}
+        self._webhooks_by_id: Dict[int, discord.Webhook] = {}
+        self._locks: Dict[int, asyncio.Lock] = {}
+
+    def _add(self, channel_id: int, webhook: discord.Webhook) -> None:
+        self._webhooks[channel_id] = webhook
+        self._webhooks_by_id[webhook.id] = webhook
+
+    def get_cached(self, channel_id: int) -> Optional[discord.Webhook]:
+        """
+        Get the forwarding webhook of a channel without any API calls.
+
+        :param channel_id: ID of the channel.
+        :return: The webhook, or None if the webhook of the channel has not been fetched or created yet.
+        """
+        return self._webhooks.get(channel_id)
+
+    async def get(self, channel: discord.TextChannel) -> discord.Webhook:
+        """
+        Get the forwarding webhook of a channel, creating it if the channel does not have one.
+
+        :param channel: The Discord channel.
+        :return: The webhook.
+        """
+        webhook = self._webhooks.get(channel.id)
+        if webhook is not None:
+            return webhook
+
+        lock = self._locks.setdefault(channel.id, asyncio.Lock())
+        async with lock:
+            webhook = self._webhooks.get(channel.id)
+            if webhook is not None:
+                return webhook
+
+            for existing in await channel.webhooks():
+                if existing.user == self.bot.user and existing.name == WEBHOOK_NAME and existing.token:
+                    webhook = existing
+                    break
+            else:
+                webhook = await channel.create_webhook(name=WEBHOOK_NAME, reason="Forwarding Telegram messages")
+                _logger.info(f"Created webhook {webhook.id} for channel {channel.id}")
+
+            self._add(channel.id, webhook)
+            return webhook
+
+    async def get_by_id(self, channel: discord.TextChannel, webhook_id: int) -> Optional[discord.Webhook]:
+        """
+        Get a webhook of a channel by its ID.
+
+        :param channel: The Discord channel the webhook belongs to.
+        :param webhook_id: ID of the webhook.
+        :return: The webhook, or None if the channel has no such webhook usable by the bot.
+        """
+        webhook = self._webhooks_by_id.get(webhook_id)
+        if webhook is not None:
+            return webhook
+
+        for existing in await channel.webhooks():
+            if existing.id == webhook_id and existing.token:
+                self._webhooks_by_id[webhook_id] = existing
+                return existing
+
+        _logger.warning(f"Webhook {webhook_id} not found from channel {channel.id}")
+        return None
+
+    def forget(self, channel_id: int) -> None:
+        """
+        Forget the cached webhook of a channel, e.g. after it was deleted from Discord.
+
+        :param channel_id: ID of the channel.
+        """
+        webhook = self._webhooks.pop(channel_id, None)
+        if webhook is not None:
+            self._webhooks_by_id.pop(webhook.id, None)
+
+
+def webhook_username(name: Optional[str]) -> Optional[str]:
+    """
+    Make a name usable as a webhook username. Discord limits the length of webhook usernames and rejects some words in
+    them.
+
+    :param name: The name to use, e.g. a Telegram sender name.
+    :return: The username, or None if the name cannot be used and the webhook default name should be used instead.
+    """
+    if not name:
+        return None
+
+    lowered = name.lower()
+    if any(part in lowered for part in _FORBIDDEN_USERNAME_PARTS):
+        return None
+    return name[:_USERNAME_MAX_LENGTH]
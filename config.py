@@ -67,6 +67,22 @@ class __ConfigSection:
         """
         raise NotImplementedError(f"generate_default method not implemented in {cls.__name__}")
 
+    @classmethod
+    def with_defaults(cls, section_dict: dict):
+        """
+        Initialize a config section from a dictionary, using default values for variables missing from it. This keeps
+        configuration files written for older versions of the bot working when new variables are added.
+
+        :param section_dict: Config section as a dictionary.
+        :return: A config section object.
+        """
+        section = cls.generate_default()
+        for key, value in section_dict.items():
+            setattr(section, key, value)
+
+        return section
+
+
 class _Preferences(__ConfigSection):
 
     __slots__ = (
@@ -74,7 +90,12 @@ class _Preferences(__ConfigSection):
         "prefer_telegram_usernames",
         "send_orphans_as_new_message",
         "message_cleanup_threshold",
-        "update_age_threshold"
+        "update_age_threshold",
+        "reuse_uploaded_attachments",
+        "edit_debounce_seconds",
+        "use_webhooks",
+        "pending_forward_timeout",
+        "outbox_max_attempts"
     )
 
     def __init__(self, preferences_dict: dict):
@@ -91,7 +112,12 @@ class _Preferences(__ConfigSection):
                         prefer_telegram_usernames=True,
                         send_orphans_as_new_message=True,
                         message_cleanup_threshold=30,
-                        update_age_threshold=600))
+                        update_age_threshold=600,
+                        reuse_uploaded_attachments=False,
+                        edit_debounce_seconds=2,
+                        use_webhooks=False,
+                        pending_forward_timeout=30,
+                        outbox_max_attempts=10))
 
 
 class _BotSettings(__ConfigSection):
@@ -179,7 +205,9 @@ class _General(__ConfigSection):
 
     __slots__ = (
         "logging_level",
-        "database_path"
+        "database_path",
+        "update_journal_directory",
+        "update_journal_max_segments"
     )
 
     def __init__(self, general_dict: dict):
@@ -193,7 +221,77 @@ class _General(__ConfigSection):
     @classmethod
     def generate_default(cls):
         return cls(dict(logging_level="INFO",
-                        database_path="glasnost.db"))
+                        database_path="glasnost.db",
+                        update_journal_directory="",
+                        update_journal_max_segments=64))
+
+
+class _Media(__ConfigSection):
+
+    __slots__ = (
+        "max_file_size",
+        "downscale_images",
+        "image_quality",
+        "max_image_dimension",
+        "max_concurrent_transforms"
+    )
+
+    def __init__(self, media_dict: dict):
+        """
+        An object representing media section in a TOML file.
+
+        :param media_dict: A media section as a dictionary.
+        """
+        super().__init__(media_dict)
+
+    @classmethod
+    def generate_default(cls):
+        return cls(dict(max_file_size=10,
+                        downscale_images=True,
+                        image_quality=85,
+                        max_image_dimension=4096,
+                        max_concurrent_transforms=2))
+
+
+class _Database(__ConfigSection):
+
+    __slots__ = (
+        "journal_mode",
+        "synchronous",
+        "cache_size",
+        "mmap_size",
+        "temp_store",
+        "busy_timeout",
+        "reference_cache_size",
+        "warm_references",
+        "backend",
+        "backup_interval",
+        "backup_retention",
+        "backup_directory"
+    )
+
+    def __init__(self, database_dict: dict):
+        """
+        An object representing database section in a TOML file.
+
+        :param database_dict: A database section as a dictionary.
+        """
+        super().__init__(database_dict)
+
+    @classmethod
+    def generate_default(cls):
+        return cls(dict(journal_mode="WAL",
+                        synchronous="NORMAL",
+                        cache_size=-16000,
+                        mmap_size=268435456,
+                        temp_store="MEMORY",
+                        busy_timeout=5000,
+                        reference_cache_size=10000,
+                        warm_references=1000,
+                        backend="sqlite",
+                        backup_interval=24,
+                        backup_retention=7,
+                        backup_directory="backups"))
 
 
 class Config:
@@ -234,6 +332,14 @@ class Config:
         """
         Preferences section of the current configuration file.
         """
+        self.media: _Media = Missing
+        """
+        Media section of the current configuration file.
+        """
+        self.database: _Database = Missing
+        """
+        Database section of the current configuration file.
+        """
 
         if config_path:
             self.load()
@@ -252,6 +358,8 @@ class Config:
         obj.users = _Users.generate_default()
         obj.bot_settings = _BotSettings.generate_default()
         obj.preferences = _Preferences.generate_default()
+        obj.media = _Media.generate_default()
+        obj.database = _Database.generate_default()
 
         return obj
 
@@ -273,12 +381,14 @@ class Config:
         else:
             config = toml.load(self.config_path)
 
-        self.general = _General(config["general"])
+        self.general = _General.with_defaults(config["general"])
         self.credentials = _Credentials(config["credentials"])
         self.channel_ids = _ChannelIds(config["channel_ids"])
         self.users = _Users(config["users"])
         self.bot_settings = _BotSettings(config["bot_settings"])
-        self.preferences = _Preferences(config["preferences"])
+        self.preferences = _Preferences.with_defaults(config["preferences"])
+        self.media = _Media.with_defaults(config.get("media", {}))
+        self.database = _Database.with_defaults(config.get("database", {}))
 
     def save(self, output_file: str):
         """
@@ -23,51 +23,389 @@ SOFTWARE.
 """
 
 
+import asyncio
+import itertools
 import logging
+import queue
 import sqlite3
-from datetime import datetime
-from typing import List, Union, Tuple
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, UTC
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Union, Tuple, Optional
 
 import discord
 
+from reference_stores import DbmReferenceStore, MemoryReferenceStore, NewReference, ReferenceStore
+
 
 _logger = logging.getLogger(__name__)
 
+# PRAGMAs that can be set for connections with a connection profile
+CONNECTION_PRAGMAS = (
+    "journal_mode",
+    "synchronous",
+    "cache_size",
+    "mmap_size",
+    "temp_store",
+    "busy_timeout"
+)
+
+
+# Length of a message reference partition in seconds. A week keeps the amount of partitions in the view well below the
+# limit of 500 compound selects in SQLite even with years of retention.
+PARTITION_LENGTH = 7 * 24 * 60 * 60
+# Maximum amount of parameters in a query in SQLite versions older than 3.32
+_MAX_QUERY_PARAMETERS = 999
+
+# Column definitions and indexes of message reference partitions. Migrations must keep using the schema of their own
+# schema version, as later migrations expect it.
+_PARTITION_COLUMNS_V6 = (
+    "message_id INTEGER PRIMARY KEY",
+    "channel_id INTEGER NOT NULL",
+    "guild_id NOT NULL",
+    "tg_message_id INTEGER NOT NULL",
+    "ts INTEGER NOT NULL",
+    "webhook_id INTEGER"
+)
+_PARTITION_INDEXES_V6 = {
+    "tg_message_id": "tg_message_id",
+    "ts": "ts"
+}
+_PARTITION_COLUMNS = (
+    "message_id INTEGER PRIMARY KEY",
+    "channel_id INTEGER NOT NULL",
+    "guild_id INTEGER NOT NULL",
+    "tg_chat_id INTEGER NOT NULL",
+    "tg_message_id INTEGER NOT NULL",
+    "ts INTEGER NOT NULL",
+    "webhook_id INTEGER"
+)
+_PARTITION_INDEXES = {
+    # Covers the lookups by Telegram messages, as the message ID is the rowid and included in every index
+    "tg_chat_message": "tg_chat_id, tg_message_id, channel_id, webhook_id",
+    # Only the oldest partition is ever deleted from partially by age, but it may be large
+    "ts": "ts"
+}
+
+
+def _column_names(columns: Tuple[str, ...]) -> str:
+    return ", ".join(column.split()[0] for column in columns)
+
+
+_REFERENCE_COLUMNS = _column_names(_PARTITION_COLUMNS)
+# Columns of message references, in the order used for exporting and importing them
+REFERENCE_COLUMNS = tuple(_REFERENCE_COLUMNS.split(", "))
+
+
+def _partition_start(ts: int) -> int:
+    return ts - ts % PARTITION_LENGTH
+
+
+def _create_partition(
+        cursor: sqlite3.Cursor,
+        start_ts: int,
+        columns: Tuple[str, ...] = _PARTITION_COLUMNS,
+        indexes: Dict[str, str] = None
+) -> str:
+    """
+    Create a partition of message references and add it to the partition registry. The partition view must be
+    rebuilt after this.
+
+    :param cursor: Cursor to execute the statements with.
+    :param start_ts: Timestamp of the first second in the partition.
+    :param columns: Column definitions of the partition table.
+    :param indexes: Dictionary of index name suffixes and indexed columns. Defaults to the indexes of the latest schema.
+    :return: Name of the partition table.
+    """
+    if indexes is None:
+        indexes = _PARTITION_INDEXES
+
+    name = f"discord_messages_{datetime.fromtimestamp(start_ts, UTC):%Y%m%d}"
+    cursor.execute(f"CREATE TABLE IF NOT EXISTS {name} ({', '.join(columns)})")
+    _index_partition(cursor, name, indexes)
+    cursor.execute("INSERT OR IGNORE INTO message_partitions (name, start_ts, end_ts) VALUES (?, ?, ?)",
+                   (name, start_ts, start_ts + PARTITION_LENGTH))
+    return name
+
+
+def _index_partition(cursor: sqlite3.Cursor, name: str, indexes: Dict[str, str] = None) -> None:
+    """
+    Create the indexes of a partition of message references.
+
+    :param cursor: Cursor to execute the statements with.
+    :param name: Name of the partition table.
+    :param indexes: Dictionary of index name suffixes and indexed columns. Defaults to the indexes of the latest schema.
+    """
+    if indexes is None:
+        indexes = _PARTITION_INDEXES
+
+    for suffix, indexed_columns in indexes.items():
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {name}_{suffix} ON {name} ({indexed_columns})")
+
+
+def _rebuild_partition_view(cursor: sqlite3.Cursor, columns: str = _REFERENCE_COLUMNS) -> None:
+    """
+    Rebuild view discord_messages combining all partitions of message references. Lookups through the view are pushed
+    down to the partitions, so they use the indexes of the partitions.
+    """
+    partitions = [row[0] for row in cursor.execute("SELECT name FROM message_partitions ORDER BY start_ts")]
+    if partitions:
+        selects = " UNION ALL ".join(f"SELECT {columns} FROM {name}" for name in partitions)
+    else:
+        selects = f"SELECT {', '.join(f'NULL AS {column}' for column in columns.split(', '))} WHERE 0"
+
+    cursor.execute("DROP VIEW IF EXISTS discord_messages")
+    cursor.execute(f"CREATE VIEW discord_messages AS {selects}")
+
+
+def _create_discord_messages(cursor: sqlite3.Cursor, defaults: Dict[str, Any]) -> None:
+    """
+    Create table discord_messages
+    """
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS discord_messages (
+            message_id INTEGER PRIMARY KEY,
+            channel_id INTEGER NOT NULL,
+            guild_id NOT NULL,
+            tg_message_id INTEGER NOT NULL,
+            ts INTEGER NOT NULL
+        );
+        """
+    )
+
+
+def _add_webhook_id(cursor: sqlite3.Cursor, defaults: Dict[str, Any]) -> None:
+    """
+    Add column webhook_id to table discord_messages
+    """
+    # Databases created before schema versioning may already have the column
+    columns = [row[1] for row in cursor.execute("PRAGMA table_info(discord_messages)")]
+    if "webhook_id" not in columns:
+        cursor.execute("ALTER TABLE discord_messages ADD COLUMN webhook_id INTEGER")
+
+
+def _create_outbox(cursor: sqlite3.Cursor, defaults: Dict[str, Any]) -> None:
+    """
+    Create table outbox
+    """
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS outbox (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            tg_message_id INTEGER NOT NULL,
+            channel_id INTEGER NOT NULL,
+            reply_to_message_id INTEGER,
+            payload TEXT NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt_ts INTEGER NOT NULL,
+            created_ts INTEGER NOT NULL
+        );
+        """
+    )
+
+
+def _index_tg_message_id(cursor: sqlite3.Cursor, defaults: Dict[str, Any]) -> None:
+    """
+    Index Telegram message IDs of table discord_messages
+    """
+    cursor.execute("CREATE INDEX IF NOT EXISTS discord_messages_tg_message_id ON discord_messages (tg_message_id)")
+
+
+def _index_ts(cursor: sqlite3.Cursor, defaults: Dict[str, Any]) -> None:
+    """
+    Index timestamps of table discord_messages
+    """
+    cursor.execute("CREATE INDEX IF NOT EXISTS discord_messages_ts ON discord_messages (ts)")
+
+
+def _partition_discord_messages(cursor: sqlite3.Cursor, defaults: Dict[str, Any]) -> None:
+    """
+    Split table discord_messages to weekly partitions
+    """
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS message_partitions (
+            name TEXT PRIMARY KEY,
+            start_ts INTEGER NOT NULL,
+            end_ts INTEGER NOT NULL
+        );
+        """
+    )
+
+    partition_starts = [row[0] for row in cursor.execute(
+        f"SELECT DISTINCT ts - ts % {PARTITION_LENGTH} FROM discord_messages"
+    )]
+    columns = _column_names(_PARTITION_COLUMNS_V6)
+    for start_ts in partition_starts:
+        partition = _create_partition(cursor, start_ts, _PARTITION_COLUMNS_V6, _PARTITION_INDEXES_V6)
+        cursor.execute(
+            f"""
+            INSERT INTO {partition} ({columns})
+            SELECT {columns} FROM discord_messages WHERE ts >= ? AND ts < ?
+            """, (start_ts, start_ts + PARTITION_LENGTH)
+        )
+
+    cursor.execute("DROP TABLE discord_messages")
+    _rebuild_partition_view(cursor, columns)
+
 
-class DatabaseHandler:
+def _add_tg_chat_id(cursor: sqlite3.Cursor, defaults: Dict[str, Any]) -> None:
+    """
+    Add Telegram chat IDs to message references and the outbox
+    """
+    tg_chat_id = defaults.get("tg_chat_id")
+    partitions = cursor.execute("SELECT name, start_ts FROM message_partitions").fetchall()
+    has_rows = any(cursor.execute(f"SELECT EXISTS (SELECT 1 FROM {name})").fetchone()[0] for name, _ in partitions)
+    has_rows = has_rows or cursor.execute("SELECT EXISTS (SELECT 1 FROM outbox)").fetchone()[0]
+    if has_rows and tg_chat_id is None:
+        raise ValueError("Telegram chat ID of the existing message references is needed for migrating them.")
 
-    def __init__(self, database_path: str, pragma_foreign_keys: bool = False) -> None:
+    # Partitions cannot be renamed while the view refers to them
+    cursor.execute("DROP VIEW discord_messages")
+    old_columns = _column_names(_PARTITION_COLUMNS_V6)
+    for name, start_ts in partitions:
+        for suffix in _PARTITION_INDEXES_V6:
+            cursor.execute(f"DROP INDEX IF EXISTS {name}_{suffix}")
+        cursor.execute(f"ALTER TABLE {name} RENAME TO {name}_old")
+        _create_partition(cursor, start_ts)
+        cursor.execute(
+            f"""
+            INSERT INTO {name} ({old_columns}, tg_chat_id)
+            SELECT {old_columns}, ? FROM {name}_old
+            """, (tg_chat_id, )
+        )
+        cursor.execute(f"DROP TABLE {name}_old")
+    _rebuild_partition_view(cursor)
+
+    cursor.execute("ALTER TABLE outbox ADD COLUMN tg_chat_id INTEGER")
+    cursor.execute("UPDATE outbox SET tg_chat_id = ?", (tg_chat_id, ))
+
+
+# Migrations are applied in this order, and the schema version is the amount of applied migrations. Never reorder or
+# remove migrations, only append new ones. Migrations get a dictionary of default values for data that was not stored
+# in older schema versions.
+_MIGRATIONS: List[Callable[[sqlite3.Cursor, Dict[str, Any]], None]] = [
+    _create_discord_messages,
+    _add_webhook_id,
+    _create_outbox,
+    _index_tg_message_id,
+    _index_ts,
+    _partition_discord_messages,
+    _add_tg_chat_id
+]
+
+
+class DatabaseHandler(ReferenceStore):
+
+    def __init__(
+            self,
+            database_path: str,
+            pragma_foreign_keys: bool = False,
+            ensure_tables: bool = True,
+            profile: Dict[str, Union[str, int]] = None,
+            read_only: bool = False,
+            migration_defaults: Dict[str, Any] = None
+    ) -> None:
+        """
+        A handler for the database storing references between Telegram and Discord messages. References are keyed by
+        Telegram chat IDs and message IDs, as Telegram message IDs are unique only within a chat. The handler is the
+        SQLite implementation of ``ReferenceStore``, and also stores the outbox.
+
+        :param database_path: Path to the database file.
+        :param pragma_foreign_keys: Enable foreign key constraints.
+        :param ensure_tables: Migrate the database to the latest schema version. Can be disabled for connections used
+                              only for reading.
+        :param profile: Connection profile as a dictionary of PRAGMA names and values. See ``CONNECTION_PRAGMAS`` for
+                        the supported PRAGMAs.
+        :param read_only: Open the database in read-only mode. The database must already exist.
+        :param migration_defaults: Default values for data not stored in older schema versions, needed for migrating
+                                   existing data. Key ``tg_chat_id`` is the Telegram chat of existing message
+                                   references.
+        """
         self.database_path = None
+        self.profile = profile or {}
+        self.read_only = read_only
+        self.migration_defaults = migration_defaults or {}
+        self._batching = False
         self.connection = self.connect(database_path, pragma_foreign_keys)
         self.cursor = self.connection.cursor()
-        self._ensure_table_exists()
+        if ensure_tables:
+            self.migrate()
 
-    def _ensure_table_exists(self) -> None:
-        self.cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS discord_messages (
-                message_id INTEGER PRIMARY KEY,
-                channel_id INTEGER NOT NULL,
-                guild_id NOT NULL,
-                tg_message_id INTEGER NOT NULL,
-                ts INTEGER NOT NULL
-            );
-            """
-        )
+    @property
+    def schema_version(self) -> int:
+        """
+        Version of the database schema, i.e. the amount of migrations applied to the database.
+        """
+        return self.connection.execute("PRAGMA user_version").fetchone()[0]
+
+    def migrate(self, target_version: int = None) -> None:
+        """
+        Apply all migrations not yet applied to the database, in order. Every migration is applied in its own
+        transaction together with the schema version update, so an interrupted migration is applied again from scratch
+        on the next startup.
+
+        :param target_version: Schema version to migrate to. If omitted, the database is migrated to the latest version.
+        """
+        version = self.schema_version
+        if version > len(_MIGRATIONS):
+            _logger.warning(f"Database schema version {version} is newer than the latest known version "
+                            f"{len(_MIGRATIONS)}. The database may have been used with a newer version of the bot.")
+            return
+
+        target_version = len(_MIGRATIONS) if target_version is None else target_version
+        for new_version, migration in enumerate(_MIGRATIONS[version:target_version], start=version + 1):
+            _logger.info(f"Migrating database to schema version {new_version}: {migration.__doc__.strip()}")
+            with self.batch():
+                migration(self.cursor, self.migration_defaults)
+                self.cursor.execute(f"PRAGMA user_version = {new_version}")
 
     def connect(self, database_path: str, pragma_foreign_keys: bool = False) -> sqlite3.Connection:
-        connection = sqlite3.connect(database_path)
+        if self.read_only:
+            connection = sqlite3.connect(f"{Path(database_path).resolve().as_uri()}?mode=ro", uri=True)
+        else:
+            connection = sqlite3.connect(database_path)
         if pragma_foreign_keys:
             connection.execute("PRAGMA foreign_keys = ON")
+        self._apply_profile(connection)
 
         self.connection = connection
         self.cursor = connection.cursor()
         self.database_path = database_path
         on_off = "ON" if pragma_foreign_keys else "OFF"
-        _logger.info(f"Connected to database '{database_path}' with PRAGMA foreign_keys {on_off}")
+        mode = "read-only" if self.read_only else "read-write"
+        _logger.info(f"Connected to database '{database_path}' in {mode} mode with PRAGMA foreign_keys {on_off}")
 
         return connection
 
+    def _apply_profile(self, connection: sqlite3.Connection) -> None:
+        """
+        Set the PRAGMAs of the connection profile for a connection.
+
+        :param connection: The connection.
+        :raises ValueError: If the profile has unsupported PRAGMAs or invalid values.
+        """
+        for pragma, value in self.profile.items():
+            if pragma not in CONNECTION_PRAGMAS:
+                raise ValueError(f"Unsupported PRAGMA {pragma} in database connection profile.")
+            # PRAGMA values cannot be bound as parameters, so only plain words and integers are accepted
+            if not isinstance(value, int) and not str(value).isalnum():
+                raise ValueError(f"Invalid value {value} for PRAGMA {pragma} in database connection profile.")
+            if pragma == "journal_mode" and self.read_only:
+                # Journal mode is a property of the database file and cannot be changed without write access
+                continue
+
+            result = connection.execute(f"PRAGMA {pragma} = {value}").fetchone()
+            if pragma == "journal_mode" and result and result[0].lower() != str(value).lower():
+                _logger.warning(f"Database journal mode {value} is not supported. Using journal mode {result[0]}.")
+
+        _logger.debug(f"Applied database connection profile {self.profile}")
+
     def disconnect(self) -> None:
         _logger.info("Closing database connection")
         self.connection.close()
@@ -75,34 +413,134 @@ class DatabaseHandler:
         self.cursor = None
         _logger.debug("Connection closed")
 
-    def add(self, tg_message_id: int, discord_message: discord.Message, ts: Union[int, datetime]) -> None:
+    def close(self) -> None:
+        self.disconnect()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[None]:
+        """
+        Run the statements in the context in a transaction. Inside a batch, the statements are run in a savepoint
+        instead, so that a failing operation is rolled back without affecting the rest of the batch.
+        """
+        if not self._batching:
+            with self.connection:
+                yield
+            return
+
+        # Statements are executed through the connection to keep the rowcount of the cursor intact
+        self.connection.execute("SAVEPOINT operation")
+        try:
+            yield
+        except Exception:
+            self.connection.execute("ROLLBACK TO operation")
+            self.connection.execute("RELEASE operation")
+            raise
+        self.connection.execute("RELEASE operation")
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """
+        Run all operations in the context in a single transaction, which is committed once at the end of the context.
+        Committing is the slowest part of a write, so batching several writes makes them a lot faster.
+        """
+        self.connection.execute("BEGIN")
+        self._batching = True
+        try:
+            yield
+        except Exception:
+            self.connection.rollback()
+            raise
+        else:
+            self.connection.commit()
+        finally:
+            self._batching = False
+
+    def add(
+            self,
+            tg_chat_id: int,
+            tg_message_id: int,
+            discord_message: discord.Message,
+            ts: Union[int, datetime]
+    ) -> None:
         """
         Add a new Discord message reference to the database for possible later references.
 
+        :param tg_chat_id: ID of the Telegram chat of the message.
         :param tg_message_id: Telegram message ID. Needed for finding all Discord messages based on the original message
         :param discord_message: The Discord message sent to Discord. Data needed for deserialization is saved to
-        the database.
+        the database, including the ID of the webhook the message was sent with, if any.
         :param ts: Leap second aware UTC timestamp when the Discord message was sent.
         """
         if isinstance(ts, datetime):
             ts = int(ts.timestamp())
 
-        with self.connection:
-            self.cursor.execute(
-                """
-                INSERT INTO discord_messages (message_id, channel_id, guild_id, tg_message_id, ts) 
-                VALUES
-                    (?, ?, ?, ?, ?) 
-                """, (discord_message.id, discord_message.channel.id, discord_message.guild.id, tg_message_id, ts)
-            )
+        with self._transaction():
+            self._insert_reference(tg_chat_id, tg_message_id, discord_message, ts)
 
-        _logger.debug(f"Successfully added reference to database with values {tg_message_id}, "
+        _logger.debug(f"Successfully added reference to database with values {tg_chat_id}, {tg_message_id}, "
                       f"{discord_message.to_message_reference_dict()}, {ts}")
 
-    def update_ts(self, tg_message_id: int, new_ts: Union[int, datetime]) -> int:
+    def _insert_reference(self, tg_chat_id: int, tg_message_id: int, discord_message: discord.Message, ts: int) -> None:
+        partition = self._ensure_partition(ts)
+        self.cursor.execute(
+            f"""
+            INSERT INTO {partition} ({_REFERENCE_COLUMNS}) 
+            VALUES
+                (?, ?, ?, ?, ?, ?, ?) 
+            """, (discord_message.id, discord_message.channel.id, discord_message.guild.id, tg_chat_id, tg_message_id,
+                  ts, discord_message.webhook_id)
+        )
+
+    def add_many(self, references: Iterable[NewReference]) -> None:
+        """
+        Add several Discord message references in a single transaction.
+
+        :param references: Tuples of arguments of ``add``.
+        """
+        added = 0
+        with self._transaction():
+            for tg_chat_id, tg_message_id, discord_message, ts in references:
+                if isinstance(ts, datetime):
+                    ts = int(ts.timestamp())
+                self._insert_reference(tg_chat_id, tg_message_id, discord_message, ts)
+                added += 1
+
+        _logger.debug(f"Successfully added {added} references to database.")
+
+    def partitions(self) -> List[Tuple[str, int, int]]:
+        """
+        Get all partitions of message references.
+
+        :return: List of tuples of partition table names, and timestamps of their first second and the first second
+        after them, oldest partition first.
+        """
+        return self.connection.execute(
+            "SELECT name, start_ts, end_ts FROM message_partitions ORDER BY start_ts"
+        ).fetchall()
+
+    def _ensure_partition(self, ts: int) -> str:
+        """
+        Get the partition for references with a timestamp, creating it if it does not exist yet.
+
+        :param ts: Timestamp of a reference.
+        :return: Name of the partition table.
+        """
+        start_ts = _partition_start(ts)
+        partition = self.connection.execute("SELECT name FROM message_partitions WHERE start_ts = ?",
+                                            (start_ts, )).fetchone()
+        if partition is not None:
+            return partition[0]
+
+        name = _create_partition(self.connection.cursor(), start_ts)
+        _rebuild_partition_view(self.connection.cursor())
+        _logger.info(f"Created message reference partition {name}")
+        return name
+
+    def update_ts(self, tg_chat_id: int, tg_message_id: int, new_ts: Union[int, datetime]) -> int:
         """
         Update a timestamp for a message reference to preserve it longer in the database for possible new references.
 
+        :param tg_chat_id: ID of the Telegram chat of the message
         :param tg_message_id: ID of the Telegram message
         :param new_ts: Leap second aware UTC Timestamp of the last reference time
         :return: Amount of modified rows
@@ -113,38 +551,51 @@ class DatabaseHandler:
         _logger.debug(
             f"Updating timestamp to {new_ts} for Discord message references with Telegram message ID {tg_message_id}.")
 
-        with self.connection:
-            self.cursor.execute(
-                """
-                UPDATE discord_messages 
-                SET ts = ?
-                WHERE tg_message_id = ?
-                """, (new_ts, tg_message_id)
-            )
+        # References are moved to the partition of the new timestamp, so they are not dropped with their old partition
+        with self._transaction():
+            target = self._ensure_partition(new_ts)
+            self.cursor.execute(f"UPDATE {target} SET ts = ? WHERE tg_chat_id = ? AND tg_message_id = ?",
+                                (new_ts, tg_chat_id, tg_message_id))
+            modified = self.cursor.rowcount
+
+            for partition, _, _ in self.partitions():
+                if partition == target:
+                    continue
+
+                self.cursor.execute(
+                    f"""
+                    INSERT INTO {target} ({_REFERENCE_COLUMNS})
+                    SELECT message_id, channel_id, guild_id, tg_chat_id, tg_message_id, ?, webhook_id FROM {partition}
+                    WHERE tg_chat_id = ? AND tg_message_id = ?
+                    """, (new_ts, tg_chat_id, tg_message_id)
+                )
+                if self.cursor.rowcount > 0:
+                    modified += self.cursor.rowcount
+                    self.cursor.execute(f"DELETE FROM {partition} WHERE tg_chat_id = ? AND tg_message_id = ?",
+                                        (tg_chat_id, tg_message_id))
 
-        modified = self.cursor.rowcount
         _logger.debug(f"Successfully updated timestamp for total of {modified} references.")
         return modified
 
-    def delete_by_id(self, tg_message_id: int) -> int:
-        _logger.debug(
-            f"Deleting Discord message references with Telegram message ID {tg_message_id} from the database.")
+    def delete_by_id(self, tg_chat_id: int, tg_message_id: int) -> int:
+        _logger.debug(f"Deleting Discord message references with Telegram chat ID {tg_chat_id} and message ID "
+                      f"{tg_message_id} from the database.")
 
-        with self.connection:
-            self.cursor.execute(
-                """
-                DELETE FROM discord_messages WHERE tg_message_id = ?
-                """, (tg_message_id, )
-            )
+        deleted = 0
+        with self._transaction():
+            for partition, _, _ in self.partitions():
+                self.cursor.execute(f"DELETE FROM {partition} WHERE tg_chat_id = ? AND tg_message_id = ?",
+                                    (tg_chat_id, tg_message_id))
+                deleted += self.cursor.rowcount
 
-        deleted = self.cursor.rowcount
         _logger.debug(f"Successfully deleted {deleted} references.")
         return deleted
 
     def delete_by_age(self, upper_age_limit: Union[int, datetime]) -> int:
         """
         Delete message references from the database based on their timestamps. All messages failing to be inside given
-        time restrictions are deleted.
+        time restrictions are deleted. Partitions with only expired references are dropped as a whole, so only the
+        partition containing the age limit must be searched for expired references.
 
         :param upper_age_limit: Inclusive leap second aware UTC timestamp or datetime object determining
         the most recent reference to delete. Messages with this or smaller timestamps will be deleted!
@@ -155,32 +606,952 @@ class DatabaseHandler:
 
         _logger.debug(f"Deleting Discord message references with upper limit of {upper_age_limit} from the database.")
 
-        with self.connection:
-            self.cursor.execute(
-                """
-                DELETE FROM discord_messages WHERE ts <= ?
-                """, (upper_age_limit,)
-            )
+        deleted = 0
+        dropped = []
+        with self._transaction():
+            for partition, start_ts, end_ts in self.partitions():
+                if start_ts > upper_age_limit:
+                    break
+                if end_ts - 1 > upper_age_limit:
+                    self.cursor.execute(f"DELETE FROM {partition} WHERE ts <= ?", (upper_age_limit, ))
+                    deleted += self.cursor.rowcount
+                    continue
+
+                deleted += self.cursor.execute(f"SELECT COUNT(*) FROM {partition}").fetchone()[0]
+                self.cursor.execute(f"DROP TABLE {partition}")
+                self.cursor.execute("DELETE FROM message_partitions WHERE name = ?", (partition, ))
+                dropped.append(partition)
 
-        deleted = self.cursor.rowcount
+            if dropped:
+                _rebuild_partition_view(self.connection.cursor())
+
+        if dropped:
+            _logger.debug(f"Dropped expired partitions {', '.join(dropped)}")
         _logger.debug(f"Successfully deleted {deleted} references.")
         return deleted
 
-    def get(self, tg_message_id: int) -> List[Tuple[int, int]]:
+    def get(self, tg_chat_id: int, tg_message_id: int) -> List[Tuple[int, int, Optional[int]]]:
         """
-        Get Discord message references corresponding to given Telegram message ID.
+        Get Discord message references corresponding to given Telegram message.
 
+        :param tg_chat_id: ID of the Telegram chat of the message.
         :param tg_message_id: The Telegram message ID.
-        :return: List containing tuples of Discord message IDs and Discord channel IDs, which can be used to find
-        references to actual Discord message objects.
+        :return: List containing tuples of Discord message IDs, Discord channel IDs and webhook IDs, which can be used
+        to find references to actual Discord message objects. Webhook ID is None for messages sent by the bot user.
         """
-        _logger.debug(f"Fetching all Discord message references with Telegram message ID {tg_message_id}")
+        _logger.debug(f"Fetching all Discord message references with Telegram chat ID {tg_chat_id} and message ID "
+                      f"{tg_message_id}")
 
-        with self.connection:
+        with self._transaction():
             ids = self.cursor.execute(
                 """
-                SELECT message_id, channel_id FROM discord_messages WHERE tg_message_id = ?
-                """, (tg_message_id, )
+                SELECT message_id, channel_id, webhook_id FROM discord_messages
+                WHERE tg_chat_id = ? AND tg_message_id = ?
+                """, (tg_chat_id, tg_message_id)
             ).fetchall()
 
         return ids
+
+    def get_recent(self, limit: int) -> List[Tuple[int, int, int, int, Optional[int], int]]:
+        """
+        Get all Discord message references of the most recently referenced Telegram messages.
+
+        :param limit: Maximum amount of Telegram messages to get the references for.
+        :return: List of tuples of Telegram chat IDs, Telegram message IDs, Discord message IDs, Discord channel IDs,
+        webhook IDs and timestamps, oldest reference first.
+        """
+        tg_message_ids = []
+        with self._transaction():
+            for partition, _, _ in reversed(self.partitions()):
+                if len(tg_message_ids) >= limit:
+                    break
+                tg_message_ids.extend(self.cursor.execute(
+                    f"""
+                    SELECT tg_chat_id, tg_message_id FROM {partition} GROUP BY tg_chat_id, tg_message_id
+                    ORDER BY MAX(ts) DESC LIMIT ?
+                    """, (limit - len(tg_message_ids), )
+                ))
+
+            # References of a Telegram message may be split to several partitions
+            references = []
+            unique_ids = list(set(tg_message_ids))
+            chunk_size = _MAX_QUERY_PARAMETERS // 2
+            for i in range(0, len(unique_ids), chunk_size):
+                chunk = unique_ids[i:i + chunk_size]
+                references.extend(self.cursor.execute(
+                    f"""
+                    SELECT tg_chat_id, tg_message_id, message_id, channel_id, webhook_id, ts FROM discord_messages
+                    WHERE (tg_chat_id, tg_message_id) IN (VALUES {", ".join(["(?, ?)"] * len(chunk))})
+                    """, [value for ids in chunk for value in ids]
+                ))
+
+        references.sort(key=lambda reference: reference[5])
+        return references
+
+    def get_max_tg_message_ids(self) -> Dict[int, int]:
+        """
+        Get the largest Telegram message IDs having Discord message references in every Telegram chat.
+
+        :return: Dictionary of Telegram chat IDs and the largest Telegram message IDs in them.
+        """
+        max_ids = {}
+        with self._transaction():
+            for partition, _, _ in self.partitions():
+                for tg_chat_id, max_id in self.cursor.execute(
+                        f"SELECT tg_chat_id, MAX(tg_message_id) FROM {partition} GROUP BY tg_chat_id"):
+                    max_ids[tg_chat_id] = max(max_id, max_ids.get(tg_chat_id, max_id))
+
+        return max_ids
+
+    def export_references(self) -> Iterator[Tuple[int, int, int, int, int, int, Optional[int]]]:
+        """
+        Iterate over all Discord message references in the database. The references are read in a single read
+        transaction, so they are consistent even if the database is written meanwhile.
+
+        :return: Iterator of tuples of the columns in ``REFERENCE_COLUMNS``.
+        """
+        cursor = self.connection.cursor()
+        cursor.execute(f"SELECT {_REFERENCE_COLUMNS} FROM discord_messages")
+        while rows := cursor.fetchmany(1000):
+            yield from rows
+
+    def import_references(
+            self,
+            references: Iterable[Tuple[int, int, int, int, int, int, Optional[int]]],
+            batch_size: int = 50_000
+    ) -> int:
+        """
+        Import Discord message references in bulk. References already in the database are skipped, so an interrupted
+        import can be run again.
+
+        The references are inserted in transactions of a batch each. Partitions created by the import are indexed only
+        after all references are inserted, as building the indexes once is much faster than updating them for every
+        reference.
+
+        :param references: Iterable of tuples of the columns in ``REFERENCE_COLUMNS``.
+        :param batch_size: Amount of references to insert in a single transaction.
+        :return: Amount of imported references.
+        """
+        ts_index = REFERENCE_COLUMNS.index("ts")
+        partitions = {start_ts: name for name, start_ts, _ in self.partitions()}
+        new_partitions = []
+        imported = 0
+
+        references = iter(references)
+        while batch := list(itertools.islice(references, batch_size)):
+            by_partition: Dict[int, List[tuple]] = {}
+            for reference in batch:
+                by_partition.setdefault(_partition_start(reference[ts_index]), []).append(reference)
+
+            with self._transaction():
+                created = False
+                for start_ts, partition_references in by_partition.items():
+                    if start_ts not in partitions:
+                        partitions[start_ts] = _create_partition(self.cursor, start_ts, indexes={})
+                        new_partitions.append(partitions[start_ts])
+                        created = True
+
+                    self.cursor.executemany(
+                        f"""
+                        INSERT OR IGNORE INTO {partitions[start_ts]} ({_REFERENCE_COLUMNS})
+                        VALUES ({", ".join("?" * len(REFERENCE_COLUMNS))})
+                        """, partition_references
+                    )
+                    imported += self.cursor.rowcount
+
+                if created:
+                    _rebuild_partition_view(self.connection.cursor())
+
+            _logger.debug(f"Imported {imported} references so far.")
+
+        for partition in new_partitions:
+            with self._transaction():
+                _index_partition(self.cursor, partition)
+
+        _logger.info(f"Imported {imported} references to {len(new_partitions)} new and "
+                     f"{len(partitions) - len(new_partitions)} existing partitions.")
+        return imported
+
+    def backup(self, path: str) -> None:
+        """
+        Copy the database to a file with ``VACUUM INTO``. The copy is made from a single read transaction, so it
+        contains everything committed before the backup started. In WAL mode, other connections can keep writing to
+        the database meanwhile without restarting the backup.
+
+        :param path: Path to the backup file. An existing file is overwritten.
+        """
+        # VACUUM INTO refuses to write to an existing file
+        Path(path).unlink(missing_ok=True)
+        if not self.connection.in_transaction:
+            self.connection.execute("VACUUM INTO ?", (path, ))
+            return
+
+        # VACUUM INTO cannot be run in a transaction, e.g. in a batch of writes. The online backup API can, and writes
+        # made through the same connection do not restart it.
+        target = sqlite3.connect(path)
+        try:
+            self.connection.backup(target)
+        finally:
+            target.close()
+
+    def lock_exclusively(self) -> None:
+        """
+        Lock the database for this connection until the connection is closed. Other connections cannot read or write
+        the database meanwhile. In WAL mode, the lock cannot be taken while other connections have the database open.
+        With a rollback journal, only other connections in a transaction prevent taking it.
+
+        :exception sqlite3.OperationalError: The database is in use by another connection.
+        """
+        self.connection.execute("PRAGMA locking_mode = EXCLUSIVE")
+        # In exclusive locking mode, the lock taken by a write transaction is kept after committing it
+        self.connection.execute("BEGIN EXCLUSIVE")
+        self.connection.commit()
+
+    def vacuum_into(self, path: str) -> None:
+        """
+        Write a compacted copy of the database to a new file. The database can be written by other connections
+        meanwhile, and the copy contains everything committed before the copying started.
+
+        :param path: Path to the new database file. The file must not exist.
+        """
+        _logger.info(f"Writing a compacted copy of the database to '{path}'")
+        self.connection.execute("VACUUM INTO ?", (path, ))
+
+    def enqueue_deliveries(
+            self,
+            tg_chat_id: int,
+            tg_message_id: int,
+            destinations: List[Tuple[int, Optional[int]]],
+            payload: str,
+            ts: Union[int, datetime],
+            next_attempt_ts: Union[int, datetime] = None
+    ) -> List[int]:
+        """
+        Add pending Discord deliveries of a rendered message to the outbox. The deliveries stay in the outbox until
+        they are completed with ``complete_delivery``, so they can be retried if sending fails or the bot is restarted.
+
+        :param tg_chat_id: ID of the Telegram chat of the message the payload was rendered from.
+        :param tg_message_id: ID of the Telegram message the payload was rendered from.
+        :param destinations: List of tuples of destination Discord channel IDs and IDs of Discord messages to reply to.
+                             Reply message ID is None for new messages.
+        :param payload: The rendered message as a JSON string.
+        :param ts: Leap second aware UTC timestamp when the deliveries were created.
+        :param next_attempt_ts: Leap second aware UTC timestamp of the earliest attempt of the deliveries. If omitted,
+                                the deliveries are due immediately.
+        :return: Outbox IDs of the deliveries, in the same order as the destinations.
+        """
+        if isinstance(ts, datetime):
+            ts = int(ts.timestamp())
+        if next_attempt_ts is None:
+            next_attempt_ts = ts
+        elif isinstance(next_attempt_ts, datetime):
+            next_attempt_ts = int(next_attempt_ts.timestamp())
+
+        outbox_ids = []
+        with self._transaction():
+            for channel_id, reply_to_message_id in destinations:
+                self.cursor.execute(
+                    """
+                    INSERT INTO outbox (tg_chat_id, tg_message_id, channel_id, reply_to_message_id, payload, 
+                                        next_attempt_ts, created_ts)
+                    VALUES
+                        (?, ?, ?, ?, ?, ?, ?)
+                    """, (tg_chat_id, tg_message_id, channel_id, reply_to_message_id, payload, next_attempt_ts, ts)
+                )
+                outbox_ids.append(self.cursor.lastrowid)
+
+        _logger.debug(f"Added {len(outbox_ids)} deliveries of Telegram message {tg_message_id} to the outbox.")
+        return outbox_ids
+
+    def complete_delivery(
+            self,
+            outbox_id: int,
+            tg_chat_id: int,
+            tg_message_id: int,
+            discord_message: discord.Message,
+            ts: Union[int, datetime],
+            reference_store: ReferenceStore = None
+    ) -> None:
+        """
+        Complete a delivery in the outbox. The delivery is removed from the outbox and the reference to the sent
+        Discord message is added in the same transaction, so a delivery is never lost or sent twice.
+
+        If the reference is stored to another reference store, it is added there before removing the delivery. A
+        delivery interrupted between them may then be sent twice, but never lost.
+
+        :param outbox_id: Outbox ID of the delivery.
+        :param tg_chat_id: ID of the Telegram chat of the message the delivery was rendered from.
+        :param tg_message_id: ID of the Telegram message the delivery was rendered from.
+        :param discord_message: The Discord message sent by the delivery.
+        :param ts: Leap second aware UTC timestamp when the Discord message was sent.
+        :param reference_store: Reference store to add the reference to. If omitted, the reference is added to this
+                                database.
+        """
+        if isinstance(ts, datetime):
+            ts = int(ts.timestamp())
+
+        if reference_store is not None and reference_store is not self:
+            reference_store.add(tg_chat_id, tg_message_id, discord_message, ts)
+            with self._transaction():
+                self.cursor.execute("DELETE FROM outbox WHERE id = ?", (outbox_id, ))
+            _logger.debug(f"Completed delivery {outbox_id} of Telegram message {tg_message_id}.")
+            return
+
+        with self._transaction():
+            self._insert_reference(tg_chat_id, tg_message_id, discord_message, ts)
+            self.cursor.execute("DELETE FROM outbox WHERE id = ?", (outbox_id, ))
+
+        _logger.debug(f"Completed delivery {outbox_id} of Telegram message {tg_message_id}.")
+
+    def postpone_delivery(self, outbox_id: int, next_attempt_ts: Union[int, datetime]) -> None:
+        """
+        Mark a delivery attempt failed and postpone the next attempt.
+
+        :param outbox_id: Outbox ID of the delivery.
+        :param next_attempt_ts: Leap second aware UTC timestamp of the earliest next attempt.
+        """
+        if isinstance(next_attempt_ts, datetime):
+            next_attempt_ts = int(next_attempt_ts.timestamp())
+
+        with self._transaction():
+            self.cursor.execute(
+                """
+                UPDATE outbox
+                SET attempts = attempts + 1, next_attempt_ts = ?
+                WHERE id = ?
+                """, (next_attempt_ts, outbox_id)
+            )
+
+    def discard_delivery(self, outbox_id: int) -> None:
+        """
+        Remove a delivery from the outbox without completing it.
+
+        :param outbox_id: Outbox ID of the delivery.
+        """
+        with self._transaction():
+            self.cursor.execute("DELETE FROM outbox WHERE id = ?", (outbox_id, ))
+
+    def delete_exhausted_deliveries(self, max_attempts: int) -> int:
+        """
+        Delete deliveries from the outbox that have failed too many times to be attempted anymore.
+
+        :param max_attempts: Deliveries having failed this many times are deleted.
+        :return: Amount of deleted deliveries.
+        """
+        with self._transaction():
+            self.cursor.execute("DELETE FROM outbox WHERE attempts >= ?", (max_attempts, ))
+            return self.cursor.rowcount
+
+    def get_due_deliveries(
+            self,
+            ts: Union[int, datetime],
+            max_attempts: int,
+            limit: int = 100
+    ) -> List[Tuple[int, int, int, int, Optional[int], str, int]]:
+        """
+        Get deliveries in the outbox that are due to be attempted, oldest first.
+
+        :param ts: Leap second aware UTC timestamp of the current time.
+        :param max_attempts: Deliveries having failed this many times are not returned anymore.
+        :param limit: Maximum amount of deliveries to return.
+        :return: List of tuples of outbox IDs, Telegram chat IDs, Telegram message IDs, Discord channel IDs, IDs of
+        Discord messages to reply to, payloads and amounts of failed attempts.
+        """
+        if isinstance(ts, datetime):
+            ts = int(ts.timestamp())
+
+        with self._transaction():
+            deliveries = self.cursor.execute(
+                """
+                SELECT id, tg_chat_id, tg_message_id, channel_id, reply_to_message_id, payload, attempts FROM outbox
+                WHERE next_attempt_ts <= ? AND attempts < ?
+                ORDER BY id
+                LIMIT ?
+                """, (ts, max_attempts, limit)
+            ).fetchall()
+
+        return deliveries
+
+
+class ReferenceCache:
+
+    def __init__(self, max_size: int = 10000):
+        """
+        A least recently used cache of Discord message references by Telegram chat and message IDs. Replies and edits
+        mostly reference recent Telegram messages, so their references can be found without reading the database.
+
+        The cache is written through: references added or deleted in the database must be added or deleted in the
+        cache too. An entry is cached only if it contains all references of a Telegram message in the database, so the
+        references of a Telegram message not cached are added only if the message is newer than any message of its
+        chat already in the database.
+
+        :param max_size: Maximum amount of Telegram messages in the cache. The least recently used messages are dropped
+                         when the cache is full.
+        """
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.generation = 0
+        self._max_tg_message_ids: Dict[int, int] = {}
+        # Cached references and timestamps of the oldest references, or None if the timestamp is unknown
+        self._cache: OrderedDict[Tuple[int, int], Tuple[List[Tuple[int, int, Optional[int]]], Optional[int]]] = \
+            OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def __contains__(self, key: Tuple[int, int]) -> bool:
+        return key in self._cache
+
+    @property
+    def hit_rate(self) -> float:
+        """
+        Share of lookups found from the cache, between 0 and 1.
+        """
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0
+
+    def _store(self, key: Tuple[int, int], references: List[Tuple[int, int, Optional[int]]], ts: Optional[int]) -> None:
+        self._cache[key] = (references, ts)
+        self._cache.move_to_end(key)
+        if len(self._cache) > self.max_size:
+            self._cache.popitem(last=False)
+
+    def warm(
+            self,
+            references: List[Tuple[int, int, int, int, Optional[int], int]],
+            max_tg_message_ids: Dict[int, int]
+    ) -> None:
+        """
+        Replace the cache contents with references read from the database.
+
+        :param references: All references of the cached Telegram messages as returned by ``DatabaseHandler.get_recent``,
+                           oldest reference first.
+        :param max_tg_message_ids: The largest Telegram message IDs of every Telegram chat in the database.
+        """
+        self.clear()
+        for tg_chat_id, tg_message_id, message_id, channel_id, webhook_id, ts in references:
+            key = (tg_chat_id, tg_message_id)
+            cached = self._cache.get(key)
+            if cached is None:
+                self._store(key, [(message_id, channel_id, webhook_id)], ts)
+            else:
+                cached[0].append((message_id, channel_id, webhook_id))
+                self._cache.move_to_end(key)
+        self._max_tg_message_ids = dict(max_tg_message_ids)
+
+    def get(self, tg_chat_id: int, tg_message_id: int) -> Optional[List[Tuple[int, int, Optional[int]]]]:
+        """
+        Get the references of a Telegram message from the cache.
+
+        :param tg_chat_id: ID of the Telegram chat of the message.
+        :param tg_message_id: ID of the Telegram message.
+        :return: Copy of the cached references, or None if the message is not cached.
+        """
+        key = (tg_chat_id, tg_message_id)
+        cached = self._cache.get(key)
+        if cached is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._cache.move_to_end(key)
+        return list(cached[0])
+
+    def fill(
+            self,
+            tg_chat_id: int,
+            tg_message_id: int,
+            references: List[Tuple[int, int, Optional[int]]],
+            generation: int
+    ) -> None:
+        """
+        Cache the references of a Telegram message read from the database after a cache miss.
+
+        :param tg_chat_id: ID of the Telegram chat of the message.
+        :param tg_message_id: ID of the Telegram message.
+        :param references: All references of the Telegram message in the database.
+        :param generation: Value of ``generation`` when the database read was started. The references are not cached if
+                           references were added or deleted during the read, as they may be outdated.
+        """
+        key = (tg_chat_id, tg_message_id)
+        if generation == self.generation and key not in self._cache:
+            self._store(key, list(references), None)
+
+    def add(
+            self,
+            tg_chat_id: int,
+            tg_message_id: int,
+            discord_message: discord.Message,
+            ts: Union[int, datetime]
+    ) -> None:
+        """
+        Add a reference added to the database to the cache.
+
+        :param tg_chat_id: ID of the Telegram chat of the message.
+        :param tg_message_id: ID of the Telegram message.
+        :param discord_message: The referenced Discord message.
+        :param ts: Timestamp of the reference.
+        """
+        if isinstance(ts, datetime):
+            ts = int(ts.timestamp())
+
+        self.generation += 1
+        key = (tg_chat_id, tg_message_id)
+        reference = (discord_message.id, discord_message.channel.id, discord_message.webhook_id)
+        max_tg_message_id = self._max_tg_message_ids.get(tg_chat_id)
+        cached = self._cache.get(key)
+        if cached is not None:
+            references, oldest_ts = cached
+            # The reference may have been cached already from a database read completed after adding it
+            if reference not in references:
+                references.append(reference)
+            self._store(key, references, min(oldest_ts, ts) if oldest_ts is not None else None)
+        elif max_tg_message_id is None or tg_message_id > max_tg_message_id:
+            # The database cannot have other references of a message newer than any message of its chat in it
+            self._store(key, [reference], ts)
+
+        if max_tg_message_id is None or tg_message_id > max_tg_message_id:
+            self._max_tg_message_ids[tg_chat_id] = tg_message_id
+
+    def update_ts(self, tg_chat_id: int, tg_message_id: int, new_ts: Union[int, datetime]) -> None:
+        """
+        Update the timestamp of cached references after updating them in the database.
+
+        :param tg_chat_id: ID of the Telegram chat of the message.
+        :param tg_message_id: ID of the Telegram message.
+        :param new_ts: The new timestamp of the references.
+        """
+        if isinstance(new_ts, datetime):
+            new_ts = int(new_ts.timestamp())
+
+        key = (tg_chat_id, tg_message_id)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache[key] = (cached[0], new_ts)
+
+    def delete_by_id(self, tg_chat_id: int, tg_message_id: int) -> None:
+        """
+        Delete the references of a Telegram message deleted from the database.
+
+        :param tg_chat_id: ID of the Telegram chat of the message.
+        :param tg_message_id: ID of the Telegram message.
+        """
+        self.generation += 1
+        self._cache.pop((tg_chat_id, tg_message_id), None)
+
+    def delete_by_age(self, upper_age_limit: Union[int, datetime]) -> None:
+        """
+        Delete references deleted from the database by their age. Telegram messages with references of unknown age are
+        deleted too.
+
+        :param upper_age_limit: Inclusive timestamp of the most recent deleted reference.
+        """
+        if isinstance(upper_age_limit, datetime):
+            upper_age_limit = int(upper_age_limit.timestamp())
+
+        self.generation += 1
+        expired = [key for key, (_, oldest_ts) in self._cache.items()
+                   if oldest_ts is None or oldest_ts <= upper_age_limit]
+        for key in expired:
+            del self._cache[key]
+
+    def clear(self) -> None:
+        """
+        Remove all references from the cache.
+        """
+        self.generation += 1
+        self._cache.clear()
+
+
+# Reference store backends supported by AsyncDatabaseHandler
+REFERENCE_STORE_BACKENDS = (
+    "sqlite",
+    "memory",
+    "dbm"
+)
+# Methods of AsyncDatabaseHandler run on the reference store instead of the database
+_REFERENCE_METHODS = frozenset((
+    "add",
+    "update_ts",
+    "delete_by_id",
+    "delete_by_age",
+    "get",
+    "get_recent",
+    "get_max_tg_message_ids"
+))
+
+
+def create_reference_store(backend: str, database_path: str) -> Optional[ReferenceStore]:
+    """
+    Create a reference store other than the SQLite database.
+
+    :param backend: Name of the backend. See ``REFERENCE_STORE_BACKENDS`` for the supported backends.
+    :param database_path: Path to the SQLite database. Stores needing a file of their own are created next to it.
+    :return: The reference store, or None if the references are stored to the SQLite database.
+    :raises ValueError: If the backend is not supported.
+    """
+    if backend == "sqlite":
+        return None
+    if backend == "memory":
+        return MemoryReferenceStore()
+    if backend == "dbm":
+        return DbmReferenceStore(str(Path(database_path).with_suffix(".references")))
+    raise ValueError(f"Unsupported reference store backend '{backend}'. Supported backends are "
+                     f"{', '.join(REFERENCE_STORE_BACKENDS)}.")
+
+
+class _WriteRequest:
+
+    __slots__ = (
+        "method",
+        "args",
+        "future",
+        "loop"
+    )
+
+    def __init__(self, method: str, args: tuple, future: asyncio.Future, loop: asyncio.AbstractEventLoop):
+        self.method = method
+        self.args = args
+        self.future = future
+        self.loop = loop
+
+
+def _resolve(future: asyncio.Future, result: Any, error: Optional[BaseException]) -> None:
+    if future.cancelled():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+class AsyncDatabaseHandler:
+
+    def __init__(
+            self,
+            database_path: str,
+            pragma_foreign_keys: bool = False,
+            profile: Dict[str, Union[str, int]] = None,
+            commit_interval: float = 0.005,
+            max_batch_size: int = 500,
+            read_workers: int = 2,
+            reference_cache_size: int = 10000,
+            warm_references: int = 1000,
+            migration_defaults: Dict[str, Any] = None,
+            backend: str = "sqlite"
+    ) -> None:
+        """
+        An asynchronous facade for ``DatabaseHandler``, keeping SQLite off the event loop. Writes are run on a single
+        dedicated writer thread, which groups the writes received within a short interval to a single commit. Reads
+        are run concurrently on a pool of reader threads with their own read-only connections. With journal mode WAL,
+        reads are not blocked by writes in progress.
+
+        The methods have the same names and arguments as in ``DatabaseHandler``, but they must be awaited. A write is
+        completed when its batch is committed, so reads started after it will see the written data.
+
+        Message references are looked up from a ``ReferenceCache`` before reading the database. The cache is warmed
+        with the references of the most recently referenced Telegram messages when the database is opened.
+
+        Message references can be stored to another ``ReferenceStore`` than the SQLite database, while the outbox is
+        always stored to the database. Other stores are used only from the writer thread.
+
+        :param database_path: Path to the database file.
+        :param pragma_foreign_keys: Enable foreign key constraints.
+        :param profile: Connection profile for all connections. See ``DatabaseHandler`` for details.
+        :param commit_interval: Maximum time in seconds to wait for more writes before committing a batch.
+        :param max_batch_size: Maximum amount of writes committed at once.
+        :param read_workers: Amount of reader threads.
+        :param reference_cache_size: Maximum amount of Telegram messages to cache the message references of.
+        :param warm_references: Amount of the most recently referenced Telegram messages to cache when the database is
+                                opened.
+
+        :param migration_defaults: Default values for migrating existing data. See ``DatabaseHandler`` for details.
+        :param backend: Backend of the reference store. See ``REFERENCE_STORE_BACKENDS`` for the supported backends.
+        """
+        if backend not in REFERENCE_STORE_BACKENDS:
+            raise ValueError(f"Unsupported reference store backend '{backend}'. Supported backends are "
+                             f"{', '.join(REFERENCE_STORE_BACKENDS)}.")
+        self.database_path = None
+        self.pragma_foreign_keys = pragma_foreign_keys
+        self.profile = profile
+        self.commit_interval = commit_interval
+        self.max_batch_size = max_batch_size
+        self.read_workers = read_workers
+        self.warm_references = warm_references
+        self.migration_defaults = migration_defaults
+        self.backend = backend
+        self.reference_cache = ReferenceCache(reference_cache_size)
+        self.batches = 0
+        self.writes = 0
+        self._write_queue: Optional[queue.SimpleQueue] = None
+        self._writer: Optional[threading.Thread] = None
+        self._store: Optional[ReferenceStore] = None
+        self._read_executor: Optional[ThreadPoolExecutor] = None
+        self._reader_local = threading.local()
+        self.connect(database_path)
+
+    @property
+    def is_connected(self) -> bool:
+        return self._writer is not None
+
+    def connect(self, database_path: str) -> None:
+        """
+        Start the writer thread and open the database. Blocks until the database is opened.
+
+        :param database_path: Path to the database file.
+        :raises sqlite3.Error: If the database cannot be opened.
+        """
+        self.database_path = database_path
+        self._write_queue = queue.SimpleQueue()
+        self._read_executor = ThreadPoolExecutor(self.read_workers, thread_name_prefix="database-reader")
+
+        opened = threading.Event()
+        errors = []
+        self._writer = threading.Thread(target=self._write_loop, args=(opened, errors), name="database-writer",
+                                        daemon=True)
+        self._writer.start()
+        opened.wait()
+        if errors:
+            self._writer = None
+            raise errors[0]
+
+    async def disconnect(self) -> None:
+        """
+        Commit all pending writes and close the database.
+        """
+        if not self.is_connected:
+            return
+
+        writer = self._writer
+        self._writer = None
+        self._write_queue.put(None)
+        await asyncio.to_thread(writer.join)
+        self._read_executor.shutdown(wait=False)
+        _logger.debug(f"Database writer stopped after {self.writes} writes in {self.batches} commits")
+        _logger.debug(f"Reference cache hit rate was {self.reference_cache.hit_rate:.1%} in "
+                      f"{self.reference_cache.hits + self.reference_cache.misses} lookups")
+
+    def _write_loop(self, opened: threading.Event, errors: List[Exception]) -> None:
+        try:
+            handler = DatabaseHandler(self.database_path, self.pragma_foreign_keys, profile=self.profile,
+                                      migration_defaults=self.migration_defaults)
+            store = create_reference_store(self.backend, self.database_path)
+            self._store = store if store is not None else handler
+            # The event loop is blocked until the database is opened, so the cache can be safely warmed here
+            self.reference_cache.warm(self._store.get_recent(self.warm_references),
+                                      self._store.get_max_tg_message_ids())
+            _logger.debug(f"Warmed reference cache with {len(self.reference_cache)} Telegram messages")
+        except Exception as e:
+            errors.append(e)
+            return
+        finally:
+            opened.set()
+
+        stopping = False
+        while not stopping:
+            request = self._write_queue.get()
+            if request is None:
+                break
+
+            batch = [request]
+            deadline = time.monotonic() + self.commit_interval
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    request = self._write_queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if request is None:
+                    stopping = True
+                    break
+                batch.append(request)
+
+            self._commit_batch(handler, batch)
+
+        if self._store is not handler:
+            self._store.close()
+        handler.disconnect()
+
+    def _commit_batch(self, handler: DatabaseHandler, batch: List[_WriteRequest]) -> None:
+        results = []
+        try:
+            with handler.batch():
+                for request in batch:
+                    try:
+                        results.append((self._run_write(handler, request), None))
+                    except Exception as e:
+                        results.append((None, e))
+        except Exception as e:
+            _logger.error(f"Failed to commit a batch of {len(batch)} writes.", exc_info=e)
+            results = [(None, e)] * len(batch)
+
+        self.batches += 1
+        self.writes += len(batch)
+        for request, (result, error) in zip(batch, results):
+            request.loop.call_soon_threadsafe(_resolve, request.future, result, error)
+
+    def _run_write(self, handler: DatabaseHandler, request: _WriteRequest) -> Any:
+        if request.method in _REFERENCE_METHODS:
+            return getattr(self._store, request.method)(*request.args)
+        if request.method == "complete_delivery":
+            return handler.complete_delivery(*request.args, reference_store=self._store)
+        return getattr(handler, request.method)(*request.args)
+
+    async def _write(self, method: str, *args) -> Any:
+        if not self.is_connected:
+            raise sqlite3.ProgrammingError("Cannot operate on a closed database.")
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._write_queue.put(_WriteRequest(method, args, future, loop))
+        return await future
+
+    def _run_read(self, method: str, args: tuple) -> Any:
+        handler = getattr(self._reader_local, "handler", None)
+        if handler is None:
+            handler = DatabaseHandler(self.database_path, self.pragma_foreign_keys, ensure_tables=False,
+                                      profile=self.profile, read_only=True)
+            self._reader_local.handler = handler
+        return getattr(handler, method)(*args)
+
+    async def _read(self, method: str, *args) -> Any:
+        if self.database_path == ":memory:" or (self.backend != "sqlite" and method in _REFERENCE_METHODS):
+            # Every connection to an in-memory database has a database of its own, and other reference stores are
+            # used only from the writer thread
+            return await self._write(method, *args)
+        if not self.is_connected:
+            raise sqlite3.ProgrammingError("Cannot operate on a closed database.")
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._read_executor, self._run_read, method, args)
+
+    def _run_backup(self, path: str) -> None:
+        handler = DatabaseHandler(self.database_path, self.pragma_foreign_keys, ensure_tables=False,
+                                  profile=self.profile, read_only=True)
+        try:
+            handler.backup(path)
+        finally:
+            handler.disconnect()
+
+    async def backup(self, path: str) -> None:
+        """
+        Back up the database in a thread of its own. See ``DatabaseHandler.backup``. Only the SQLite database is backed
+        up, not other reference stores.
+        """
+        if not self.is_connected:
+            raise sqlite3.ProgrammingError("Cannot operate on a closed database.")
+        if self.database_path == ":memory:":
+            return await self._write("backup", path)
+
+        await asyncio.to_thread(self._run_backup, path)
+
+    async def add(
+            self,
+            tg_chat_id: int,
+            tg_message_id: int,
+            discord_message: discord.Message,
+            ts: Union[int, datetime]
+    ) -> None:
+        """
+        See ``DatabaseHandler.add``.
+        """
+        await self._write("add", tg_chat_id, tg_message_id, discord_message, ts)
+        self.reference_cache.add(tg_chat_id, tg_message_id, discord_message, ts)
+
+    async def update_ts(self, tg_chat_id: int, tg_message_id: int, new_ts: Union[int, datetime]) -> int:
+        """
+        See ``DatabaseHandler.update_ts``.
+        """
+        modified = await self._write("update_ts", tg_chat_id, tg_message_id, new_ts)
+        self.reference_cache.update_ts(tg_chat_id, tg_message_id, new_ts)
+        return modified
+
+    async def delete_by_id(self, tg_chat_id: int, tg_message_id: int) -> int:
+        """
+        See ``DatabaseHandler.delete_by_id``.
+        """
+        deleted = await self._write("delete_by_id", tg_chat_id, tg_message_id)
+        self.reference_cache.delete_by_id(tg_chat_id, tg_message_id)
+        return deleted
+
+    async def delete_by_age(self, upper_age_limit: Union[int, datetime]) -> int:
+        """
+        See ``DatabaseHandler.delete_by_age``.
+        """
+        deleted = await self._write("delete_by_age", upper_age_limit)
+        self.reference_cache.delete_by_age(upper_age_limit)
+        return deleted
+
+    async def get(self, tg_chat_id: int, tg_message_id: int) -> List[Tuple[int, int, Optional[int]]]:
+        """
+        See ``DatabaseHandler.get``. The references are looked up from the reference cache first.
+        """
+        references = self.reference_cache.get(tg_chat_id, tg_message_id)
+        if references is not None:
+            return references
+
+        generation = self.reference_cache.generation
+        references = await self._read("get", tg_chat_id, tg_message_id)
+        self.reference_cache.fill(tg_chat_id, tg_message_id, references, generation)
+        return references
+
+    async def enqueue_deliveries(
+            self,
+            tg_chat_id: int,
+            tg_message_id: int,
+            destinations: List[Tuple[int, Optional[int]]],
+            payload: str,
+            ts: Union[int, datetime],
+            next_attempt_ts: Union[int, datetime] = None
+    ) -> List[int]:
+        """
+        See ``DatabaseHandler.enqueue_deliveries``.
+        """
+        return await self._write("enqueue_deliveries", tg_chat_id, tg_message_id, destinations, payload, ts,
+                                 next_attempt_ts)
+
+    async def complete_delivery(
+            self,
+            outbox_id: int,
+            tg_chat_id: int,
+            tg_message_id: int,
+            discord_message: discord.Message,
+            ts: Union[int, datetime]
+    ) -> None:
+        """
+        See ``DatabaseHandler.complete_delivery``.
+        """
+        await self._write("complete_delivery", outbox_id, tg_chat_id, tg_message_id, discord_message, ts)
+        self.reference_cache.add(tg_chat_id, tg_message_id, discord_message, ts)
+
+    async def postpone_delivery(self, outbox_id: int, next_attempt_ts: Union[int, datetime]) -> None:
+        """
+        See ``DatabaseHandler.postpone_delivery``.
+        """
+        return await self._write("postpone_delivery", outbox_id, next_attempt_ts)
+
+    async def discard_delivery(self, outbox_id: int) -> None:
+        """
+        See ``DatabaseHandler.discard_delivery``.
+        """
+        return await self._write("discard_delivery", outbox_id)
+
+    async def delete_exhausted_deliveries(self, max_attempts: int) -> int:
+        """
+        See ``DatabaseHandler.delete_exhausted_deliveries``.
+        """
+        return await self._write("delete_exhausted_deliveries", max_attempts)
+
+    async def get_due_deliveries(
+            self,
+            ts: Union[int, datetime],
+            max_attempts: int,
+            limit: int = 100
+    ) -> List[Tuple[int, int, int, int, Optional[int], str, int]]:
+        """
+        See ``DatabaseHandler.get_due_deliveries``.
+        """
+        return await self._read("get_due_deliveries", ts, max_attempts, limit)
@@ -0,0 +1,216 @@
+"""
+MIT License
+
+Copyright (c) 2025 Niko Mätäsaho
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import argparse
+import bz2
+import csv
+import gzip
+import json
+import lzma
+import os
+import sqlite3
+import sys
+from pathlib import Path
+from typing import IO, Iterator, Optional, Tuple
+
+from config import Config
+from database_handler import DatabaseHandler, REFERENCE_COLUMNS
+
+
+# Compressions of export files by their file name suffixes
+_COMPRESSIONS = {
+    ".gz": gzip.open,
+    ".bz2": bz2.open,
+    ".xz": lzma.open
+}
+_FORMATS = ("jsonl", "csv")
+
+
+def open_file(path: str, mode: str) -> IO[str]:
+    """
+    Open an export file in text mode, compressed if the file name has a compression suffix.
+
+    :param path: Path to the file.
+    :param mode: ``r`` for reading, ``w`` for writing.
+    :return: The file object.
+    """
+    compression = _COMPRESSIONS.get(Path(path).suffix)
+    if compression is None:
+        return open(path, mode, encoding="utf-8", newline="")
+    return compression(path, mode + "t", encoding="utf-8", newline="")
+
+
+def guess_format(path: str) -> str:
+    """
+    Guess the format of an export file from its name, e.g. ``references.jsonl.gz`` is in format ``jsonl``.
+
+    :param path: Path to the file.
+    :return: The format.
+    :raises ValueError: If the name does not tell the format.
+    """
+    suffixes = [suffix for suffix in Path(path).suffixes if suffix not in _COMPRESSIONS]
+    if suffixes and suffixes[-1][1:] in _FORMATS:
+        return suffixes[-1][1:]
+    raise ValueError(f"Cannot determine format of '{path}'. Use option --format.")
+
+
+def write_references(file: IO[str], file_format: str, references: Iterator[tuple]) -> int:
+    """
+    Write message references to an export file.
+
+    :return: Amount of written references.
+    """
+    written = 0
+    if file_format == "csv":
+        writer = csv.writer(file)
+        writer.writerow(REFERENCE_COLUMNS)
+        for reference in references:
+            writer.writerow(reference)
+            written += 1
+    else:
+        for reference in references:
+            file.write(json.dumps(dict(zip(REFERENCE_COLUMNS, reference)), separators=(",", ":")))
+            file.write("\n")
+            written += 1
+
+    return written
+
+
+def read_references(file: IO[str], file_format: str) -> Iterator[Tuple[Optional[int], ...]]:
+    """
+    Read message references from an export file.
+
+    :return: Iterator of tuples of the columns in ``REFERENCE_COLUMNS``.
+    """
+    if file_format == "csv":
+        rows = csv.DictReader(file)
+    else:
+        rows = (json.loads(line) for line in file if line.strip())
+
+    for row in rows:
+        # Empty CSV fields are missing values, e.g. webhook IDs of messages sent by the bot user
+        yield tuple(int(row[column]) if row.get(column) not in (None, "") else None for column in REFERENCE_COLUMNS)
+
+
+def export_database(handler: DatabaseHandler, path: str, file_format: str) -> None:
+    with open_file(path, "w") as file:
+        written = write_references(file, file_format, handler.export_references())
+    print(f"Exported {written} message references to '{path}'.")
+
+
+def import_database(handler: DatabaseHandler, path: str, file_format: str, batch_size: int) -> None:
+    with open_file(path, "r") as file:
+        imported = handler.import_references(read_references(file, file_format), batch_size)
+    print(f"Imported {imported} message references from '{path}'.")
+
+
+def compact_database(handler: DatabaseHandler, output: Optional[str]) -> None:
+    """
+    Write a compacted copy of the database. Without an output path, the database is replaced with the copy. The
+    database is locked for the replacement, so it is not replaced while the bot or anything else has it open.
+    """
+    database_path = handler.database_path
+    compacted_path = output or f"{database_path}.compact"
+    if os.path.exists(compacted_path):
+        raise FileExistsError(f"File '{compacted_path}' already exists.")
+
+    if output is None:
+        try:
+            # Kept until the connection is closed after the replacement
+            handler.lock_exclusively()
+        except sqlite3.OperationalError:
+            sys.exit(f"Cannot lock database '{database_path}'. Stop the bot before replacing the database, or write "
+                     f"the compacted database to another file with option --output.")
+
+    size = os.path.getsize(database_path)
+    handler.vacuum_into(compacted_path)
+    print(f"Compacted {size / 1e6:.1f} MB to {os.path.getsize(compacted_path) / 1e6:.1f} MB.")
+    if output is not None:
+        return
+
+    # The write-ahead log of the old database must not be applied to the new one
+    os.replace(compacted_path, database_path)
+    handler.disconnect()
+    for suffix in ("-wal", "-shm"):
+        if os.path.exists(database_path + suffix):
+            os.remove(database_path + suffix)
+    print(f"Replaced '{database_path}' with the compacted database.")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export, import and compact the message reference database. Exports "
+                                                 "and imports can be run while the bot is running.")
+    parser.add_argument("--database", help="Path to the database. Defaults to the database in config.toml.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = commands.add_parser("export", help="Export message references to a JSONL or CSV file. Files "
+                                                       "ending with .gz, .bz2 or .xz are compressed.")
+    export_parser.add_argument("file", help="Path to the export file, e.g. references.jsonl.gz.")
+    export_parser.add_argument("--format", choices=_FORMATS, help="Format of the file, if not in the file name.")
+
+    import_parser = commands.add_parser("import", help="Import message references from a file exported with command "
+                                                       "export. References already in the database are skipped.")
+    import_parser.add_argument("file", help="Path to the export file.")
+    import_parser.add_argument("--format", choices=_FORMATS, help="Format of the file, if not in the file name.")
+    import_parser.add_argument("--batch-size", type=int, default=50_000,
+                               help="Amount of references to import in a single transaction.")
+
+    compact_parser = commands.add_parser("compact", help="Compact the database by vacuuming it into a new file and "
+                                                         "replacing the database with it. The database is not "
+                                                         "replaced while the bot is running.")
+    compact_parser.add_argument("--output", help="Write the compacted database to this file instead of replacing the "
+                                                 "database. Can be run while the bot is running.")
+    args = parser.parse_args()
+
+    profile = {"busy_timeout": 5000}
+    migration_defaults = None
+    database_path = args.database
+    if os.path.isfile("config.toml"):
+        config = Config("config.toml")
+        database_path = database_path or config.general.database_path
+        profile["busy_timeout"] = config.database.busy_timeout
+        migration_defaults = dict(tg_chat_id=config.channel_ids.telegram)
+    if database_path is None:
+        sys.exit("No database given and config.toml not found. Use option --database.")
+    if not os.path.isfile(database_path) and args.command != "import":
+        sys.exit(f"Database '{database_path}' does not exist.")
+
+    # Waiting for locks lets the bot keep writing to the database meanwhile
+    handler = DatabaseHandler(database_path, profile=profile, read_only=args.command == "export",
+                              ensure_tables=args.command != "export", migration_defaults=migration_defaults)
+    try:
+        if args.command == "export":
+            export_database(handler, args.file, args.format or guess_format(args.file))
+        elif args.command == "import":
+            import_database(handler, args.file, args.format or guess_format(args.file), args.batch_size)
+        else:
+            compact_database(handler, args.output)
+    finally:
+        if handler.connection is not None:
+            handler.disconnect()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+"""
+MIT License
+
+Copyright (c) 2025 Niko Mätäsaho
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import dbm
+import json
+import logging
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import discord
+
+
+_logger = logging.getLogger(__name__)
+
+# A reference to be added to a store: Telegram chat ID, Telegram message ID, the Discord message and timestamp
+NewReference = Tuple[int, int, discord.Message, Union[int, datetime]]
+
+
+def _timestamp(ts: Union[int, datetime]) -> int:
+    return int(ts.timestamp()) if isinstance(ts, datetime) else ts
+
+
+class ReferenceStore:
+    """
+    Interface of storages for references between Telegram and Discord messages. References are keyed by Telegram chat
+    IDs and message IDs.
+
+    Stores are not thread safe. ``AsyncDatabaseHandler`` uses them only from its writer thread.
+    """
+
+    def add(
+            self,
+            tg_chat_id: int,
+            tg_message_id: int,
+            discord_message: discord.Message,
+            ts: Union[int, datetime]
+    ) -> None:
+        """
+        Add a reference to a Discord message.
+
+        :param tg_chat_id: ID of the Telegram chat of the message.
+        :param tg_message_id: ID of the Telegram message.
+        :param discord_message: The Discord message forwarded from the Telegram message.
+        :param ts: Leap second aware UTC timestamp when the Discord message was sent.
+        """
+        raise NotImplementedError(f"add method not implemented in {self.__class__.__name__}")
+
+    def add_many(self, references: Iterable[NewReference]) -> None:
+        """
+        Add several references at once.
+
+        :param references: Tuples of arguments of ``add``.
+        """
+        for reference in references:
+            self.add(*reference)
+
+    def get(self, tg_chat_id: int, tg_message_id: int) -> List[Tuple[int, int, Optional[int]]]:
+        """
+        Get the references of a Telegram message.
+
+        :param tg_chat_id: ID of the Telegram chat of the message.
+        :param tg_message_id: ID of the Telegram message.
+        :return: List of tuples of Discord message IDs, Discord channel IDs and webhook IDs.
+        """
+        raise NotImplementedError(f"get method not implemented in {self.__class__.__name__}")
+
+    def get_many(self, keys: Iterable[Tuple[int, int]]) -> Dict[Tuple[int, int], List[Tuple[int, int, Optional[int]]]]:
+        """
+        Get the references of several Telegram messages at once.
+
+        :param keys: Tuples of Telegram chat IDs and message IDs.
+        :return: Dictionary of the keys and the references as returned by ``get``.
+        """
+        return {key: self.get(*key) for key in keys}
+
+    def update_ts(self, tg_chat_id: int, tg_message_id: int, new_ts: Union[int, datetime]) -> int:
+        """
+        Update the timestamp of the references of a Telegram message, so that they are kept longer.
+
+        :param tg_chat_id: ID of the Telegram chat of the message.
+        :param tg_message_id: ID of the Telegram message.
+        :param new_ts: Leap second aware UTC timestamp of the last reference time.
+        :return: Amount of updated references.
+        """
+        raise NotImplementedError(f"update_ts method not implemented in {self.__class__.__name__}")
+
+    def delete_by_id(self, tg_chat_id: int, tg_message_id: int) -> int:
+        """
+        Delete the references of a Telegram message.
+
+        :param tg_chat_id: ID of the Telegram chat of the message.
+        :param tg_message_id: ID of the Telegram message.
+        :return: Amount of deleted references.
+        """
+        raise NotImplementedError(f"delete_by_id method not implemented in {self.__class__.__name__}")
+
+    def delete_by_age(self, upper_age_limit: Union[int, datetime]) -> int:
+        """
+        Delete references by their timestamps.
+
+        :param upper_age_limit: Inclusive leap second aware UTC timestamp of the most recent reference to delete.
+        :return: Amount of deleted references.
+        """
+        raise NotImplementedError(f"delete_by_age method not implemented in {self.__class__.__name__}")
+
+    def get_recent(self, limit: int) -> List[Tuple[int, int, int, int, Optional[int], int]]:
+        """
+        Get all references of the most recently referenced Telegram messages.
+
+        :param limit: Maximum amount of Telegram messages to get the references for.
+        :return: List of tuples of Telegram chat IDs, Telegram message IDs, Discord message IDs, Discord channel IDs,
+        webhook IDs and timestamps, oldest reference first.
+        """
+        raise NotImplementedError(f"get_recent method not implemented in {self.__class__.__name__}")
+
+    def get_max_tg_message_ids(self) -> Dict[int, int]:
+        """
+        Get the largest Telegram message IDs having references in every Telegram chat.
+
+        :return: Dictionary of Telegram chat IDs and the largest Telegram message IDs in them.
+        """
+        raise NotImplementedError(f"get_max_tg_message_ids method not implemented in {self.__class__.__name__}")
+
+    def close(self) -> None:
+        """
+        Close the store.
+        """
+        pass
+
+
+class _KeyValueStore(ReferenceStore):
+    """
+    A reference store keeping the references of every Telegram message as a single value. Subclasses implement reading
+    and writing the values. Deleting by age and finding the recent references scan all values.
+    """
+
+    def _read(self, key: Tuple[int, int]) -> List[list]:
+        raise NotImplementedError(f"_read method not implemented in {self.__class__.__name__}")
+
+    def _write(self, key: Tuple[int, int], references: List[list]) -> None:
+        raise NotImplementedError(f"_write method not implemented in {self.__class__.__name__}")
+
+    def _delete(self, key: Tuple[int, int]) -> None:
+        raise NotImplementedError(f"_delete method not implemented in {self.__class__.__name__}")
+
+    def _items(self) -> Iterable[Tuple[Tuple[int, int], List[list]]]:
+        raise NotImplementedError(f"_items method not implemented in {self.__class__.__name__}")
+
+    def add(
+            self,
+            tg_chat_id: int,
+            tg_message_id: int,
+            discord_message: discord.Message,
+            ts: Union[int, datetime]
+    ) -> None:
+        key = (tg_chat_id, tg_message_id)
+        references = self._read(key)
+        # References are stored as lists of Discord message IDs, channel IDs, guild IDs, webhook IDs and timestamps
+        references.append([discord_message.id, discord_message.channel.id, discord_message.guild.id,
+                           discord_message.webhook_id, _timestamp(ts)])
+        self._write(key, references)
+
+    def get(self, tg_chat_id: int, tg_message_id: int) -> List[Tuple[int, int, Optional[int]]]:
+        return [(message_id, channel_id, webhook_id)
+                for message_id, channel_id, _, webhook_id, _ in self._read((tg_chat_id, tg_message_id))]
+
+    def update_ts(self, tg_chat_id: int, tg_message_id: int, new_ts: Union[int, datetime]) -> int:
+        key = (tg_chat_id, tg_message_id)
+        references = self._read(key)
+        for reference in references:
+            reference[4] = _timestamp(new_ts)
+        if references:
+            self._write(key, references)
+        return len(references)
+
+    def delete_by_id(self, tg_chat_id: int, tg_message_id: int) -> int:
+        key = (tg_chat_id, tg_message_id)
+        references = self._read(key)
+        if references:
+            self._delete(key)
+        return len(references)
+
+    def delete_by_age(self, upper_age_limit: Union[int, datetime]) -> int:
+        upper_age_limit = _timestamp(upper_age_limit)
+        deleted = 0
+        for key, references in list(self._items()):
+            kept = [reference for reference in references if reference[4] > upper_age_limit]
+            if len(kept) == len(references):
+                continue
+
+            deleted += len(references) - len(kept)
+            if kept:
+                self._write(key, kept)
+            else:
+                self._delete(key)
+
+        _logger.debug(f"Deleted {deleted} references older than {upper_age_limit}.")
+        return deleted
+
+    def get_recent(self, limit: int) -> List[Tuple[int, int, int, int, Optional[int], int]]:
+        latest = sorted(self._items(), key=lambda item: max(reference[4] for reference in item[1]), reverse=True)
+        recent = [(tg_chat_id, tg_message_id, message_id, channel_id, webhook_id, ts)
+                  for (tg_chat_id, tg_message_id), references in latest[:limit]
+                  for message_id, channel_id, _, webhook_id, ts in references]
+        recent.sort(key=lambda reference: reference[5])
+        return recent
+
+    def get_max_tg_message_ids(self) -> Dict[int, int]:
+        max_ids = {}
+        for tg_chat_id, tg_message_id in (key for key, _ in self._items()):
+            max_ids[tg_chat_id] = max(tg_message_id, max_ids.get(tg_chat_id, tg_message_id))
+        return max_ids
+
+
+class MemoryReferenceStore(_KeyValueStore):
+
+    def __init__(self):
+        """
+        A reference store keeping the references only in memory. The references are lost when the bot is stopped, so
+        the store suits testing and deployments without persistent storage.
+        """
+        self._references: Dict[Tuple[int, int], List[list]] = {}
+
+    def __len__(self) -> int:
+        return len(self._references)
+
+    def _read(self, key: Tuple[int, int]) -> List[list]:
+        return [list(reference) for reference in self._references.get(key, [])]
+
+    def _write(self, key: Tuple[int, int], references: List[list]) -> None:
+        self._references[key] = references
+
+    def _delete(self, key: Tuple[int, int]) -> None:
+        del self._references[key]
+
+    def _items(self) -> Iterable[Tuple[Tuple[int, int], List[list]]]:
+        return self._references.items()
+
+
+class DbmReferenceStore(_KeyValueStore):
+
+    def __init__(self, path: str):
+        """
+        A reference store in an embedded key-value database of the ``dbm`` module. The references of every Telegram
+        message are stored as a single JSON value, so adding and looking up references is fast, but deleting them by
+        age must read the whole database.
+
+        :param path: Path to the database file. The file is created if it does not exist.
+        """
+        self.path = path
+        self._db = dbm.open(path, "c")
+        _logger.debug(f"Opened dbm reference store '{path}' of type {dbm.whichdb(path)}")
+
+    @staticmethod
+    def _encode_key(key: Tuple[int, int]) -> bytes:
+        return f"{key[0]}:{key[1]}".encode()
+
+    @staticmethod
+    def _decode_key(key: bytes) -> Tuple[int, int]:
+        tg_chat_id, tg_message_id = key.decode().split(":")
+        return int(tg_chat_id), int(tg_message_id)
+
+    def _read(self, key: Tuple[int, int]) -> List[list]:
+        value = self._db.get(self._encode_key(key))
+        return json.loads(value) if value is not None else []
+
+    def _write(self, key: Tuple[int, int], references: List[list]) -> None:
+        self._db[self._encode_key(key)] = json.dumps(references, separators=(",", ":"))
+
+    def _delete(self, key: Tuple[int, int]) -> None:
+        del self._db[self._encode_key(key)]
+
+    def _items(self) -> Iterable[Tuple[Tuple[int, int], List[list]]]:
+        for key in self._db.keys():
+            yield self._decode_key(key), json.loads(self._db[key])
+
+    def close(self) -> None:
+        self._db.close()
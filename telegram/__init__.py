@@ -15,4 +15,6 @@ from .poll import *
 from .update import *
 from .user import *
 
+from .intern import InternPool
+from .journal import UpdateJournal, read_journal
 from .utils import configure_logging
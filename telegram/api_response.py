@@ -47,7 +47,8 @@ class ApiResponseBase:
         "_ok",
         "_result",
         "_error_code",
-        "_description"
+        "_description",
+        "_retry_after"
     )
 
     def __init__(self, payload: ApiResponseBasePayload):
@@ -55,6 +56,7 @@ class ApiResponseBase:
         self._result = payload.get("result")
         self._error_code = payload.get("error_code")
         self._description = payload.get("description")
+        self._retry_after = payload.get("parameters", {}).get("retry_after")
 
     @property
     def ok(self) -> bool:
@@ -70,6 +72,13 @@ class ApiResponseBase:
         """
         return self._result
 
+    @property
+    def raw_result(self) -> Optional[dict]:
+        """
+        Data returned by the Telegram API on successful request, as decoded from JSON without converting it to objects.
+        """
+        return self._result
+
     @property
     def error_code(self) -> Optional[int]:
         """
@@ -84,6 +93,14 @@ class ApiResponseBase:
         """
         return self._description
 
+    @property
+    def retry_after(self) -> Optional[int]:
+        """
+        Time in seconds to wait before repeating a request that was rate limited, or None if the request was not rate
+        limited.
+        """
+        return self._retry_after
+
 
 class ApiResponse(ApiResponseBase):
     """
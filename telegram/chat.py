@@ -26,6 +26,7 @@ SOFTWARE.
 from datetime import datetime, UTC
 
 from .user import User
+from .intern import Interned
 from .types.chat import (
     Chat as ChatPayload,
     ChatPhoto as ChatPhotoPayload,
@@ -107,7 +108,7 @@ class ChatPermissions:
         self.can_manage_topics = payload.get("can_manage_topics", self.can_pin_messages)
 
 
-class Chat:
+class Chat(metaclass=Interned):
     """
     Represents a chat in Telegram.
 
@@ -133,7 +134,8 @@ class Chat:
         "first_name",
         "last_name",
         "is_forum",
-        "is_direct_messages"
+        "is_direct_messages",
+        "__weakref__"
     )
 
     def __init__(self, payload: ChatPayload) -> None:
@@ -26,13 +26,16 @@ SOFTWARE.
 import logging
 import asyncio
 import io
+import time
 from enum import Enum
 
 import aiohttp
 
 from .api_response import ApiResponse, FileQueryResult
 from .utils import MediaCache
-from .update import Update
+from .intern import InternPool
+from .journal import UpdateJournal
+from .update import Update, UpdateKind
 from .media import MediaBase, File
 from typing import (
     Coroutine,
@@ -40,6 +43,7 @@ from typing import (
     Callable,
     Dict,
     List,
+    Iterable,
     TypeVar,
     Optional,
     Tuple
@@ -49,6 +53,8 @@ _logger = logging.getLogger(__name__)
 Coro = TypeVar("Coro", bound=Callable[..., Coroutine[Any, Any, Any]])
 
 API_BASE_URL = "https://api.telegram.org"
+# Time in seconds to wait before polling again after a failed getUpdates request, unless told otherwise by the API
+_POLLING_RETRY_DELAY = 5
 
 class _TgMethod(Enum):
     """
@@ -60,26 +66,47 @@ class _TgMethod(Enum):
     download_file = "/file/bot{bot_token}/{filepath}"
 
 
+# Events invoked with the content of an update, and the update kinds invoking them
+_EVENT_KINDS: Dict[str, Tuple[UpdateKind, ...]] = {
+    "on_message": (UpdateKind.Message, UpdateKind.ChannelPost, UpdateKind.BusinessMessage),
+    "on_message_edit": (UpdateKind.EditedMessage, UpdateKind.EditedChannelPost, UpdateKind.EditedBusinessMessage)
+}
+
 
 class Client:
 
     # noinspection PyTypeChecker
-    def __init__(self, loop: asyncio.AbstractEventLoop = None) -> None:
+    def __init__(
+            self,
+            loop: asyncio.AbstractEventLoop = None,
+            intern_objects: bool = False,
+            journal: UpdateJournal = None,
+            base_url: str = API_BASE_URL
+    ) -> None:
         """
         A class responsible for asynchronous connection to Telegram API. This client is then responsible for receiving
         updates and invoking events based on the received data.
 
         :param loop: An existing asyncio event loop where to attach to. If omitted, new one is automatically
                      created.
+        :param intern_objects: Reuse identical ``User`` and ``Chat`` objects between updates received by this client.
+                               See ``telegram.InternPool``.
+        :param journal: A journal to record the received updates to for replaying them later. If omitted, the updates
+                        are not recorded.
+        :param base_url: URL of the Telegram Bot API server, e.g. of a local server for testing.
         """
         self._secret: str = None
         self.loop: asyncio.AbstractEventLoop = loop
-        self._client_session = aiohttp.ClientSession(base_url=API_BASE_URL)
+        self._client_session = aiohttp.ClientSession(base_url=base_url)
         self.updates_offset: int = -1
         self.listeners: Dict[str, List[Coro]] = {}
+        self._update_listeners: Tuple[Coro, ...] = ()
+        self._dispatch_table: Dict[UpdateKind, Tuple[Coro, ...]] = {}
         self.checks: List[Coro] = []
         self.polling_task: asyncio.Task = None
         self.media_cache = MediaCache()
+        self.journal = journal
+        self.intern_pool: Optional[InternPool] = InternPool() if intern_objects else None
 
         self._existing_loop = self.loop is not None
         if loop is None:
@@ -174,8 +201,13 @@ class Client:
         while True:
             params = {"timeout": 200, "offset": self.updates_offset}
             resp = await self._get(_TgMethod.get_updates, request_timeout=200, params=params)
-            updates = resp.result
+            if not resp.ok:
+                await asyncio.sleep(resp.retry_after or _POLLING_RETRY_DELAY)
+                continue
 
+            if self.journal is not None and resp.raw_result:
+                self.journal.append(resp.raw_result)
+            updates = self._parse_updates(resp)
             if updates:
                 await self.invoke_update_listeners(updates)
                 latest = updates[-1]
@@ -185,6 +217,21 @@ class Client:
 
             await asyncio.sleep(1)
 
+    def _parse_updates(self, response: ApiResponse) -> List[Update]:
+        """
+        Convert the updates in an API response to objects, interning users and chats in the pool of this client.
+        """
+        if self.intern_pool is None:
+            return response.result
+
+        reused = self.intern_pool.reused
+        with self.intern_pool.activate():
+            updates = response.result
+        if self.intern_pool.reused > reused:
+            _logger.debug(f"Reused {self.intern_pool.reused - reused} interned users and chats for {len(updates)} "
+                          f"updates")
+        return updates
+
     @staticmethod
     async def invoke_listener(coroutine: Coro, *args):
         """
@@ -202,14 +249,42 @@ class Client:
         """
         Send updates to all registered event listeners.
         """
-        update_listeners = self.listeners.get("on_update", [])
         _logger.debug(f"Received {len(updates)} new updates. Invoking listeners.")
 
         for update in updates:
             await self.on_update(update)
-            for listener in update_listeners:
+            for listener in self._update_listeners:
                 await self.invoke_listener(listener, update)
 
+    async def replay(self, batches: Iterable[Tuple[float, List[dict]]], speed: float = 1) -> int:
+        """
+        Feed recorded update batches through update parsing, checks and listeners as if they were received from the
+        Telegram API. No requests are made to the API.
+
+        :param batches: Tuples of the Unix timestamp when a batch was received and the raw updates in it, e.g. from
+                        ``telegram.read_journal``.
+        :param speed: Replay speed relative to the recorded speed, e.g. 10 for ten times faster. Set to 0 to replay as
+                      fast as possible.
+        :return: Amount of replayed updates.
+        """
+        start = time.perf_counter()
+        first_received = None
+        replayed = 0
+        for received, raw_updates in batches:
+            if speed > 0:
+                if first_received is None:
+                    first_received = received
+                delay = (received - first_received) / speed - (time.perf_counter() - start)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+            updates = self._parse_updates(ApiResponse(dict(ok=True, result=raw_updates)))
+            if updates:
+                await self.invoke_update_listeners(updates)
+                replayed += len(updates)
+
+        return replayed
+
     async def get_file(self, file_id: str) -> Optional[File]:
         """
         Request a file in Telegram servers to be downloaded or reused. The received ``File`` object is guaranteed to
@@ -271,9 +346,22 @@ class Client:
             self.listeners[event_name] = []
             self.listeners[event_name].append(coroutine)
 
+        self._build_dispatch_table()
         _logger.debug(f"Registered listener for event '{event_name}'")
         return coroutine
 
+    def _build_dispatch_table(self) -> None:
+        """
+        Build the table of listeners to invoke for each update kind. Must be called every time the listeners change.
+        """
+        dispatch_table: Dict[UpdateKind, List[Coro]] = {}
+        for event_name, kinds in _EVENT_KINDS.items():
+            for kind in kinds:
+                dispatch_table.setdefault(kind, []).extend(self.listeners.get(event_name, []))
+
+        self._update_listeners = tuple(self.listeners.get("on_update", []))
+        self._dispatch_table = {kind: tuple(listeners) for kind, listeners in dispatch_table.items() if listeners}
+
     def event(self, coroutine: Coro) -> Coro:
         """
         Shorthand, decorator method for adding a listener to event listener.
@@ -321,19 +409,10 @@ class Client:
                 _logger.debug("A check returned False. Discarding the update.")
                 return
 
-        on_message_listeners = self.listeners.get("on_message", [])
-        on_message_edit_listeners = self.listeners.get("on_message_edit", [])
-
-        effective_message = update.effective_message
-        if update.is_edited_message:
-            _logger.debug(f"Invoking {len(on_message_edit_listeners)} on_message_edit listeners.")
-            for listener in on_message_edit_listeners:
-                await self.invoke_listener(listener, effective_message)
-
-        elif effective_message:
-            _logger.debug(f"Invoking {len(on_message_listeners)} on_message listeners.")
-            for listener in on_message_listeners:
-                await self.invoke_listener(listener, effective_message)
+        listeners = self._dispatch_table.get(update.kind, ())
+        _logger.debug(f"Invoking {len(listeners)} listeners for {update.kind.value} update.")
+        for listener in listeners:
+            await self.invoke_listener(listener, update.effective_payload)
 
     def start(self, secret: str) -> None:
         """
@@ -361,3 +440,5 @@ class Client:
 
         self.polling_task.cancel()
         self.polling_task = None
+        if self.journal is not None:
+            self.journal.close()
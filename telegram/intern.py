@@ -0,0 +1,114 @@
+"""
+MIT License
+
+Copyright (c) 2025 Niko Mätäsaho
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import weakref
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Hashable, Iterator, Optional, Tuple
+
+
+class InternPool:
+
+    def __init__(self):
+        """
+        A pool of Telegram objects for reusing identical objects instead of creating new ones for every update. The
+        pool is keyed by the object type and the content of its payload, so an object is reused only if the payload is
+        identical, and a new object is created e.g. when a user changes their name. The objects are weakly referenced,
+        so they are removed from the pool when they are not used anymore.
+
+        Interned objects are shared between updates and must not be modified. Objects are interned only while the pool
+        is activated with ``activate``, so every client can have a pool of its own.
+        """
+        self.created = 0
+        self.reused = 0
+        self._objects: weakref.WeakValueDictionary = weakref.WeakValueDictionary()
+
+    def __len__(self) -> int:
+        return len(self._objects)
+
+    @staticmethod
+    def _key(cls: type, payload: dict) -> Optional[Tuple[type, Hashable]]:
+        try:
+            key = (cls, tuple(sorted(payload.items())))
+            hash(key)
+        except TypeError:
+            # Payloads with nested objects are not interned
+            return None
+        return key
+
+    def intern(self, cls: type, payload: dict, create: Callable[[dict], Any]) -> Any:
+        """
+        Get an object from the pool, or create it and add it to the pool if there is no identical object.
+
+        :param cls: Type of the object.
+        :param payload: Payload of the object received from Telegram API.
+        :param create: Function creating the object from the payload.
+        :return: The pooled object.
+        """
+        key = self._key(cls, payload)
+        if key is None:
+            return create(payload)
+
+        obj = self._objects.get(key)
+        if obj is not None:
+            self.reused += 1
+            return obj
+
+        obj = create(payload)
+        self._objects[key] = obj
+        self.created += 1
+        return obj
+
+    def clear(self) -> None:
+        self._objects.clear()
+        self.created = 0
+        self.reused = 0
+
+    @contextmanager
+    def activate(self) -> Iterator[None]:
+        """
+        A context manager interning the objects created in the context in this pool.
+        """
+        token = _active_pool.set(self)
+        try:
+            yield
+        finally:
+            _active_pool.reset(token)
+
+
+_active_pool: ContextVar[Optional[InternPool]] = ContextVar("active_intern_pool", default=None)
+
+
+class Interned(type):
+    """
+    Metaclass for Telegram objects that are interned in the active ``InternPool``, if any. Classes using this metaclass
+    must have a ``__weakref__`` slot.
+    """
+
+    def __call__(cls, payload: dict):
+        pool = _active_pool.get()
+        if pool is None:
+            return super().__call__(payload)
+        return pool.intern(cls, payload, super().__call__)
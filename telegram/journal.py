@@ -0,0 +1,159 @@
+"""
+MIT License
+
+Copyright (c) 2025 Niko Mätäsaho
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import gzip
+import json
+import logging
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import IO, Iterator, List, Optional, Tuple
+
+
+_logger = logging.getLogger(__name__)
+
+SEGMENT_PREFIX = "updates-"
+SEGMENT_SUFFIX = ".jsonl.gz"
+
+
+class UpdateJournal:
+
+    def __init__(self, directory: str, max_segment_size: int = 16_000_000, max_segments: int = 0):
+        """
+        An append-only journal of raw update batches received from Telegram API, for replaying them later. The batches
+        are written as JSON lines to gzip compressed segment files. A new segment is started when the current one
+        grows too big. The batches are compressed and written in a thread of their own, so that appending them never
+        blocks the event loop.
+
+        :param directory: Directory to write the segments to. Created if it does not exist.
+        :param max_segment_size: Amount of uncompressed bytes to write to a segment before starting a new one.
+        :param max_segments: Amount of the most recent segments to keep. Older segments are deleted when a new segment
+                             is started. Set to 0 to keep all segments.
+        """
+        self.directory = Path(directory)
+        self.max_segment_size = max_segment_size
+        self.max_segments = max_segments
+        self._file: Optional[IO[str]] = None
+        self._segment_size = 0
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._writer: Optional[threading.Thread] = None
+
+    def _open_segment(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # Nanoseconds keep the names unique and in order even if segments are started rapidly
+        path = self.directory / f"{SEGMENT_PREFIX}{time.time_ns()}{SEGMENT_SUFFIX}"
+        self._file = gzip.open(path, "wt", encoding="utf-8")
+        self._segment_size = 0
+        _logger.debug(f"Started update journal segment '{path}'")
+
+        if self.max_segments > 0:
+            for old_segment in segments(self.directory)[:-self.max_segments]:
+                old_segment.unlink()
+                _logger.debug(f"Deleted update journal segment '{old_segment}'")
+
+    def append(self, updates: List[dict], received: float = None) -> None:
+        """
+        Append a batch of updates to the journal. The batch is written to the disk in the background. The updates must
+        not be modified afterwards.
+
+        :param updates: The raw result of a getUpdates request.
+        :param received: Unix timestamp when the updates were received. If omitted, the current time is used.
+        """
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._write_loop, name="update-journal-writer", daemon=True)
+            self._writer.start()
+
+        self._queue.put((received or time.time(), updates))
+
+    def _write_loop(self) -> None:
+        while True:
+            batch = self._queue.get()
+            if batch is None:
+                break
+
+            try:
+                self._write(*batch)
+            except Exception as e:
+                _logger.error("Failed to write updates to the update journal", exc_info=e)
+
+        self._close_segment()
+
+    def _write(self, received: float, updates: List[dict]) -> None:
+        if self._file is None or self._segment_size >= self.max_segment_size:
+            self._close_segment()
+            self._open_segment()
+
+        line = json.dumps(dict(received=received, updates=updates), ensure_ascii=False) + "\n"
+        self._file.write(line)
+        # Flush the batch to the disk, so that the journal can be read up to it if the bot stops unexpectedly
+        self._file.flush()
+        self._segment_size += len(line)
+
+    def _close_segment(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def close(self) -> None:
+        """
+        Write the batches appended so far and close the journal. Appending a batch opens the journal again.
+        """
+        if self._writer is None:
+            return
+
+        self._queue.put(None)
+        self._writer.join()
+        self._writer = None
+
+
+def segments(directory: str) -> List[Path]:
+    """
+    Get the segments of a journal.
+
+    :param directory: Directory of the journal.
+    :return: Paths to the segment files, oldest segment first.
+    """
+    return sorted(Path(directory).glob(f"{SEGMENT_PREFIX}*{SEGMENT_SUFFIX}"),
+                  key=lambda p: int(p.name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)]))
+
+
+def read_journal(path: str) -> Iterator[Tuple[float, List[dict]]]:
+    """
+    Read update batches from a journal.
+
+    :param path: Directory of the journal, or a single segment file.
+    :return: Iterator of tuples of the Unix timestamp when a batch was received and the raw updates in it.
+    """
+    path = Path(path)
+    for segment in segments(path) if path.is_dir() else [path]:
+        with gzip.open(segment, "rt", encoding="utf-8") as file:
+            try:
+                for line in file:
+                    batch = json.loads(line)
+                    yield batch["received"], batch["updates"]
+            except (EOFError, json.JSONDecodeError):
+                # The last batch of a segment may be incomplete if the bot was stopped while writing it
+                _logger.warning(f"Update journal segment '{segment}' ends with an incomplete batch")
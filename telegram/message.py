@@ -22,9 +22,9 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
-from typing import List, Optional, Union
+from typing import List, Optional, Sequence, Union
 
-from .utils import flatten_handlers
+from .utils import flatten_handlers, sparse_fields
 from .poll import Poll
 from .contact import Contact
 from .star import StarAmount
@@ -289,214 +289,124 @@ class InaccessibleMessage(MaybeInaccessibleMessage):
         super().__init__(payload)
 
 
+@sparse_fields
 @flatten_handlers
 class Message(MaybeInaccessibleMessage):
     _HANDLERS = []
 
     __slots__ = (
-        "message_thread_id",
-        "direct_messages_topic",
-        "from_",
-        "sender_chat",
-        "sender_boost_count",
-        "sender_business_bot",
-        "business_connection_id",
-        "forward_origin",
-        "is_topic_message",
-        "is_automatic_forward",
-        "reply_to_message",
-        "external_reply",
-        "quote",
-        "reply_to_story",
-        "reply_to_checklist_task_id",
-        "via_bot",
-        "edit_date",
-        "has_protected_content",
-        "is_from_offline",
-        "is_paid_post",
-        "media_group_id",
-        "author_signature",
-        "paid_star_count",
-        "text",
-        "entities",
-        "link_preview_options",
-        "suggested_post_info",
-        "effect_id",
-        "animation",
-        "audio",
-        "document",
-        "paid_media",
-        "photo",
-        "sticker",
-        "story",
-        "video",
-        "video_note",
-        "voice",
-        "caption",
-        "caption_entities",
-        "show_caption_above_media",
-        "has_media_spoiler",
-        "checklist",
-        "contact",
-        "dice",
-        "game",
-        "poll",
-        "venue",
-        "location",
-        "new_chat_members",
-        "left_chat_member",
-        "new_chat_title",
-        "new_chat_photo",
-        "delete_chat_photo",
-        "group_chat_created",
-        "supergroup_chat_created",
-        "channel_chat_created",
-        "message_auto_delete_timer_changed",
-        "migrate_to_chat_id",
-        "migrate_from_chat_id",
-        "pinned_message",
-        "invoice",
-        "successful_payment",
-        "refunded_payment",
-        "users_shared",
-        "chat_shared",
-        "gift",
-        "unique_gift",
-        "connected_website",
-        "write_access_allowed",
-        "passport_data",
-        "proximity_alert_triggered",
-        "boost_added",
-        "chat_background_set",
-        "checklist_tasks_done",
-        "checklist_tasks_added",
-        "direct_message_price_changed",
-        "forum_topic_created",
-        "forum_topic_edited",
-        "forum_topic_closed",
-        "forum_topic_reopened",
-        "general_forum_topic_hidden",
-        "general_forum_topic_unhidden",
-        "giveaway_created",
-        "giveaway",
-        "giveaway_winners",
-        "giveaway_completed",
-        "paid_message_price_changed",
-        "suggested_post_approved",
-        "suggested_post_approval_failed",
-        "suggested_post_declined",
-        "suggested_post_paid",
-        "suggested_post_refunded",
-        "video_chat_scheduled",
-        "video_chat_started",
-        "video_chat_ended",
-        "video_chat_participants_invited",
-        "web_app_data",
-        "reply_markup"
+        "__dict__",
     )
 
+    # Most fields are missing from a typical message. Only the fields present in the payload are stored to the
+    # instance dictionary, and the missing fields are read from these class attributes holding their default values.
+    message_thread_id: int = -1
+    direct_messages_topic: Optional[DirectMessagesTopic] = None
+    from_: Optional[User] = None
+    sender_chat: Optional[Chat] = None
+    sender_boost_count: int = 0
+    sender_business_bot: Optional[User] = None
+    business_connection_id: Optional[str] = None
+    forward_origin: Optional[MessageOrigin] = None
+    is_topic_message: bool = False
+    is_automatic_forward: bool = False
+    reply_to_message: Optional['Message'] = None
+    external_reply: Optional[ExternalReplyInfo] = None
+    quote: Optional[TextQuote] = None
+    reply_to_story: Optional[Story] = None
+    reply_to_checklist_task_id: int = -1
+    via_bot: Optional[User] = None
+    edit_date: int = -1
+    has_protected_content: bool = False
+    is_from_offline: bool = False
+    is_paid_post: bool = False
+    media_group_id: Optional[str] = None
+    author_signature: Optional[str] = None
+    paid_star_count: int = 0
+    text: Optional[str] = None
+    entities: Sequence[MessageEntity] = ()
+    link_preview_options: Optional[LinkPreviewOptions] = None
+    suggested_post_info: Optional[SuggestedPostInfo] = None
+    effect_id: Optional[str] = None
+    animation: Optional[Animation] = None
+    audio: Optional[Audio] = None
+    document: Optional[Document] = None
+    paid_media: Optional[PaidMediaInfo] = None
+    photo: Optional[List[PhotoSize]] = None
+    sticker: Optional[Sticker] = None
+    story: Optional[Story] = None
+    video: Optional[Video] = None
+    video_note: Optional[VideoNote] = None
+    voice: Optional[Voice] = None
+    caption: Optional[str] = None
+    caption_entities: Sequence[MessageEntity] = ()
+    show_caption_above_media: bool = False
+    has_media_spoiler: bool = False
+    checklist: Optional[Checklist] = None
+    contact: Optional[Contact] = None
+    dice: Optional[Dice] = None
+    game: Optional[Game] = None
+    poll: Optional[Poll] = None
+    venue: Optional[Venue] = None
+    location: Optional[Location] = None
+    new_chat_members: Optional[List[User]] = None
+    left_chat_member: Optional[User] = None
+    new_chat_title: Optional[str] = None
+    new_chat_photo: Optional[List[PhotoSize]] = None
+    delete_chat_photo: bool = False
+    group_chat_created: bool = False
+    supergroup_chat_created: bool = False
+    channel_chat_created: bool = False
+    message_auto_delete_timer_changed: Optional[MessageAutoDeleteTimerChanged] = None
+    migrate_to_chat_id: int = -1
+    migrate_from_chat_id: int = -1
+    pinned_message: Optional['Message'] = None
+    invoice: Optional[Invoice] = None
+    successful_payment: Optional[SuccessfulPayment] = None
+    refunded_payment: Optional[RefundedPayment] = None
+    users_shared: Optional[UsersShared] = None
+    chat_shared: Optional[ChatShared] = None
+    gift: Optional[GiftInfo] = None
+    unique_gift: Optional[UniqueGiftInfo] = None
+    connected_website: Optional[str] = None
+    write_access_allowed: Optional[WriteAccessAllowed] = None
+    passport_data: Optional[PassportData] = None
+    proximity_alert_triggered: Optional[ProximityAlertTriggered] = None
+    boost_added: Optional[ChatBoostAdded] = None
+    chat_background_set: Optional[ChatBackground] = None
+    checklist_tasks_done: Optional[ChecklistTasksDone] = None
+    checklist_tasks_added: Optional[ChecklistTasksAdded] = None
+    direct_message_price_changed: Optional[DirectMessagePriceChanged] = None
+    forum_topic_created: Optional[ForumTopicCreated] = None
+    forum_topic_edited: Optional[ForumTopicEdited] = None
+    forum_topic_closed: Optional[ForumTopicClosed] = None
+    forum_topic_reopened: Optional[ForumTopicReopened] = None
+    general_forum_topic_hidden: Optional[GeneralForumTopicHidden] = None
+    general_forum_topic_unhidden: Optional[GeneralForumTopicUnhidden] = None
+    giveaway_created: Optional[GiveawayCreated] = None
+    giveaway: Optional[Giveaway] = None
+    giveaway_winners: Optional[GiveawayWinners] = None
+    giveaway_completed: Optional[GiveawayCompleted] = None
+    paid_message_price_changed: Optional[PaidMessagePriceChanged] = None
+    suggested_post_approved: Optional[SuggestedPostApproved] = None
+    suggested_post_approval_failed: Optional[SuggestedPostApprovalFailed] = None
+    suggested_post_declined: Optional[SuggestedPostDeclined] = None
+    suggested_post_paid: Optional[SuggestedPostPaid] = None
+    suggested_post_refunded: Optional[SuggestedPostRefunded] = None
+    video_chat_scheduled: Optional[VideoChatScheduled] = None
+    video_chat_started: Optional[VideoChatStarted] = None
+    video_chat_ended: Optional[VideoChatEnded] = None
+    video_chat_participants_invited: Optional[VideoChatParticipantsInvited] = None
+    web_app_data: Optional[WebAppData] = None
+    reply_markup: Optional[InlineKeyboardMarkup] = None
+
     def __init__(self, payload: MessagePayload) -> None:
         super().__init__(payload)
 
-        self.message_thread_id = payload.get("message_thread_id", -1)
-        self.direct_messages_topic = payload.get("direct_messages_topic")
-        self.from_: Optional[User] = payload.get("from_")
-        self.sender_chat: Optional[Chat] = payload.get("sender_chat")
-        self.sender_boost_count = payload.get("sender_boost_count", 0)
-        self.sender_business_bot = payload.get("sender_business_bot")
-        self.business_connection_id = payload.get("business_connection_id")
-        self.forward_origin: Optional[MessageOrigin] = payload.get("forward_origin")
-        self.is_topic_message = payload.get("is_topic_message", False)
-        self.is_automatic_forward = payload.get("is_automatic_forward", False)
-        self.reply_to_message = payload.get("reply_to_message")
-        self.external_reply = payload.get("external_reply")
-        self.quote: Optional[TextQuote] = payload.get("quote")
-        self.reply_to_story = payload.get("reply_to_story")
-        self.reply_to_checklist_task_id = payload.get("reply_to_checklist_task_id", -1)
-        self.via_bot = payload.get("via_bot")
-        self.edit_date = payload.get("edit_date", -1)
-        self.has_protected_content = payload.get("has_protected_content", False)
-        self.is_from_offline = payload.get("is_from_offline", False)
-        self.is_paid_post = payload.get("is_paid_post", False)
-        self.media_group_id = payload.get("media_group_id")
-        self.author_signature = payload.get("author_signature")
-        self.paid_star_count = payload.get("paid_star_count", 0)
-        self.text = payload.get("text")
-        self.entities: List[MessageEntity] = payload.get("entities", [])
-        self.link_preview_options = payload.get("link_preview_options")
-        self.suggested_post_info = payload.get("suggested_post_info")
-        self.effect_id = payload.get("effect_id")
-        self.animation = payload.get("animation")
-        self.audio = payload.get("audio")
-        self.document = payload.get("document")
-        self.paid_media = payload.get("paid_media")
-        self.photo = payload.get("photo")
-        self.sticker = payload.get("sticker")
-        self.story = payload.get("story")
-        self.video = payload.get("video")
-        self.video_note = payload.get("video_note")
-        self.voice = payload.get("voice")
-        self.caption = payload.get("caption")
-        self.caption_entities = payload.get("caption_entities", [])
-        self.show_caption_above_media = payload.get("show_caption_above_media", False)
-        self.has_media_spoiler = payload.get("has_media_spoiler", False)
-        self.checklist = payload.get("checklist")
-        self.contact = payload.get("contact")
-        self.dice = payload.get("dice")
-        self.game = payload.get("game")
-        self.poll = payload.get("poll")
-        self.venue = payload.get("venue")
-        self.location = payload.get("location")
-        self.new_chat_members = payload.get("new_chat_members")
-        self.left_chat_member = payload.get("left_chat_member")
-        self.new_chat_title = payload.get("new_chat_title")
-        self.new_chat_photo = payload.get("new_chat_photo")
-        self.delete_chat_photo = payload.get("delete_chat_photo", False)
-        self.group_chat_created = payload.get("group_chat_created", False)
-        self.supergroup_chat_created = payload.get("supergroup_chat_created", False)
-        self.channel_chat_created = payload.get("channel_chat_created", False)
-        self.message_auto_delete_timer_changed = payload.get("message_auto_delete_timer_changed")
-        self.migrate_to_chat_id = payload.get("migrate_to_chat_id", -1)
-        self.migrate_from_chat_id = payload.get("migrate_from_chat_id", -1)
-        self.pinned_message = payload.get("pinned_message")
-        self.invoice = payload.get("invoice")
-        self.successful_payment = payload.get("successful_payment")
-        self.refunded_payment = payload.get("refunded_payment")
-        self.users_shared = payload.get("users_shared")
-        self.chat_shared = payload.get("chat_shared")
-        self.gift = payload.get("gift")
-        self.unique_gift = payload.get("unique_gift")
-        self.connected_website = payload.get("connected_website")
-        self.write_access_allowed = payload.get("write_access_allowed")
-        self.passport_data = payload.get("passport_data")
-        self.proximity_alert_triggered = payload.get("proximity_alert_triggered")
-        self.boost_added = payload.get("boost_added")
-        self.chat_background_set = payload.get("chat_background_set")
-        self.checklist_tasks_done = payload.get("checklist_tasks_done")
-        self.checklist_tasks_added = payload.get("checklist_tasks_added")
-        self.direct_message_price_changed = payload.get("direct_message_price_changed")
-        self.forum_topic_created = payload.get("forum_topic_created")
-        self.forum_topic_edited = payload.get("forum_topic_edited")
-        self.forum_topic_closed = payload.get("forum_topic_closed")
-        self.forum_topic_reopened = payload.get("forum_topic_reopened")
-        self.general_forum_topic_hidden = payload.get("general_forum_topic_hidden")
-        self.general_forum_topic_unhidden = payload.get("general_forum_topic_unhidden")
-        self.giveaway_created = payload.get("giveaway_created")
-        self.giveaway = payload.get("giveaway")
-        self.giveaway_winners = payload.get("giveaway_winners")
-        self.giveaway_completed = payload.get("giveaway_completed")
-        self.paid_message_price_changed = payload.get("paid_message_price_changed")
-        self.suggested_post_approved = payload.get("suggested_post_approved")
-        self.suggested_post_approval_failed = payload.get("suggested_post_approval_failed")
-        self.suggested_post_declined = payload.get("suggested_post_declined")
-        self.suggested_post_paid = payload.get("suggested_post_paid")
-        self.suggested_post_refunded = payload.get("suggested_post_refunded")
-        self.video_chat_scheduled = payload.get("video_chat_scheduled")
-        self.video_chat_started = payload.get("video_chat_started")
-        self.video_chat_ended = payload.get("video_chat_ended")
-        self.video_chat_participants_invited = payload.get("video_chat_participants_invited")
-        self.web_app_data =payload.get("web_app_data")
-        self.reply_markup = payload.get("reply_markup")
+        fields = self.__dict__
+        for key, value in payload.items():
+            if key in self._FIELDS:
+                fields[key] = value
 
         for key, func in self._HANDLERS:
             try:
@@ -25,7 +25,7 @@ SOFTWARE.
 
 from enum import Enum
 from urllib.parse import urlparse, urlunparse
-from typing import Tuple, List
+from typing import Tuple, List, Optional, Dict, Any
 
 from .user import User
 from .types.message_entity import MessageEntity as MessageEntityPayload
@@ -78,10 +78,7 @@ class MessageEntity:
         "type",
         "offset",
         "length",
-        "url",
-        "user",
-        "language",
-        "custom_emoji_id"
+        "_optional_fields"
     )
 
     def __init__(self, payload: MessageEntityPayload):
@@ -102,26 +99,46 @@ class MessageEntity:
         """
         Length of the entity in UTF-16 code units.
         """
-        self.url = payload.get("url")
+
+        # Each optional field is used by only one entity type, so they are stored only if the entity has any of them
+        optional_fields: Dict[str, Any] = {key: payload[key] for key in ("url", "language", "custom_emoji_id")
+                                           if key in payload}
+        if "user" in payload:
+            optional_fields["user"] = User(payload["user"])
+        self._optional_fields = optional_fields or None
+
+    def _optional_field(self, key: str) -> Any:
+        if self._optional_fields is None:
+            return None
+        return self._optional_fields.get(key)
+
+    @property
+    def url(self) -> Optional[str]:
         """
         URL of a link in an entity of type ``EntityType.TextLink``.
         """
-        self.language = payload.get("language")
+        return self._optional_field("url")
+
+    @property
+    def user(self) -> Optional[User]:
+        """
+        A mentioned user for entity type of ``EntityType.TextMention``.
+        """
+        return self._optional_field("user")
+
+    @property
+    def language(self) -> Optional[str]:
         """
         Programming language for an entity of type ``EntityType.Codeblock``.
         """
-        self.custom_emoji_id = payload.get("custom_emoji_id")
+        return self._optional_field("language")
+
+    @property
+    def custom_emoji_id(self) -> Optional[str]:
         """
         An ID for a custom emoji for entity type of ``EntityType.CustomEmoji``.
         """
-
-        try:
-            self.user = User(payload["user"])
-            """
-            A mentioned user for entity type of ``EntityType.TextMention``.
-            """
-        except KeyError:
-            self.user = None
+        return self._optional_field("custom_emoji_id")
 
     @staticmethod
     def _complete_url(url: str) -> str:
@@ -28,11 +28,17 @@ from .update import Update
 from .media import File
 
 
+class ResponseParameters(TypedDict):
+    migrate_to_chat_id: NotRequired[int]
+    retry_after: NotRequired[int]
+
+
 class ApiResponseBase(TypedDict):
     ok: bool
     result: NotRequired[Any]
     error_code: NotRequired[int]
     description: NotRequired[str]
+    parameters: NotRequired[ResponseParameters]
     asd: NotRequired[Union[Update, File]]
 
 
@@ -22,7 +22,8 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
-from typing import Optional
+from enum import Enum
+from typing import Any, Optional
 
 
 from .utils import flatten_handlers
@@ -42,6 +43,70 @@ from .query import (
 )
 
 
+class UpdateKind(Enum):
+    """
+    Enum class that represents the type of content of an update. Every update has exactly one kind of content, and the
+    values are the names of the corresponding update fields.
+    """
+
+    Message = "message"
+    EditedMessage = "edited_message"
+    ChannelPost = "channel_post"
+    EditedChannelPost = "edited_channel_post"
+    BusinessConnection = "business_connection"
+    BusinessMessage = "business_message"
+    EditedBusinessMessage = "edited_business_message"
+    DeletedBusinessMessages = "deleted_business_messages"
+    MessageReaction = "message_reaction"
+    MessageReactionCount = "message_reaction_count"
+    InlineQuery = "inline_query"
+    ChosenInlineResult = "chosen_inline_result"
+    CallbackQuery = "callback_query"
+    ShippingQuery = "shipping_query"
+    PreCheckoutQuery = "pre_checkout_query"
+    Poll = "poll"
+    PollAnswer = "poll_answer"
+    MyChatMember = "my_chat_member"
+    ChatMember = "chat_member"
+    ChatJoinRequest = "chat_join_request"
+    ChatBoost = "chat_boost"
+    RemovedChatBoost = "removed_chat_boost"
+    Unknown = "unknown"
+    """
+    Content not supported by the library, e.g. from a newer Telegram API version.
+    """
+
+    @property
+    def is_message(self) -> bool:
+        """
+        True if the content of the update is a ``telegram.Message``, False otherwise.
+        """
+        return self in _MESSAGE_KINDS
+
+    @property
+    def is_edited(self) -> bool:
+        """
+        True if the content of the update is an edited ``telegram.Message``, False otherwise.
+        """
+        return self in _EDITED_MESSAGE_KINDS
+
+
+_MESSAGE_KINDS = frozenset((
+    UpdateKind.Message,
+    UpdateKind.EditedMessage,
+    UpdateKind.ChannelPost,
+    UpdateKind.EditedChannelPost,
+    UpdateKind.BusinessMessage,
+    UpdateKind.EditedBusinessMessage
+))
+_EDITED_MESSAGE_KINDS = frozenset((
+    UpdateKind.EditedMessage,
+    UpdateKind.EditedChannelPost,
+    UpdateKind.EditedBusinessMessage
+))
+_KINDS_BY_FIELD = {kind.value: kind for kind in UpdateKind if kind is not UpdateKind.Unknown}
+
+
 @flatten_handlers
 class Update:
     _HANDLERS = []
@@ -69,7 +134,9 @@ class Update:
         "chat_member",
         "chat_join_request",
         "chat_boost",
-        "removed_chat_boost"
+        "removed_chat_boost",
+        "kind",
+        "effective_payload"
     )
 
     def __init__(self, payload: UpdatePayload) -> None:
@@ -105,6 +172,21 @@ class Update:
             else:
                 func(self, value)
 
+        self.kind = UpdateKind.Unknown
+        """
+        Kind of the update content.
+        """
+        self.effective_payload: Any = None
+        """
+        The content of the update, e.g. a ``telegram.Message`` for message updates, or None if the kind is unknown.
+        """
+        for key in payload:
+            kind = _KINDS_BY_FIELD.get(key)
+            if kind is not None:
+                self.kind = kind
+                self.effective_payload = getattr(self, key)
+                break
+
     def _handle_message(self, value):
         self.message = Message(value)
 
@@ -171,32 +253,16 @@ class Update:
     def _handle_removed_chat_boost(self, value):
         self.removed_chat_boost = ChatBoostRemoved(value)
 
-
     @property
     def effective_message(self) -> Optional[Message]:
         """
         A ``telegram.Message`` object tied to the update, or None if the update s not about a Telegram message.
         """
-        for msg_attr in (self.message,
-                         self.edited_message,
-                         self.channel_post,
-                         self.edited_channel_post,
-                         self.business_message,
-                         self.edited_business_message):
-            if msg_attr is not None:
-                return msg_attr
-
-        return None
+        return self.effective_payload if self.kind.is_message else None
 
     @property
     def is_edited_message(self) -> bool:
         """
         True if the update is about a message that was edited. False otherwise.
         """
-        for edited_msg_attr in (self.edited_message,
-                                self.edited_channel_post,
-                                self.edited_business_message):
-            if edited_msg_attr is not None:
-                return True
-
-        return False
+        return self.kind.is_edited
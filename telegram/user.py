@@ -30,9 +30,10 @@ from .types.user import (
     ChatShared as ChatSharedPayload
 )
 from .media import PhotoSize
+from .intern import Interned
 
 
-class User:
+class User(metaclass=Interned):
 
     __slots__ = (
         "id",
@@ -45,7 +46,8 @@ class User:
         "added_to_attachment_menu",
         "can_join_groups",
         "can_read_all_group_messages",
-        "supports_inline_queries"
+        "supports_inline_queries",
+        "__weakref__"
     )
 
     def __init__(self, payload: UserPayload) -> None:
@@ -23,6 +23,7 @@ SOFTWARE.
 """
 
 
+import inspect
 import logging
 from datetime import datetime, UTC
 from typing import (
@@ -192,6 +193,18 @@ def flatten_handlers(cls: Type[T]) -> Type[T]:
     return cls
 
 
+def sparse_fields(cls: Type[T]) -> Type[T]:
+    """
+    Decorator method for collecting the fields of a class storing only the fields present in its payload. The fields
+    are declared as annotated class attributes holding their default values.
+
+    :param cls: The class instance
+    :return: The class instance with its field names in attribute ``_FIELDS``.
+    """
+    cls._FIELDS = frozenset(inspect.get_annotations(cls))
+    return cls
+
+
 # TODO: Replace these two methods below with class structure that works out of the box
 # TODO: (Or just wait better support for identifiers as TypedDict attributes)
 def replace_dictionary_keys(original: Union[dict, list]):
@@ -0,0 +1,3 @@
+"""
+Tests for the bot. Run the tests with pytest from the repository root, e.g. ``python -m pytest -q``.
+"""
@@ -0,0 +1,48 @@
+"""
+MIT License
+
+Copyright (c) 2025 Niko Mätäsaho
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import discord
+
+
+class DiscordMessage:
+
+    __slots__ = (
+        "id",
+        "channel",
+        "guild",
+        "webhook_id"
+    )
+
+    def __init__(self, message_id: int, channel_id: int, webhook_id: int = None):
+        """
+        The attributes of a Discord message needed for storing a reference to it.
+        """
+        self.id = message_id
+        self.channel = discord.Object(channel_id)
+        self.guild = discord.Object(1)
+        self.webhook_id = webhook_id
+
+    def to_message_reference_dict(self) -> dict:
+        return dict(message_id=self.id, channel_id=self.channel.id)
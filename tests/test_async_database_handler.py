@@ -0,0 +1,111 @@
+"""
+MIT License
+
+Copyright (c) 2025 Niko Mätäsaho
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import asyncio
+import sqlite3
+
+import pytest
+
+from database_handler import AsyncDatabaseHandler
+from tests.fakes import DiscordMessage
+
+
+_TG_CHAT_ID = -1001234567890
+_NOW = 1_700_000_000
+
+
+def _run(database_path: str, test, **kwargs):
+    async def run():
+        handler = AsyncDatabaseHandler(database_path, profile={"journal_mode": "WAL"}, **kwargs)
+        try:
+            return await test(handler)
+        finally:
+            await handler.disconnect()
+
+    return asyncio.run(run())
+
+
+def test_read_after_write(tmp_path):
+    async def test(handler):
+        await handler.add(_TG_CHAT_ID, 1, DiscordMessage(1000, 100), _NOW)
+        # Bypass the reference cache to read the database with a reader connection
+        handler.reference_cache.clear()
+        assert await handler.get(_TG_CHAT_ID, 1) == [(1000, 100, None)]
+
+        outbox_id, = await handler.enqueue_deliveries(_TG_CHAT_ID, 2, [(100, None)], "{}", _NOW)
+        assert [delivery[0] for delivery in await handler.get_due_deliveries(_NOW, 10)] == [outbox_id]
+
+    _run(str(tmp_path / "references.sqlite"), test)
+
+
+def test_concurrent_writes_are_committed_together(tmp_path):
+    async def test(handler):
+        await asyncio.gather(*(handler.add(_TG_CHAT_ID, i, DiscordMessage(1000 + i, 100), _NOW) for i in range(50)))
+        handler.reference_cache.clear()
+        references = await asyncio.gather(*(handler.get(_TG_CHAT_ID, i) for i in range(50)))
+        assert references == [[(1000 + i, 100, None)] for i in range(50)]
+        return handler.writes, handler.batches
+
+    writes, batches = _run(str(tmp_path / "references.sqlite"), test, commit_interval=0.05)
+    assert writes == 50
+    assert batches < writes
+
+
+def test_batches_are_limited_in_size(tmp_path):
+    async def test(handler):
+        await asyncio.gather(*(handler.add(_TG_CHAT_ID, i, DiscordMessage(1000 + i, 100), _NOW) for i in range(20)))
+        return handler.batches
+
+    assert _run(str(tmp_path / "references.sqlite"), test, commit_interval=0.05, max_batch_size=5) >= 4
+
+
+def test_failed_write_does_not_roll_back_its_batch(tmp_path):
+    async def test(handler):
+        results = await asyncio.gather(
+            handler.add(_TG_CHAT_ID, 1, DiscordMessage(1000, 100), _NOW),
+            handler.add(_TG_CHAT_ID, 2, DiscordMessage(1000, 100), _NOW),
+            handler.add(_TG_CHAT_ID, 3, DiscordMessage(1003, 100), _NOW),
+            return_exceptions=True
+        )
+        assert handler.batches == 1
+        handler.reference_cache.clear()
+        references = [await handler.get(_TG_CHAT_ID, i) for i in (1, 2, 3)]
+        return results, references
+
+    results, references = _run(str(tmp_path / "references.sqlite"), test, commit_interval=0.05)
+    assert results[0] is None
+    assert isinstance(results[1], sqlite3.IntegrityError)
+    assert results[2] is None
+    assert references == [[(1000, 100, None)], [], [(1003, 100, None)]]
+
+
+def test_closed_handler_refuses_operations(tmp_path):
+    async def test():
+        handler = AsyncDatabaseHandler(str(tmp_path / "references.sqlite"))
+        await handler.disconnect()
+        with pytest.raises(sqlite3.ProgrammingError):
+            await handler.add(_TG_CHAT_ID, 1, DiscordMessage(1000, 100), _NOW)
+
+    asyncio.run(test())
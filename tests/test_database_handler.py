@@ -0,0 +1,175 @@
+"""
+MIT License
+
+Copyright (c) 2025 Niko Mätäsaho
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import sqlite3
+
+import pytest
+
+from database_handler import DatabaseHandler, PARTITION_LENGTH
+from tests.fakes import DiscordMessage
+
+
+_TG_CHAT_ID = -1001234567890
+# Start of a partition
+_WEEK = 2820 * PARTITION_LENGTH
+
+
+def _create_baseline_database(path: str, rows) -> None:
+    """
+    Create a database with the schema used before schema versioning and the given rows of message references.
+    """
+    connection = sqlite3.connect(path)
+    connection.execute(
+        """
+        CREATE TABLE discord_messages (
+            message_id INTEGER PRIMARY KEY,
+            channel_id INTEGER NOT NULL,
+            guild_id NOT NULL,
+            tg_message_id INTEGER NOT NULL,
+            ts INTEGER NOT NULL
+        );
+        """
+    )
+    connection.executemany("INSERT INTO discord_messages VALUES (?, ?, ?, ?, ?)", rows)
+    connection.commit()
+    connection.close()
+
+
+@pytest.fixture
+def handler(tmp_path):
+    handler = DatabaseHandler(str(tmp_path / "references.sqlite"))
+    yield handler
+    handler.disconnect()
+
+
+def test_baseline_database_is_migrated(tmp_path):
+    path = str(tmp_path / "references.sqlite")
+    _create_baseline_database(path, [
+        (1000, 100, 1, 1, _WEEK + 10),
+        (1001, 200, 1, 1, _WEEK + 10),
+        (1002, 100, 1, 2, _WEEK + PARTITION_LENGTH + 10)
+    ])
+
+    handler = DatabaseHandler(path, migration_defaults={"tg_chat_id": _TG_CHAT_ID})
+    try:
+        assert handler.schema_version == 7
+        assert [partition[1:] for partition in handler.partitions()] == [
+            (_WEEK, _WEEK + PARTITION_LENGTH),
+            (_WEEK + PARTITION_LENGTH, _WEEK + 2 * PARTITION_LENGTH)
+        ]
+        assert sorted(handler.get(_TG_CHAT_ID, 1)) == [(1000, 100, None), (1001, 200, None)]
+        assert handler.get(_TG_CHAT_ID, 2) == [(1002, 100, None)]
+        assert handler.connection.execute("SELECT COUNT(*) FROM discord_messages").fetchone()[0] == 3
+
+        handler.enqueue_deliveries(_TG_CHAT_ID, 3, [(100, None)], "{}", _WEEK)
+        assert handler.get_due_deliveries(_WEEK, 10)[0][1:3] == (_TG_CHAT_ID, 3)
+    finally:
+        handler.disconnect()
+
+
+def test_migrating_references_needs_telegram_chat(tmp_path):
+    path = str(tmp_path / "references.sqlite")
+    _create_baseline_database(path, [(1000, 100, 1, 1, _WEEK)])
+
+    with pytest.raises(ValueError):
+        DatabaseHandler(path)
+
+    # The failed migration is rolled back and applied again with the chat
+    handler = DatabaseHandler(path, migration_defaults={"tg_chat_id": _TG_CHAT_ID})
+    try:
+        assert handler.schema_version == 7
+        assert handler.get(_TG_CHAT_ID, 1) == [(1000, 100, None)]
+    finally:
+        handler.disconnect()
+
+
+def test_empty_baseline_database_is_migrated_without_defaults(tmp_path):
+    path = str(tmp_path / "references.sqlite")
+    _create_baseline_database(path, [])
+
+    handler = DatabaseHandler(path)
+    try:
+        assert handler.schema_version == 7
+        assert handler.partitions() == []
+    finally:
+        handler.disconnect()
+
+
+def test_references_are_added_to_partition_of_their_timestamp(handler):
+    handler.add(_TG_CHAT_ID, 1, DiscordMessage(1000, 100), _WEEK + 10)
+    handler.add(_TG_CHAT_ID, 2, DiscordMessage(1001, 100), _WEEK + PARTITION_LENGTH)
+
+    partitions = handler.partitions()
+    assert [partition[1] for partition in partitions] == [_WEEK, _WEEK + PARTITION_LENGTH]
+    for (partition, _, _), tg_message_id in zip(partitions, (1, 2)):
+        assert handler.connection.execute(f"SELECT tg_message_id FROM {partition}").fetchall() == [(tg_message_id, )]
+
+
+def test_update_ts_moves_references_to_new_partition(handler):
+    handler.add(_TG_CHAT_ID, 1, DiscordMessage(1000, 100), _WEEK + 10)
+    handler.add(_TG_CHAT_ID, 1, DiscordMessage(1001, 200), _WEEK + 10)
+    handler.add(_TG_CHAT_ID, 2, DiscordMessage(1002, 100), _WEEK + 10)
+
+    assert handler.update_ts(_TG_CHAT_ID, 1, _WEEK + PARTITION_LENGTH + 10) == 2
+
+    old_partition, new_partition = [partition[0] for partition in handler.partitions()]
+    assert handler.connection.execute(f"SELECT message_id FROM {old_partition}").fetchall() == [(1002, )]
+    moved = handler.connection.execute(f"SELECT message_id, ts FROM {new_partition} ORDER BY message_id").fetchall()
+    assert moved == [(1000, _WEEK + PARTITION_LENGTH + 10), (1001, _WEEK + PARTITION_LENGTH + 10)]
+    assert sorted(handler.get(_TG_CHAT_ID, 1)) == [(1000, 100, None), (1001, 200, None)]
+
+
+def test_update_ts_within_partition(handler):
+    handler.add(_TG_CHAT_ID, 1, DiscordMessage(1000, 100), _WEEK + 10)
+
+    assert handler.update_ts(_TG_CHAT_ID, 1, _WEEK + 20) == 1
+
+    partition, = handler.partitions()
+    assert handler.connection.execute(f"SELECT ts FROM {partition[0]}").fetchall() == [(_WEEK + 20, )]
+
+
+def test_delete_by_age_drops_expired_partitions(handler):
+    handler.add(_TG_CHAT_ID, 1, DiscordMessage(1000, 100), _WEEK + 10)
+    handler.add(_TG_CHAT_ID, 2, DiscordMessage(1001, 100), _WEEK + 20)
+    handler.add(_TG_CHAT_ID, 3, DiscordMessage(1002, 100), _WEEK + PARTITION_LENGTH + 10)
+    handler.add(_TG_CHAT_ID, 4, DiscordMessage(1003, 100), _WEEK + PARTITION_LENGTH + 20)
+    handler.add(_TG_CHAT_ID, 5, DiscordMessage(1004, 100), _WEEK + 2 * PARTITION_LENGTH)
+    dropped_partition = handler.partitions()[0][0]
+
+    assert handler.delete_by_age(_WEEK + PARTITION_LENGTH + 10) == 3
+
+    assert [partition[1] for partition in handler.partitions()] == [_WEEK + PARTITION_LENGTH,
+                                                                  _WEEK + 2 * PARTITION_LENGTH]
+    assert handler.connection.execute("SELECT name FROM sqlite_master WHERE name = ?",
+                                      (dropped_partition, )).fetchone() is None
+    assert [tg_message_id for tg_message_id in range(1, 6) if handler.get(_TG_CHAT_ID, tg_message_id)] == [4, 5]
+
+
+def test_delete_by_age_drops_partition_ending_at_limit(handler):
+    handler.add(_TG_CHAT_ID, 1, DiscordMessage(1000, 100), _WEEK + 10)
+
+    assert handler.delete_by_age(_WEEK + PARTITION_LENGTH - 1) == 1
+    assert handler.partitions() == []
+    assert handler.get(_TG_CHAT_ID, 1) == []
@@ -0,0 +1,159 @@
+"""
+MIT License
+
+Copyright (c) 2025 Niko Mätäsaho
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import asyncio
+from types import SimpleNamespace
+
+from bots.cogs.telegram_cog import TelegramCog
+from bots.edit_coalescer import EditCoalescer
+from bots.pending_forwards import PendingForwards
+
+
+def _edited_message(chat_id: int, message_id: int, edit_date: int, text: str = None) -> SimpleNamespace:
+    return SimpleNamespace(chat=SimpleNamespace(id=chat_id), message_id=message_id, edit_date=edit_date, text=text)
+
+
+def test_newer_edit_supersedes_pending_edit():
+    applied = []
+
+    async def apply(message):
+        applied.append(message.text)
+
+    async def run():
+        coalescer = EditCoalescer(apply, delay=0.05)
+        coalescer.submit(_edited_message(1, 10, 100, "first"))
+        coalescer.submit(_edited_message(1, 10, 101, "second"))
+        coalescer.submit(_edited_message(1, 10, 102, "third"))
+        assert len(coalescer) == 1
+        await asyncio.sleep(0.15)
+        return coalescer
+
+    coalescer = asyncio.run(run())
+    assert applied == ["third"]
+    assert coalescer.coalesced == 2
+    assert len(coalescer) == 0
+
+
+def test_newer_edit_cancels_edit_being_applied():
+    applied = []
+    started = []
+
+    async def apply(message):
+        started.append(message.text)
+        await asyncio.sleep(0.05)
+        applied.append(message.text)
+
+    async def run():
+        coalescer = EditCoalescer(apply, delay=0)
+        coalescer.submit(_edited_message(1, 10, 100, "first"))
+        await asyncio.sleep(0.01)
+        coalescer.submit(_edited_message(1, 10, 101, "second"))
+        await asyncio.sleep(0.1)
+
+    asyncio.run(run())
+    assert started == ["first", "second"]
+    assert applied == ["second"]
+
+
+def test_outdated_edit_is_discarded():
+    applied = []
+
+    async def apply(message):
+        applied.append(message.text)
+
+    async def run():
+        coalescer = EditCoalescer(apply, delay=0.05)
+        coalescer.submit(_edited_message(1, 10, 101, "newer"))
+        coalescer.submit(_edited_message(1, 10, 100, "older"))
+        await asyncio.sleep(0.15)
+        return coalescer
+
+    coalescer = asyncio.run(run())
+    assert applied == ["newer"]
+    assert coalescer.coalesced == 0
+
+
+def test_edits_of_different_messages_are_not_coalesced():
+    applied = []
+
+    async def apply(message):
+        applied.append((message.chat.id, message.message_id))
+
+    async def run():
+        coalescer = EditCoalescer(apply, delay=0.05)
+        coalescer.submit(_edited_message(1, 10, 100))
+        coalescer.submit(_edited_message(2, 10, 100))
+        coalescer.submit(_edited_message(1, 11, 100))
+        await asyncio.sleep(0.15)
+
+    asyncio.run(run())
+    assert sorted(applied) == [(1, 10), (1, 11), (2, 10)]
+
+
+def test_close_cancels_pending_edits():
+    applied = []
+
+    async def apply(message):
+        applied.append(message.text)
+
+    async def run():
+        coalescer = EditCoalescer(apply, delay=0.05)
+        coalescer.submit(_edited_message(1, 10, 100))
+        await coalescer.close()
+        await asyncio.sleep(0.1)
+        return coalescer
+
+    coalescer = asyncio.run(run())
+    assert applied == []
+    assert len(coalescer) == 0
+
+
+def test_superseded_orphan_send_is_finished():
+    sent = []
+
+    async def handle_orphan_messages(tg_chat_id, tg_message_id, payload):
+        await asyncio.sleep(0.05)
+        sent.append((tg_chat_id, tg_message_id, payload))
+
+    cog = SimpleNamespace(pending_forwards=PendingForwards(), _handle_orphan_messages=handle_orphan_messages)
+
+    async def apply(message):
+        await TelegramCog._send_orphan_edit(cog, message.chat.id, message.message_id, message.text)
+
+    async def run():
+        coalescer = EditCoalescer(apply, delay=0)
+        coalescer.submit(_edited_message(1, 10, 100, "first"))
+        await asyncio.sleep(0.01)
+        assert (1, 10) in cog.pending_forwards
+
+        coalescer.submit(_edited_message(1, 10, 101, "second"))
+        await asyncio.sleep(0.01)
+        # The superseded send is still in progress and the message stays pending
+        assert sent == []
+        assert (1, 10) in cog.pending_forwards
+        await asyncio.sleep(0.15)
+
+    asyncio.run(run())
+    assert sent == [(1, 10, "first"), (1, 10, "second")]
@@ -0,0 +1,125 @@
+"""
+MIT License
+
+Copyright (c) 2025 Niko Mätäsaho
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import telegram
+from telegram.message_entity import EntityType
+from telegram.utils import replace_dictionary_keys
+
+
+_CHAT = {"id": -1001234567890, "type": "supergroup", "title": "Glasnost"}
+_USER = {"id": 123, "is_bot": False, "first_name": "Ada", "username": "ada"}
+
+# Values of the fields missing from the payload, as they were before the fields were stored sparsely
+_MISSING_FIELD_VALUES = {
+    "message_thread_id": -1,
+    "reply_to_checklist_task_id": -1,
+    "edit_date": -1,
+    "migrate_to_chat_id": -1,
+    "migrate_from_chat_id": -1,
+    "sender_boost_count": 0,
+    "paid_star_count": 0,
+    "is_topic_message": False,
+    "is_automatic_forward": False,
+    "has_protected_content": False,
+    "is_from_offline": False,
+    "is_paid_post": False,
+    "show_caption_above_media": False,
+    "has_media_spoiler": False,
+    "delete_chat_photo": False,
+    "group_chat_created": False,
+    "supergroup_chat_created": False,
+    "channel_chat_created": False
+}
+
+
+def _message(**fields) -> telegram.Message:
+    payload = {"message_id": 10, "date": 1700000000, "chat": _CHAT, **fields}
+    return telegram.Message(replace_dictionary_keys(payload))
+
+
+def test_present_fields_are_parsed():
+    message = _message(**{
+        "from": _USER,
+        "text": "Hello world",
+        "edit_date": 1700000100,
+        "has_protected_content": True,
+        "entities": [{"type": "bold", "offset": 0, "length": 5}],
+        "reply_to_message": {"message_id": 9, "date": 1699999999, "chat": _CHAT, "text": "Hi"}
+    })
+
+    assert message.message_id == 10
+    assert message.chat.id == _CHAT["id"]
+    assert message.text == "Hello world"
+    assert message.edit_date == 1700000100
+    assert message.has_protected_content is True
+    assert isinstance(message.from_, telegram.User)
+    assert message.from_.username == "ada"
+    entity, = message.entities
+    assert isinstance(entity, telegram.MessageEntity)
+    assert (entity.type, entity.offset, entity.length) == (EntityType("bold"), 0, 5)
+    assert isinstance(message.reply_to_message, telegram.Message)
+    assert message.reply_to_message.text == "Hi"
+
+
+def test_media_fields_are_parsed():
+    message = _message(caption="A photo", photo=[
+        {"file_id": "small", "file_unique_id": "a", "width": 90, "height": 90},
+        {"file_id": "large", "file_unique_id": "b", "width": 1280, "height": 1280}
+    ])
+
+    assert [type(photo) for photo in message.photo] == [telegram.PhotoSize, telegram.PhotoSize]
+    assert [photo.file_id for photo in message.photo] == ["small", "large"]
+    assert message.caption == "A photo"
+    assert list(message.caption_entities) == []
+
+
+def test_missing_fields_have_default_values():
+    message = _message(text="Hello world")
+
+    for field, value in _MISSING_FIELD_VALUES.items():
+        assert getattr(message, field) == value, field
+    assert list(message.entities) == []
+    assert list(message.caption_entities) == []
+    assert message.from_ is None
+    assert message.photo is None
+    assert message.reply_to_message is None
+
+
+def test_missing_fields_are_not_stored():
+    message = _message(text="Hello world")
+
+    assert set(message.__dict__) == {"text"}
+
+
+def test_setting_field_does_not_leak_to_other_messages():
+    message = _message(text="Hello world")
+    other = _message(text="Hello again")
+
+    message.edit_date = 1700000100
+    message.entities = [telegram.MessageEntity({"type": "italic", "offset": 0, "length": 5})]
+
+    assert other.edit_date == -1
+    assert list(other.entities) == []
+    assert telegram.Message.edit_date == -1
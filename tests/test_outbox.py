@@ -0,0 +1,130 @@
+"""
+MIT License
+
+Copyright (c) 2025 Niko Mätäsaho
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from bots.cogs.telegram_cog import TelegramCog
+from bots.outbox import OutboxDelivery
+from database_handler import DatabaseHandler
+from tests.fakes import DiscordMessage
+
+
+_TG_CHAT_ID = -1001234567890
+_NOW = 1_700_000_000
+
+
+@pytest.fixture
+def handler(tmp_path):
+    handler = DatabaseHandler(str(tmp_path / "outbox.sqlite"))
+    yield handler
+    handler.disconnect()
+
+
+def test_leased_deliveries_are_due_after_the_lease(handler):
+    outbox_ids = handler.enqueue_deliveries(_TG_CHAT_ID, 1, [(100, None), (200, 5)], "{}", _NOW, _NOW + 30)
+
+    assert handler.get_due_deliveries(_NOW, 10) == []
+    assert handler.get_due_deliveries(_NOW + 30, 10) == [
+        (outbox_ids[0], _TG_CHAT_ID, 1, 100, None, "{}", 0),
+        (outbox_ids[1], _TG_CHAT_ID, 1, 200, 5, "{}", 0)
+    ]
+
+
+def test_deliveries_without_lease_are_due_immediately(handler):
+    outbox_id, = handler.enqueue_deliveries(_TG_CHAT_ID, 1, [(100, None)], "{}", _NOW)
+    assert [delivery[0] for delivery in handler.get_due_deliveries(_NOW, 10)] == [outbox_id]
+
+
+def test_postponed_delivery_is_retried_later(handler):
+    outbox_id, = handler.enqueue_deliveries(_TG_CHAT_ID, 1, [(100, None)], "{}", _NOW)
+
+    handler.postpone_delivery(outbox_id, _NOW + 60)
+    assert handler.get_due_deliveries(_NOW + 59, 10) == []
+
+    delivery, = handler.get_due_deliveries(_NOW + 60, 10)
+    assert delivery[0] == outbox_id
+    assert delivery[6] == 1
+
+
+def test_exhausted_deliveries_are_not_due_and_are_deleted(handler):
+    exhausted_id, retried_id = handler.enqueue_deliveries(_TG_CHAT_ID, 1, [(100, None), (200, None)], "{}", _NOW)
+    for _ in range(3):
+        handler.postpone_delivery(exhausted_id, _NOW)
+    handler.postpone_delivery(retried_id, _NOW)
+
+    assert [delivery[0] for delivery in handler.get_due_deliveries(_NOW, 3)] == [retried_id]
+    assert handler.delete_exhausted_deliveries(3) == 1
+    assert [delivery[0] for delivery in handler.get_due_deliveries(_NOW, 10)] == [retried_id]
+
+
+def test_completed_delivery_is_replaced_by_reference(handler):
+    outbox_id, = handler.enqueue_deliveries(_TG_CHAT_ID, 1, [(100, None)], "{}", _NOW)
+
+    handler.complete_delivery(outbox_id, _TG_CHAT_ID, 1, DiscordMessage(1000, 100), _NOW)
+
+    assert handler.get_due_deliveries(_NOW, 10) == []
+    assert handler.get(_TG_CHAT_ID, 1) == [(1000, 100, None)]
+
+
+class _OutboxRecorder:
+
+    def __init__(self):
+        """
+        Records the outbox operations of a handled failed delivery.
+        """
+        self.postponed = []
+        self.discarded = []
+
+    async def postpone_delivery(self, outbox_id: int, next_attempt_ts) -> None:
+        self.postponed.append(outbox_id)
+
+    async def discard_delivery(self, outbox_id: int) -> None:
+        self.discarded.append(outbox_id)
+
+
+def _handle_failed_delivery(attempts: int, max_attempts: int) -> _OutboxRecorder:
+    recorder = _OutboxRecorder()
+    cog = SimpleNamespace(database_handler=recorder,
+                          config=SimpleNamespace(preferences=SimpleNamespace(outbox_max_attempts=max_attempts)))
+    cog._postpone_delivery = lambda delivery: TelegramCog._postpone_delivery(cog, delivery)
+    delivery = OutboxDelivery(7, _TG_CHAT_ID, 1, 100, None, None, attempts)
+
+    asyncio.run(TelegramCog._handle_failed_delivery(cog, delivery, RuntimeError("Connection reset")))
+    return recorder
+
+
+def test_failed_delivery_is_postponed():
+    recorder = _handle_failed_delivery(attempts=1, max_attempts=3)
+    assert recorder.postponed == [7]
+    assert recorder.discarded == []
+
+
+def test_failed_delivery_is_discarded_on_last_attempt():
+    recorder = _handle_failed_delivery(attempts=2, max_attempts=3)
+    assert recorder.postponed == []
+    assert recorder.discarded == [7]
@@ -0,0 +1,96 @@
+"""
+MIT License
+
+Copyright (c) 2025 Niko Mätäsaho
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import asyncio
+
+from bots.pending_forwards import PendingForwards
+
+
+def test_messages_are_keyed_by_chat_and_message():
+    async def run():
+        forwards = PendingForwards(timeout=0.05)
+        with forwards.track(1, 10):
+            assert (1, 10) in forwards
+            assert (2, 10) not in forwards
+            # The same message ID in another chat is not waited for
+            assert await forwards.wait(2, 10)
+            assert not await forwards.wait(1, 10)
+        assert (1, 10) not in forwards
+        assert len(forwards) == 0
+
+    asyncio.run(run())
+
+
+def test_wait_is_released_when_forward_completes():
+    async def run():
+        forwards = PendingForwards(timeout=1)
+        released = asyncio.Event()
+
+        async def forward():
+            with forwards.track(1, 10):
+                await released.wait()
+
+        forwarding = asyncio.create_task(forward())
+        await asyncio.sleep(0)
+        waiting = asyncio.create_task(forwards.wait(1, 10))
+        await asyncio.sleep(0.01)
+        assert not waiting.done()
+
+        released.set()
+        assert await waiting
+        await forwarding
+
+    asyncio.run(run())
+
+
+def test_wait_is_released_when_forward_fails():
+    async def run():
+        forwards = PendingForwards(timeout=1)
+
+        async def forward():
+            with forwards.track(1, 10):
+                await asyncio.sleep(0.01)
+                raise RuntimeError("Forward failed")
+
+        forwarding = asyncio.create_task(forward())
+        await asyncio.sleep(0)
+        assert await forwards.wait(1, 10)
+        result, = await asyncio.gather(forwarding, return_exceptions=True)
+        assert isinstance(result, RuntimeError)
+
+    asyncio.run(run())
+
+
+def test_newer_forward_stays_pending_after_older_completes():
+    async def run():
+        forwards = PendingForwards(timeout=0.05)
+        older = forwards.track(1, 10)
+        older.__enter__()
+        with forwards.track(1, 10):
+            older.__exit__(None, None, None)
+            assert (1, 10) in forwards
+        assert (1, 10) not in forwards
+
+    asyncio.run(run())